@@ -5,40 +5,102 @@ Flask backend for the Sanity real vs fake news project.
 from __future__ import annotations
 
 import base64
+import gc
+import itertools
+import json
 import os
+import threading
+import time
 import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any, Dict, Tuple
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Tuple
 
 import numpy as np
-import torch
 from dotenv import load_dotenv
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request, stream_with_context
 from flask_cors import CORS
-from transformers import DistilBertForSequenceClassification, DistilBertTokenizerFast
+
+if TYPE_CHECKING:  # torch/transformers are imported lazily during startup
+    import torch
+    from transformers import DistilBertTokenizerFast
 
 try:
+    from . import utils as sanity_utils
     from .utils import (
         GroqAPIError,
+        GroqRateLimited,
         GroqClient,
+        Calibrator,
+        default_calibration_path,
+        load_calibrator,
+        LinearCascade,
+        LinearModelError,
+        MicroBatcher,
+        STAGE_TRANSFORMER,
+        process_memory,
+        resolve_serving_config,
+        SingleFlight,
+        ContextTooLarge,
+        create_context_store,
+        normalize_url,
+        start_ledger,
+        end_ledger,
+        VerificationController,
+        VerificationSkipped,
+        VerificationJobManager,
+        VerificationQueueFull,
+        format_sse,
+        TieredCache,
+        content_hash,
+        normalize_text,
         get_logger,
         update_progress_log,
         extract_text_from_pdf,
         extract_text_from_url,
         clean_text_for_prompt,
+        PromptBudget,
+        TokenCounter,
     )
 except ImportError:  # pragma: no cover - script execution fallback
     import sys
 
     sys.path.append(str(Path(__file__).resolve().parent))
+    import utils as sanity_utils
     from utils import (
         GroqAPIError,
+        GroqRateLimited,
         GroqClient,
+        Calibrator,
+        default_calibration_path,
+        load_calibrator,
+        LinearCascade,
+        LinearModelError,
+        MicroBatcher,
+        STAGE_TRANSFORMER,
+        process_memory,
+        resolve_serving_config,
+        SingleFlight,
+        ContextTooLarge,
+        create_context_store,
+        normalize_url,
+        start_ledger,
+        end_ledger,
+        VerificationController,
+        VerificationSkipped,
+        VerificationJobManager,
+        VerificationQueueFull,
+        format_sse,
+        TieredCache,
+        content_hash,
+        normalize_text,
         get_logger,
         update_progress_log,
         extract_text_from_pdf,
         extract_text_from_url,
         clean_text_for_prompt,
+        PromptBudget,
+        TokenCounter,
     )
 
 load_dotenv()
@@ -48,55 +110,280 @@ CORS(app)
 logger = get_logger(__name__)
 
 MODEL_DIR = Path(os.getenv("MODEL_DIR", "backend/model/distilbert"))
-FINE_TUNED_MODEL_PATH = Path(os.getenv("FINE_TUNED_MODEL_PATH", "backend/model/sanity_model.bin"))
+FINE_TUNED_MODEL_PATH = Path(os.getenv("FINE_TUNED_MODEL_PATH", "backend/model/sanity_model.safetensors"))
 CONFIDENCE_THRESHOLD = float(os.getenv("CONFIDENCE_THRESHOLD", "0.70"))
-DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+CALIBRATION_ENABLED = os.getenv("CALIBRATION_ENABLED", "true").lower() in ("1", "true", "yes")
+CALIBRATION_PATH = Path(os.getenv("CALIBRATION_PATH", str(default_calibration_path(FINE_TUNED_MODEL_PATH))))
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch").lower()
+INFERENCE_BACKENDS = ("torch", "quantized", "onnx", "early_exit")
+ONNX_MODEL_PATH = Path(os.getenv("ONNX_MODEL_PATH", str(FINE_TUNED_MODEL_PATH.with_suffix(".onnx"))))
+ONNX_GRAPH_OPTIMIZATION = os.getenv("ONNX_GRAPH_OPTIMIZATION", "all").lower()
+ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", "0"))
+ONNX_INTER_OP_THREADS = int(os.getenv("ONNX_INTER_OP_THREADS", "0"))
+EARLY_EXIT_THRESHOLD = float(os.getenv("EARLY_EXIT_THRESHOLD", "0.90"))
+# Unset: default_heads_path(FINE_TUNED_MODEL_PATH), resolved in load_model (early_exit imports torch).
+EARLY_EXIT_HEADS_PATH = Path(os.environ["EARLY_EXIT_HEADS_PATH"]) if os.getenv("EARLY_EXIT_HEADS_PATH") else None
+BATCHING_ENABLED = os.getenv("BATCHING_ENABLED", "true").lower() in ("1", "true", "yes")
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "16"))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "5"))
+PIPELINE_ENABLED = os.getenv("PIPELINE_ENABLED", "true").lower() in ("1", "true", "yes")
+PIPELINE_TOKENIZER_WORKERS = int(os.getenv("PIPELINE_TOKENIZER_WORKERS", "2"))
+PIPELINE_MAX_IN_FLIGHT = int(os.getenv("PIPELINE_MAX_IN_FLIGHT", "2"))
+CASCADE_MODE = os.getenv("CASCADE_MODE", "false").lower() in ("1", "true", "yes")
+CASCADE_THRESHOLD = float(os.getenv("CASCADE_THRESHOLD", "0.90"))
+LINEAR_MODEL_PATH = Path(os.getenv("LINEAR_MODEL_PATH", "backend/model/linear_model.joblib"))
+LONG_DOCUMENT_MODE = os.getenv("LONG_DOCUMENT_MODE", "false").lower() in ("1", "true", "yes")
+LONG_DOC_STRIDE = int(os.getenv("LONG_DOC_STRIDE", "128"))
+LONG_DOC_MAX_WINDOWS = int(os.getenv("LONG_DOC_MAX_WINDOWS", "8"))
+LONG_DOC_REDUCER = os.getenv("LONG_DOC_REDUCER", "mean")
+MODEL_VERSION = os.getenv("MODEL_VERSION")
+PREDICTION_CACHE_ENABLED = os.getenv("PREDICTION_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "4096"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "3600"))
+PREDICTION_CACHE_DB = os.getenv("PREDICTION_CACHE_DB")
+PREDICT_BATCH_MAX_ITEMS = int(os.getenv("PREDICT_BATCH_MAX_ITEMS", "100"))
+PREDICT_BATCH_WORKERS = int(os.getenv("PREDICT_BATCH_WORKERS", "8"))
+TORCH_THREADS_PER_WORKER = int(os.getenv("TORCH_THREADS_PER_WORKER", "0"))
+TORCH_INTEROP_THREADS = int(os.getenv("TORCH_INTEROP_THREADS", "0"))
+SERVING_CONFIG_PATH = Path(os.getenv("SERVING_CONFIG_PATH", "backend/serving_config.json"))
+SERVING_CONFIG_MODE = os.getenv("SERVING_CONFIG_MODE", "auto").lower()
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "1024"))
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB")
+LLM_CACHE_TTLS = {
+    "verify": float(os.getenv("LLM_CACHE_TTL_VERIFY", "86400")),
+    "followup": float(os.getenv("LLM_CACHE_TTL_FOLLOWUP", "3600")),
+    "direct": float(os.getenv("LLM_CACHE_TTL_DIRECT", "600")),
+}
+PROMPT_BUDGETS = {
+    "verify": int(os.getenv("PROMPT_BUDGET_VERIFY", "2000")),
+    "followup": int(os.getenv("PROMPT_BUDGET_FOLLOWUP", "1500")),
+}
+PROMPT_LEAD_SENTENCES = int(os.getenv("PROMPT_LEAD_SENTENCES", "3"))
+CONTEXT_BACKEND = os.getenv("CONTEXT_BACKEND", "memory").lower()
+CONTEXT_DB_PATH = Path(os.getenv("CONTEXT_DB_PATH", "backend/cache/contexts.sqlite3"))
+CONTEXT_KV_URL = os.getenv("CONTEXT_KV_URL")
+CONTEXT_LOCAL_CACHE_SIZE = int(os.getenv("CONTEXT_LOCAL_CACHE_SIZE", "1024"))
+CONTEXT_LOCAL_CACHE_TTL = float(os.getenv("CONTEXT_LOCAL_CACHE_TTL", "2"))
+CONTEXT_MAX_ENTRIES = int(os.getenv("CONTEXT_MAX_ENTRIES", "10000"))
+CONTEXT_MAX_BYTES = int(os.getenv("CONTEXT_MAX_BYTES", str(64 * 1024 * 1024)))
+CONTEXT_TTL = float(os.getenv("CONTEXT_TTL", str(6 * 3600)))
+VERIFICATION_ASYNC = os.getenv("VERIFICATION_ASYNC", "true").lower() in ("1", "true", "yes")
+VERIFICATION_WORKERS = int(os.getenv("VERIFICATION_WORKERS", "4"))
+VERIFICATION_MAX_PENDING = int(os.getenv("VERIFICATION_MAX_PENDING", "64"))
+VERIFICATION_JOB_RETENTION = float(os.getenv("VERIFICATION_JOB_RETENTION", "600"))
+VERIFICATION_SSE_HEARTBEAT = float(os.getenv("VERIFICATION_SSE_HEARTBEAT", "15"))
+VERIFICATION_MAX_CALLS_PER_SECOND = float(os.getenv("VERIFICATION_MAX_CALLS_PER_SECOND", "2"))
+VERIFICATION_MAX_CONCURRENT = int(os.getenv("VERIFICATION_MAX_CONCURRENT", "4"))
+VERIFICATION_FAILURE_THRESHOLD = int(os.getenv("VERIFICATION_FAILURE_THRESHOLD", "5"))
+VERIFICATION_SLOW_CALL_MS = float(os.getenv("VERIFICATION_SLOW_CALL_MS", "10000"))
+VERIFICATION_CIRCUIT_OPEN_SECONDS = float(os.getenv("VERIFICATION_CIRCUIT_OPEN_SECONDS", "30"))
+VERIFICATION_JOB_SLOT_WAIT = float(os.getenv("VERIFICATION_JOB_SLOT_WAIT", "10"))
+SHARE_MODEL_MEMORY = os.getenv("SHARE_MODEL_MEMORY", "false").lower() in ("1", "true", "yes")
+WARMUP_SEQUENCE_LENGTHS = [
+    int(length) for length in os.getenv("WARMUP_SEQUENCE_LENGTHS", "16,128,512").split(",") if length.strip()
+]
 
+_device: torch.device | None = None
 _tokenizer: DistilBertTokenizerFast | None = None
-_model: DistilBertForSequenceClassification | None = None
+_model: Any = None
 _groq_client: GroqClient | None = None
+_batcher: MicroBatcher[str, Dict[str, Any]] | None = None
+_pipeline: Any = None
+_linear_cascade: LinearCascade | None = None
+_linear_cascade_error: str | None = None
+_calibrator: Calibrator | None = None
+_calibration_error: str | None = None
+_calibration_loaded = False
+_active_backend: str | None = None
+_serving_config: Any = None
+_serving_config_applied = False
+_model_lock = threading.Lock()
+_pipeline_lock = threading.Lock()
+_startup_lock = threading.Lock()
+_startup_thread_lock = threading.Lock()
+_startup_thread: threading.Thread | None = None
+_startup_state: Dict[str, Any] = {"status": "pending", "phases_ms": {}, "error": None}
+_batch_executor = ThreadPoolExecutor(max_workers=PREDICT_BATCH_WORKERS, thread_name_prefix="predict-batch")
+_prediction_cache = TieredCache(
+    max_entries=PREDICTION_CACHE_SIZE,
+    ttl_seconds=PREDICTION_CACHE_TTL,
+    db_path=Path(PREDICTION_CACHE_DB) if PREDICTION_CACHE_DB else None,
+    namespace="predictions",
+)
+_llm_cache = (
+    TieredCache(
+        max_entries=LLM_CACHE_SIZE,
+        ttl_seconds=LLM_CACHE_TTLS["followup"],
+        db_path=Path(LLM_CACHE_DB) if LLM_CACHE_DB else None,
+        namespace="llm",
+    )
+    if LLM_CACHE_ENABLED
+    else None
+)
+# Article text is fitted to a per-flow token budget before it reaches the LLM.
+_prompt_budget = PromptBudget(TokenCounter(), budgets=PROMPT_BUDGETS, lead_sentences=PROMPT_LEAD_SENTENCES)
+# Concurrent identical requests share one URL fetch / forward pass / LLM call.
+_url_flight: SingleFlight[str] = SingleFlight("url_fetch")
+_inference_flight: SingleFlight[Dict[str, Any]] = SingleFlight("inference")
+_verification_flight: SingleFlight[Dict[str, str]] = SingleFlight("verification")
+def _is_provider_failure(exc: BaseException) -> bool:
+    """Only errors from Groq itself count toward the circuit, not local throttling or bugs."""
+    return isinstance(exc, GroqAPIError) and not isinstance(exc, GroqRateLimited)
+
+
+# Auto-verification is best effort: skipped rather than queued behind a slow or failing provider.
+_verification_controller = VerificationController(
+    max_calls_per_second=VERIFICATION_MAX_CALLS_PER_SECOND,
+    max_concurrent=VERIFICATION_MAX_CONCURRENT,
+    failure_threshold=VERIFICATION_FAILURE_THRESHOLD,
+    slow_call_ms=VERIFICATION_SLOW_CALL_MS,
+    open_seconds=VERIFICATION_CIRCUIT_OPEN_SECONDS,
+    is_failure=_is_provider_failure,
+)
 
 # Context storage for follow-up questions
 # Key: session_id or article_id, Value: dict with article_text, prediction, verification, etc.
-_article_contexts: Dict[str, Dict[str, Any]] = {}
+# With CONTEXT_BACKEND=sqlite|kv every worker sees every context.
+_article_contexts = create_context_store(
+    CONTEXT_BACKEND,
+    max_entries=CONTEXT_MAX_ENTRIES,
+    max_bytes=CONTEXT_MAX_BYTES,
+    ttl_seconds=CONTEXT_TTL,
+    db_path=CONTEXT_DB_PATH,
+    kv_url=CONTEXT_KV_URL,
+    local_cache_entries=CONTEXT_LOCAL_CACHE_SIZE,
+    local_cache_ttl=CONTEXT_LOCAL_CACHE_TTL,
+)
+# Job snapshots go to the shared context backend too, so /verification/<id> (poll or SSE)
+# and /ask work on any worker; reads may lag by up to CONTEXT_LOCAL_CACHE_TTL.
+_verification_jobs = VerificationJobManager(
+    max_workers=VERIFICATION_WORKERS,
+    max_pending=VERIFICATION_MAX_PENDING,
+    retention_seconds=VERIFICATION_JOB_RETENTION,
+    store=_article_contexts if CONTEXT_BACKEND != "memory" else None,
+)
+
+
+def get_device() -> torch.device:
+    global _device
+    if _device is None:
+        import torch
+
+        _device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    return _device
+
+
+def _download_base_model() -> None:
+    from transformers import DistilBertForSequenceClassification, DistilBertTokenizerFast
+
+    logger.warning("Local model missing, downloading distilbert-base-uncased.")
+    tokenizer = DistilBertTokenizerFast.from_pretrained("distilbert-base-uncased")
+    model = DistilBertForSequenceClassification.from_pretrained("distilbert-base-uncased")
+    MODEL_DIR.mkdir(parents=True, exist_ok=True)
+    tokenizer.save_pretrained(MODEL_DIR)
+    model.save_pretrained(MODEL_DIR)
+    update_progress_log("Downloaded base DistilBERT weights.")
+
+
+def _load_fp32_model() -> Tuple[DistilBertTokenizerFast, Any]:
+    """Load the fp32 tokenizer/model (memory-mapped weights), downloading the base model if needed."""
+    if not (MODEL_DIR / "config.json").exists():
+        _download_base_model()
+    return sanity_utils.load_classifier(MODEL_DIR, FINE_TUNED_MODEL_PATH)
+
+
+def _resolve_backend() -> str:
+    backend = INFERENCE_BACKEND
+    if backend not in INFERENCE_BACKENDS:
+        logger.warning("Unknown INFERENCE_BACKEND '%s', using torch.", backend)
+        return "torch"
+    if backend in ("quantized", "onnx") and get_device().type != "cpu":
+        logger.warning("The %s backend is CPU-only; using torch backend on %s.", backend, get_device())
+        return "torch"
+    return backend
 
 
-def load_model() -> Tuple[DistilBertTokenizerFast, DistilBertForSequenceClassification]:
-    """Load tokenizer/model from disk, downloading if necessary."""
-    global _tokenizer, _model
+def load_model() -> Tuple[DistilBertTokenizerFast, Any]:
+    """Load tokenizer/model for the configured inference backend (once per process)."""
+    global _tokenizer, _model, _active_backend
     if _tokenizer and _model:
         return _tokenizer, _model
 
-    try:
-        MODEL_DIR.mkdir(parents=True, exist_ok=True)
-        _tokenizer = DistilBertTokenizerFast.from_pretrained(MODEL_DIR, local_files_only=True)
-        _model = DistilBertForSequenceClassification.from_pretrained(MODEL_DIR, local_files_only=True)
-        logger.info("Loaded DistilBERT from %s", MODEL_DIR)
-    except Exception:
-        logger.warning("Local model missing, downloading distilbert-base-uncased.")
-        _tokenizer = DistilBertTokenizerFast.from_pretrained("distilbert-base-uncased")
-        _model = DistilBertForSequenceClassification.from_pretrained("distilbert-base-uncased")
-        _tokenizer.save_pretrained(MODEL_DIR)
-        _model.save_pretrained(MODEL_DIR)
-        update_progress_log("Downloaded base DistilBERT weights.")
+    with _model_lock:
+        if _tokenizer and _model:
+            return _tokenizer, _model
 
-    if FINE_TUNED_MODEL_PATH.exists():
-        state_dict = torch.load(FINE_TUNED_MODEL_PATH, map_location="cpu")
-        missing, unexpected = _model.load_state_dict(state_dict, strict=False)
-        if missing or unexpected:
-            logger.warning("State dict mismatch. Missing: %s | Unexpected: %s", missing, unexpected)
-        logger.info("Loaded fine-tuned weights from %s", FINE_TUNED_MODEL_PATH)
-
-    _model.to(DEVICE)
-    _model.eval()
+        from transformers import DistilBertConfig, DistilBertForSequenceClassification, DistilBertTokenizerFast
+
+        backend = _resolve_backend()
+        if backend == "quantized":
+            loaded: Dict[str, Any] = {}
+
+            def load_fp32() -> Any:
+                loaded["tokenizer"], model = _load_fp32_model()
+                return model
+
+            model = sanity_utils.get_quantized_model(
+                lambda: DistilBertForSequenceClassification(DistilBertConfig.from_pretrained(MODEL_DIR)),
+                load_fp32,
+                FINE_TUNED_MODEL_PATH,
+            )
+            tokenizer = loaded.get("tokenizer") or DistilBertTokenizerFast.from_pretrained(
+                MODEL_DIR, local_files_only=True
+            )
+        elif backend == "onnx":
+            session = sanity_utils.create_onnx_session(
+                ONNX_MODEL_PATH,
+                graph_optimization=ONNX_GRAPH_OPTIMIZATION,
+                intra_op_threads=ONNX_INTRA_OP_THREADS
+                or (_serving_config.torch_threads if _serving_config else 0),
+                inter_op_threads=ONNX_INTER_OP_THREADS,
+            )
+            model = sanity_utils.OnnxSequenceClassifier(session)
+            tokenizer = DistilBertTokenizerFast.from_pretrained(MODEL_DIR, local_files_only=True)
+        elif backend == "early_exit":
+            tokenizer, model = sanity_utils.load_early_exit_model(
+                MODEL_DIR,
+                FINE_TUNED_MODEL_PATH,
+                EARLY_EXIT_HEADS_PATH or sanity_utils.default_heads_path(FINE_TUNED_MODEL_PATH),
+                threshold=EARLY_EXIT_THRESHOLD,
+                device=get_device(),
+            )
+        else:
+            tokenizer, model = _load_fp32_model()
+            model.to(get_device())
+
+        model.eval()
+        _tokenizer, _model, _active_backend = tokenizer, model, backend
+        logger.info("Inference backend: %s", backend)
     return _tokenizer, _model
 
 
+def get_model_version() -> str:
+    """Identify the weights/backend combination so cached predictions never outlive a model swap."""
+    if MODEL_VERSION:
+        return MODEL_VERSION
+    if FINE_TUNED_MODEL_PATH.exists():
+        stat = FINE_TUNED_MODEL_PATH.stat()
+        weights = f"{FINE_TUNED_MODEL_PATH.name}-{stat.st_size}-{stat.st_mtime_ns}"
+    else:
+        weights = "base"
+    backend = _active_backend or INFERENCE_BACKEND
+    if backend == "early_exit":
+        backend = f"{backend}@{EARLY_EXIT_THRESHOLD}"
+    return f"{backend}:{weights}:{calibration_version()}:{CONFIDENCE_THRESHOLD}"
+
+
+def prediction_cache_key(text: str, mode: str = "default") -> str:
+    return content_hash(get_model_version(), mode, normalize_text(text))
+
+
 def get_groq_client() -> GroqClient:
     global _groq_client
     if _groq_client:
         return _groq_client
-    _groq_client = GroqClient()
+    _groq_client = GroqClient(response_cache=_llm_cache, cache_ttls=LLM_CACHE_TTLS)
     return _groq_client
 
 
@@ -112,7 +399,7 @@ def resolve_text(payload: Dict[str, Any]) -> str:
         url = payload.get("url") or payload.get("content")
         if not url:
             raise ValueError("URL missing for url input type.")
-        return extract_text_from_url(url)
+        return _url_flight.do(normalize_url(url), lambda: extract_text_from_url(url))
     if input_type == "pdf":
         pdf_path = payload.get("pdf_path")
         pdf_b64 = payload.get("pdf_base64")
@@ -125,20 +412,30 @@ def resolve_text(payload: Dict[str, Any]) -> str:
     raise ValueError(f"Unsupported input_type '{input_type}'.")
 
 
-def run_model_inference(text: str) -> Dict[str, Any]:
-    tokenizer, model = load_model()
-    inputs = tokenizer(
-        text,
-        padding="max_length",
-        truncation=True,
-        max_length=512,
-        return_tensors="pt",
-    )
-    inputs = {k: v.to(DEVICE) for k, v in inputs.items()}
-    with torch.no_grad():
-        outputs = model(**inputs)
-        logits = outputs.logits
-    probs = torch.softmax(logits, dim=-1).cpu().numpy().flatten()
+def get_calibrator() -> Calibrator | None:
+    """Fitted confidence calibration for the transformer, or None (raw softmax) if there is none."""
+    global _calibrator, _calibration_error, _calibration_loaded
+    if _calibration_loaded or not CALIBRATION_ENABLED:
+        return _calibrator
+    with _model_lock:
+        if not _calibration_loaded:
+            try:
+                _calibrator = load_calibrator(CALIBRATION_PATH)
+            except ValueError as exc:
+                _calibration_error = str(exc)
+                logger.warning("Calibration disabled, using raw probabilities: %s", exc)
+            _calibration_loaded = True
+    return _calibrator
+
+
+def calibration_version() -> str:
+    if not CALIBRATION_ENABLED or not CALIBRATION_PATH.exists():
+        return "raw"
+    stat = CALIBRATION_PATH.stat()
+    return f"cal-{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def _build_result(probs: np.ndarray) -> Dict[str, Any]:
     confidence = float(np.max(probs))
     label_idx = int(np.argmax(probs))
     labels = {0: "Fake", 1: "Real"}
@@ -151,71 +448,626 @@ def run_model_inference(text: str) -> Dict[str, Any]:
     }
 
 
+def _calibrate(probs: np.ndarray) -> np.ndarray:
+    """Calibrate transformer probabilities (one row or a batch) before thresholding."""
+    calibrator = get_calibrator()
+    return calibrator.apply(probs) if calibrator is not None else probs
+
+
+def _build_results(probs: np.ndarray) -> List[Dict[str, Any]]:
+    return [_build_result(row) for row in _calibrate(probs)]
+
+
+def run_model_batch(texts: List[str]) -> List[Dict[str, Any]]:
+    """Run a single forward pass over several articles."""
+    tokenizer, model = load_model()
+    probs = sanity_utils.predict_probabilities(texts, tokenizer, model, get_device(), batch_size=BATCH_MAX_SIZE)
+    return _build_results(probs)
+
+
+def get_pipeline() -> Any:
+    """Tokenize/forward/post-process pipeline over the loaded model (created once per process)."""
+    global _pipeline
+    if _pipeline:
+        return _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            tokenizer, model = load_model()
+            _pipeline = sanity_utils.InferencePipeline(
+                tokenizer,
+                model,
+                get_device(),
+                batch_size=BATCH_MAX_SIZE,
+                tokenizer_workers=PIPELINE_TOKENIZER_WORKERS,
+            )
+    return _pipeline
+
+
+def submit_model_batch(texts: List[str]) -> Future | List[Dict[str, Any]]:
+    """Pipelined ``run_model_batch``: returns a Future so the next batch can be tokenized meanwhile."""
+    if not PIPELINE_ENABLED:
+        return run_model_batch(texts)
+    return get_pipeline().submit(texts, postprocess=_build_results)
+
+
+def get_batcher() -> MicroBatcher[str, Dict[str, Any]]:
+    global _batcher
+    if _batcher:
+        return _batcher
+    # Resolve submit_model_batch at call time so it can be swapped (e.g. in tests).
+    _batcher = MicroBatcher(
+        lambda texts: submit_model_batch(texts),
+        max_batch_size=BATCH_MAX_SIZE,
+        max_wait_ms=BATCH_MAX_WAIT_MS,
+        max_in_flight=PIPELINE_MAX_IN_FLIGHT if PIPELINE_ENABLED else 1,
+        name="inference-batcher",
+    )
+    return _batcher
+
+
+def run_model_inference(text: str) -> Dict[str, Any]:
+    """Classify one article, grouping concurrent calls into shared batches."""
+    if BATCHING_ENABLED:
+        return get_batcher()(text)
+    if PIPELINE_ENABLED:
+        return get_pipeline().submit([text], postprocess=_build_results).result()[0]
+    return run_model_batch([text])[0]
+
+
+def get_linear_cascade() -> LinearCascade | None:
+    """Linear first stage, or None (transformer only) if it isn't trained yet."""
+    global _linear_cascade, _linear_cascade_error
+    if _linear_cascade or _linear_cascade_error:
+        return _linear_cascade
+    with _model_lock:
+        if _linear_cascade is None and _linear_cascade_error is None:
+            try:
+                _linear_cascade = LinearCascade.load(LINEAR_MODEL_PATH, threshold=CASCADE_THRESHOLD)
+            except LinearModelError as exc:
+                _linear_cascade_error = str(exc)
+                logger.warning("Cascade disabled, using DistilBERT only: %s", exc)
+            except Exception as exc:
+                # A corrupt or incompatible joblib file can raise almost anything
+                # (UnpicklingError, EOFError, AttributeError, ...); cache it so
+                # requests don't retry the load.
+                _linear_cascade_error = f"{type(exc).__name__}: {exc}"
+                logger.exception("Cascade disabled, could not load %s", LINEAR_MODEL_PATH)
+    return _linear_cascade
+
+
+def _transformer_probabilities(texts: List[str]) -> np.ndarray:
+    results = [run_model_inference(text) for text in texts]
+    return np.array([[r["probabilities"]["fake"], r["probabilities"]["real"]] for r in results])
+
+
+def run_cascade_inference(text: str) -> Dict[str, Any]:
+    """Let the linear model decide clear-cut articles; only uncertain ones reach DistilBERT."""
+    cascade = get_linear_cascade()
+    if cascade is None:
+        return {**run_model_inference(text), "stage": STAGE_TRANSFORMER}
+    probs, stages = cascade.classify([text], _transformer_probabilities)
+    return {**_build_result(probs[0]), "stage": stages[0]}
+
+
+def cascade_version() -> str:
+    if not LINEAR_MODEL_PATH.exists():
+        return "none"
+    stat = LINEAR_MODEL_PATH.stat()
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def run_long_document_inference(text: str, reducer: str | None = None) -> Dict[str, Any]:
+    """Classify an article with overlapping 512-token windows instead of truncating it."""
+    tokenizer, model = load_model()
+    reducer = reducer or LONG_DOC_REDUCER
+    probs, windows, window_probs, truncated = sanity_utils.predict_long_document(
+        text,
+        tokenizer,
+        model,
+        get_device(),
+        reducer=reducer,
+        stride=LONG_DOC_STRIDE,
+        max_windows=LONG_DOC_MAX_WINDOWS,
+    )
+    result = _build_result(_calibrate(probs))
+    result["long_document"] = {
+        "reducer": reducer,
+        "num_windows": len(windows),
+        "truncated": truncated,
+        "windows": [
+            {
+                "index": window.index,
+                "start_token": window.start_token,
+                "num_tokens": window.num_tokens,
+                "probabilities": {"fake": float(row[0]), "real": float(row[1])},
+            }
+            for window, row in zip(windows, window_probs)
+        ],
+    }
+    return result
+
+
+def startup(warmup: bool = True) -> Dict[str, Any]:
+    """
+    Load the model and run warm-up forwards before traffic arrives.
+
+    Records per-phase timings (heavy imports, model load, warm-up) in the
+    startup state exposed by /readyz and logs them as one line.
+    """
+    with _startup_lock:
+        if _startup_state["status"] == "ready":
+            return _startup_state
+        _startup_state.update(status="loading", error=None)
+        phases = _startup_state["phases_ms"]
+        started = phase_started = time.perf_counter()
+
+        def finish_phase(name: str) -> None:
+            nonlocal phase_started
+            now = time.perf_counter()
+            phases[name] = round((now - phase_started) * 1000, 1)
+            phase_started = now
+
+        try:
+            import torch  # noqa: F401
+            import transformers  # noqa: F401
+
+            finish_phase("imports")
+            if not _serving_config_applied:
+                apply_serving_config()
+            tokenizer, model = load_model()
+            finish_phase("load_model")
+            if warmup and WARMUP_SEQUENCE_LENGTHS:
+                timings = sanity_utils.warm_up_model(model, tokenizer, get_device(), WARMUP_SEQUENCE_LENGTHS)
+                finish_phase("warmup")
+                logger.info(
+                    "Warm-up forwards | %s",
+                    " ".join(f"len{length}={ms:.0f}ms" for length, ms in timings.items()),
+                )
+            if PIPELINE_ENABLED:
+                get_pipeline().start()
+            if BATCHING_ENABLED:
+                get_batcher().start()
+            if CASCADE_MODE:
+                get_linear_cascade()
+        except Exception as exc:
+            _startup_state.update(status="failed", error=str(exc))
+            logger.exception("Startup failed.")
+            return _startup_state
+
+        phases["total"] = round((time.perf_counter() - started) * 1000, 1)
+        _startup_state["status"] = "ready"
+        logger.info("Startup complete | %s", " ".join(f"{name}={ms:.0f}ms" for name, ms in phases.items()))
+        return _startup_state
+
+
+def start_background_startup(warmup: bool = True) -> threading.Thread:
+    """Run ``startup`` on a daemon thread so the server can answer probes meanwhile."""
+    global _startup_thread
+    with _startup_thread_lock:
+        if _startup_thread is None:
+            _startup_thread = threading.Thread(
+                target=startup, kwargs={"warmup": warmup}, name="model-startup", daemon=True
+            )
+            _startup_thread.start()
+    return _startup_thread
+
+
+def prepare_for_fork() -> None:
+    """
+    Load the model in a pre-fork master (e.g. Gunicorn ``preload_app``).
+
+    Workers forked afterwards inherit the weights; tensor storage is never
+    written during inference, so its pages stay shared copy-on-write. With
+    SHARE_MODEL_MEMORY the weights are moved into explicit shared memory
+    instead. No threads are started here because they do not survive fork().
+    """
+    if _resolve_backend() == "onnx":
+        # ONNX Runtime sessions own thread pools and are not fork-safe.
+        logger.info("ONNX backend selected; workers will load their own session after fork.")
+        return
+    import torch
+
+    # Keep the master single-threaded so no intra-op pool exists at fork time.
+    torch.set_num_threads(1)
+    started = time.perf_counter()
+    _, model = load_model()
+    if SHARE_MODEL_MEMORY:
+        try:
+            model.share_memory()
+            logger.info("Moved model weights to shared memory.")
+        except Exception as exc:
+            logger.warning("share_memory() failed (%s); relying on copy-on-write.", exc)
+    # Move everything allocated so far out of the GC's reach so collections in
+    # workers don't touch (and un-share) the master's object pages.
+    gc.collect()
+    gc.freeze()
+    logger.info(
+        "Loaded model in pre-fork master in %.0fms | rss=%.1fMB",
+        (time.perf_counter() - started) * 1000,
+        process_memory().get("rss_bytes", 0) / 1e6,
+    )
+
+
+def get_serving_config() -> Any:
+    """Tuned serving_config.json, or a split derived from the detected CPU topology."""
+    global _serving_config
+    if _serving_config is None:
+        _serving_config = resolve_serving_config(SERVING_CONFIG_PATH, SERVING_CONFIG_MODE)
+    return _serving_config
+
+
+def apply_serving_config(torch_threads: int | None = None, per_worker: bool = False) -> Any:
+    """
+    Set torch thread counts from the serving config.
+
+    TORCH_THREADS_PER_WORKER / TORCH_INTEROP_THREADS win when set, then
+    ``torch_threads``. A pre-fork worker (``per_worker``) takes the config's
+    per-worker share; a standalone process (``python app.py``, ``wsgi.py``
+    under another server) takes the whole budget of workers x threads.
+    """
+    global _serving_config_applied
+    import torch
+
+    config = get_serving_config()
+    if config:
+        default_threads = config.torch_threads if per_worker else config.torch_threads * config.workers
+    else:
+        default_threads = 1 if per_worker else 0
+    threads = TORCH_THREADS_PER_WORKER or torch_threads or default_threads
+    interop_threads = TORCH_INTEROP_THREADS or (config.interop_threads if config else 0)
+    if threads:
+        torch.set_num_threads(threads)
+    if interop_threads:
+        try:
+            torch.set_num_interop_threads(interop_threads)
+        except RuntimeError as exc:
+            logger.warning("Could not set inter-op threads: %s", exc)
+    _serving_config_applied = True
+    logger.info(
+        "Serving config applied | pid=%d torch_threads=%s interop_threads=%s serving_config=%s",
+        os.getpid(),
+        threads or "default",
+        interop_threads or "default",
+        config.source if config else "off",
+    )
+    return config
+
+
+def init_worker(torch_threads: int | None = None, warmup: bool = True) -> None:
+    """
+    Per-worker setup after fork: this worker's share of the torch threads,
+    then warm-up on this process.
+    """
+    global _startup_thread
+    apply_serving_config(torch_threads, per_worker=True)
+    # Threads from the master did not survive fork(); start fresh in this worker.
+    _startup_thread = None
+    startup(warmup=warmup)
+
+
+def is_ready() -> bool:
+    status = _startup_state["status"]
+    return status == "ready" or (status == "pending" and _model is not None)
+
+
+@app.before_request
+def _open_llm_ledger() -> None:
+    g.llm_ledger, g.llm_ledger_token = start_ledger()
+
+
+@app.teardown_request
+def _close_llm_ledger(_exc: BaseException | None) -> None:
+    """Restore the ledger context so a pooled thread doesn't keep this request's ledger."""
+    token = g.pop("llm_ledger_token", None)
+    if token is None:
+        return
+    try:
+        end_ledger(token)
+    except ValueError:
+        # Teardown ran in a different context than before_request (e.g. a streamed response).
+        logger.debug("LLM ledger token belongs to another context; not reset.")
+
+
+@app.after_request
+def _report_llm_calls(response: Response) -> Response:
+    """Expose the request's LLM call count, latency and tokens as headers."""
+    ledger = g.get("llm_ledger")
+    if ledger is None or not ledger.count:
+        return response
+    summary = ledger.summary()
+    response.headers["X-LLM-Calls"] = str(summary["count"])
+    response.headers["X-LLM-Latency-Ms"] = f"{summary['latency_ms']:.1f}"
+    response.headers["X-LLM-Tokens"] = str(summary["total_tokens"])
+    logger.info(
+        "LLM calls | path=%s count=%d latency_ms=%.1f tokens=%d",
+        request.path,
+        summary["count"],
+        summary["latency_ms"],
+        summary["total_tokens"],
+    )
+    return response
+
+
+@app.route("/livez", methods=["GET"])
+def livez() -> Any:
+    """Liveness probe: the process is up. Never touches the model."""
+    return jsonify({"status": "alive"})
+
+
+@app.route("/readyz", methods=["GET"])
+def readyz() -> Any:
+    """Readiness probe: model loaded and warmed up. Never blocks on loading."""
+    ready = is_ready()
+    body = {
+        "status": "ready" if ready else _startup_state["status"],
+        "phases_ms": _startup_state["phases_ms"],
+    }
+    if _startup_state["error"]:
+        body["error"] = _startup_state["error"]
+    return jsonify(body), 200 if ready else 503
+
+
 @app.route("/health", methods=["GET"])
 def health() -> Any:
-    try:
-        load_model()
+    if is_ready():
         model_status = "ready"
-    except Exception as exc:
-        logger.error("Health check model load failed: %s", exc)
+    elif _startup_state["status"] == "failed":
         model_status = "error"
+    elif _startup_state["status"] == "loading":
+        model_status = "loading"
+    else:
+        model_status = "not_loaded"
     return jsonify(
         {
-            "status": "ok" if model_status == "ready" else "degraded",
+            "status": {"ready": "ok", "error": "degraded"}.get(model_status, "starting"),
             "model": model_status,
-            "device": str(DEVICE),
+            "device": str(_device) if _device else None,
+            "backend": _active_backend or INFERENCE_BACKEND,
         }
     )
 
 
-@app.route("/predict", methods=["POST"])
-def predict() -> Any:
-    payload = request.get_json(force=True) or {}
+@app.route("/stats", methods=["GET"])
+def stats() -> Any:
+    return jsonify(
+        {
+            "batching": {
+                "enabled": BATCHING_ENABLED,
+                **(_batcher.stats() if _batcher else {}),
+            },
+            "pipeline": {
+                "enabled": PIPELINE_ENABLED,
+                **(_pipeline.stats() if _pipeline else {}),
+            },
+            "cascade": {
+                "enabled": CASCADE_MODE,
+                "error": _linear_cascade_error,
+                **(_linear_cascade.stats() if _linear_cascade else {}),
+            },
+            "calibration": {
+                "enabled": CALIBRATION_ENABLED,
+                "error": _calibration_error,
+                "method": _calibrator.method if _calibrator else None,
+                "metrics": _calibrator.metrics if _calibrator else None,
+            },
+            "early_exit": _model.stats() if _active_backend == "early_exit" and _model is not None else None,
+            "llm": _groq_client.usage() if _groq_client else None,
+            "contexts": _article_contexts.stats(),
+            "prompt_budget": _prompt_budget.stats(),
+            "singleflight": {
+                flight.name: flight.stats() for flight in (_url_flight, _inference_flight, _verification_flight)
+            },
+            "verification_jobs": {"async": VERIFICATION_ASYNC, **_verification_jobs.stats()},
+            "verification_controller": _verification_controller.stats(),
+            "memory": process_memory(),
+            "serving": _serving_config.to_dict() if _serving_config else None,
+            "prediction_cache": {
+                "enabled": PREDICTION_CACHE_ENABLED,
+                "model_version": get_model_version(),
+                **_prediction_cache.stats(),
+            },
+        }
+    )
+
+
+def fit_prompt_text(text: str, flow: str, query: str | None = None) -> str:
+    """Clean article text and fit it to ``flow``'s prompt token budget (logs tokens before/after)."""
+    return _prompt_budget.fit(clean_text_for_prompt(text), flow, query=query).text
+
+
+def verify_article_text(text: str, key: str | None = None, slot_wait: float = 0.0) -> Dict[str, str]:
+    """
+    Ask the LLM for a second opinion on one article.
+
+    Calls with a ``key`` are auto-verifications: concurrent ones for the same
+    key share a single LLM request, which goes through the verification
+    controller (waiting up to ``slot_wait`` seconds for a rate/concurrency
+    slot) and raises ``VerificationSkipped`` when it is refused.
+    """
+    if key is not None:
+        return _verification_flight.do(
+            key, lambda: _verification_controller.call(lambda: verify_article_text(text), timeout=slot_wait)
+        )
+    client = get_groq_client()
+    result = client.verify_article(fit_prompt_text(text, "verify"))
+    return {"prediction": result.prediction, "reasoning": result.reasoning}
+
+
+def _store_verification(cache_key: str, inference: Dict[str, Any], auto_verification: Dict[str, str]) -> None:
+    if PREDICTION_CACHE_ENABLED:
+        _prediction_cache.set(cache_key, {"inference": inference, "auto_verification": auto_verification})
+
+
+def _finish_verification_job(job: Any, cache_key: str, inference: Dict[str, Any]) -> None:
+    _store_verification(cache_key, inference, job.result)
+    # Written to the (possibly shared) context store so /ask on any worker sees it,
+    # for every request that was deduplicated onto this job. A request joining
+    # while this runs is still covered by get_article_context's job lookup.
+    for context_id in list(job.context_ids):
+        _article_contexts.patch(
+            context_id,
+            verification=job.result["reasoning"],
+            verification_prediction=job.result["prediction"],
+        )
+
+
+def _job_links(job_id: str) -> Dict[str, str]:
+    return {"status_url": f"/verification/{job_id}", "events_url": f"/verification/{job_id}/events"}
+
+
+def start_verification_job(
+    text: str, cache_key: str, context_id: str, inference: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Queue LLM verification in the background.
+
+    Requests for the same article share one in-flight job. The finished
+    verdict is written to the prediction cache, so later requests get it
+    inline as ``auto_verification``.
+
+    Returns:
+        Job descriptor for the response (``status`` is ``rejected`` when the queue is full)
+    """
+    try:
+        job = _verification_jobs.submit(
+            lambda: verify_article_text(text, key=cache_key, slot_wait=VERIFICATION_JOB_SLOT_WAIT),
+            key=cache_key,
+            context_id=context_id,
+            on_complete=lambda done: _finish_verification_job(done, cache_key, inference),
+        )
+    except VerificationQueueFull as exc:
+        logger.warning("Auto-verification not queued: %s", exc)
+        return {"job_id": None, "status": "rejected", "error": str(exc)}
+    return {"job_id": job.job_id, "status": job.status, **_job_links(job.job_id)}
+
+
+def get_article_context(context_id: str) -> Dict[str, Any] | None:
+    """Stored /predict context, filled in from its verification job once that finished."""
+    context = _article_contexts.get(context_id)
+    if context and context.get("verification") is None and context.get("verification_job"):
+        job = _verification_jobs.get(context["verification_job"])
+        if job and job["result"]:
+            context["verification"] = job["result"]["reasoning"]
+            context["verification_prediction"] = job["result"]["prediction"]
+            _article_contexts.patch(
+                context_id,
+                verification=context["verification"],
+                verification_prediction=context["verification_prediction"],
+            )
+    return context
+
+
+def predict_article(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Resolve, classify (and queue or run auto-verification if needed) one /predict payload."""
+    text = resolve_text(payload)
+    long_document = bool(payload.get("long_document", LONG_DOCUMENT_MODE))
+    reducer = payload.get("window_reducer") or LONG_DOC_REDUCER
+    cascade = not long_document and bool(payload.get("cascade", CASCADE_MODE))
+    if long_document:
+        mode = f"long:{reducer}"
+    elif cascade:
+        mode = f"cascade:{CASCADE_THRESHOLD}:{cascade_version()}"
+    else:
+        mode = "default"
+    cache_key = prediction_cache_key(text, mode)
+    cached = _prediction_cache.get(cache_key) if PREDICTION_CACHE_ENABLED else None
+
+    async_verification = bool(payload.get("async_verification", VERIFICATION_ASYNC))
+    # Generate context ID for follow-up questions
+    context_id = payload.get("context_id") or str(uuid.uuid4())
+
+    if cached:
+        inference = cached["inference"]
+        auto_verification = cached["auto_verification"]
+        logger.info("Prediction cache hit | label=%s", inference["label"])
+    else:
+
+        def infer() -> Dict[str, Any]:
+            if long_document:
+                result = run_long_document_inference(text, reducer=reducer)
+            elif cascade:
+                result = run_cascade_inference(text)
+            else:
+                result = run_model_inference(text)
+            result.setdefault("stage", STAGE_TRANSFORMER)
+            # A verdict without its verification is still worth caching: a later
+            # hit skips the model and only retries the LLM call.
+            if PREDICTION_CACHE_ENABLED:
+                _prediction_cache.set(cache_key, {"inference": result, "auto_verification": None})
+            return result
+
+        inference = _inference_flight.do(cache_key, infer)
+        auto_verification = None
+
+    # Auto-verify if confidence is low
+    needs_llm = inference["needs_verification"] and not auto_verification
+    verification_skipped = None
+    if needs_llm:
+        logger.info("Low confidence detected (%.3f), auto-verifying with LLM", inference["confidence"])
+    if needs_llm and async_verification:
+        # Don't queue jobs the open circuit would refuse anyway.
+        try:
+            _verification_controller.check()
+        except VerificationSkipped as exc:
+            verification_skipped = exc.to_dict()
+    elif needs_llm:
+        try:
+            auto_verification = verify_article_text(text, key=cache_key)
+            _store_verification(cache_key, inference, auto_verification)
+            logger.info("Auto-verification complete | prediction=%s", auto_verification["prediction"])
+        except VerificationSkipped as exc:
+            verification_skipped = exc.to_dict()
+        except Exception as exc:
+            logger.warning("Auto-verification failed: %s", exc)
+            # Continue without verification
+
+    # Store context for follow-up questions (before a background job can patch it)
     try:
-        text = resolve_text(payload)
-        inference = run_model_inference(text)
-        
-        # Auto-verify if confidence is low
-        verification_result = None
-        if inference["needs_verification"]:
-            logger.info("Low confidence detected (%.3f), auto-verifying with LLM", inference["confidence"])
-            try:
-                client = get_groq_client()
-                # Clean text before sending to LLM
-                cleaned_text = clean_text_for_prompt(text, max_length=8000)  # Reasonable limit
-                verification_result = client.verify_article(cleaned_text)
-                logger.info("Auto-verification complete | prediction=%s", verification_result.prediction)
-            except Exception as exc:
-                logger.warning("Auto-verification failed: %s", exc)
-                # Continue without verification
-        
-        # Generate context ID for follow-up questions
-        context_id = payload.get("context_id") or str(uuid.uuid4())
-        
-        # Store context for follow-up questions
         _article_contexts[context_id] = {
             "article_text": text,
             "model_prediction": inference["label"],
             "model_confidence": inference["confidence"],
-            "verification": verification_result.reasoning if verification_result else None,
-            "verification_prediction": verification_result.prediction if verification_result else None,
+            "verification": auto_verification["reasoning"] if auto_verification else None,
+            "verification_prediction": auto_verification["prediction"] if auto_verification else None,
+            "verification_job": None,
         }
-        
-        response = {
-            "article_text": text,
-            "context_id": context_id,  # Return context_id so frontend can use it for follow-ups
-            **inference,
-        }
-        
-        # Add verification result if auto-verified
-        if verification_result:
-            response["auto_verification"] = {
-                "prediction": verification_result.prediction,
-                "reasoning": verification_result.reasoning,
-            }
-        
-        logger.info("Prediction complete | label=%s confidence=%.3f", inference["label"], inference["confidence"])
-        return jsonify(response)
+        stored_context_id: str | None = context_id
+    except ContextTooLarge:
+        # Follow-ups for this article must send its text again.
+        stored_context_id = None
+
+    verification_job = None
+    if needs_llm and async_verification and not verification_skipped:
+        verification_job = start_verification_job(text, cache_key, context_id, inference)
+        if verification_job["job_id"] and stored_context_id:
+            _article_contexts.patch(context_id, verification_job=verification_job["job_id"])
+
+    response = {
+        "article_text": text,
+        "context_id": stored_context_id,  # Return context_id so frontend can use it for follow-ups
+        "cached": cached is not None,
+        **inference,
+    }
+
+    # Add verification result if auto-verified
+    if auto_verification:
+        response["auto_verification"] = auto_verification
+    if verification_job:
+        response["verification_job"] = verification_job
+    if verification_skipped:
+        # Provider degraded: the classifier verdict stands on its own.
+        logger.info("Auto-verification skipped | reason=%s", verification_skipped["reason"])
+        response["verification_skipped"] = verification_skipped
+
+    logger.info("Prediction complete | label=%s confidence=%.3f", inference["label"], inference["confidence"])
+    return response
+
+
+@app.route("/predict", methods=["POST"])
+def predict() -> Any:
+    payload = request.get_json(force=True) or {}
+    try:
+        return jsonify(predict_article(payload))
     except ValueError as exc:
         return jsonify({"error": str(exc)}), 400
     except Exception as exc:  # pragma: no cover - general safeguard
@@ -223,6 +1075,74 @@ def predict() -> Any:
         return jsonify({"error": "Prediction failed", "details": str(exc)}), 500
 
 
+def _predict_batch_item(item: Any) -> Dict[str, Any]:
+    if not isinstance(item, dict):
+        raise ValueError("Each item must be an object with the /predict schema.")
+    return predict_article(item)
+
+
+@app.route("/predict_batch", methods=["POST"])
+def predict_batch() -> Any:
+    """
+    Classify many articles and stream results as newline-delimited JSON.
+
+    Items use the /predict schema and are resolved concurrently; model calls
+    are grouped by the inference batcher. Each line carries the item's
+    ``index`` and is emitted as soon as that item finishes. Per-item failures
+    are reported inline with ``status: "error"``.
+    """
+    payload = request.get_json(force=True) or {}
+    items = payload.get("items")
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "items must be a non-empty list"}), 400
+    if len(items) > PREDICT_BATCH_MAX_ITEMS:
+        return jsonify({"error": f"At most {PREDICT_BATCH_MAX_ITEMS} items per batch"}), 400
+
+    futures = {_batch_executor.submit(_predict_batch_item, item): index for index, item in enumerate(items)}
+
+    def generate():
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                line = {"index": index, "status": "ok", **future.result()}
+            except ValueError as exc:
+                line = {"index": index, "status": "error", "error": str(exc)}
+            except Exception as exc:
+                logger.exception("Batch item %d failed.", index)
+                line = {"index": index, "status": "error", "error": "Prediction failed", "details": str(exc)}
+            yield json.dumps(line) + "\n"
+        logger.info("Batch prediction complete | items=%d", len(items))
+
+    return Response(generate(), mimetype="application/x-ndjson")
+
+
+@app.route("/verification/<job_id>", methods=["GET"])
+def verification_status(job_id: str) -> Any:
+    job = _verification_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired verification job"}), 404
+    return jsonify({**job, **_job_links(job_id)})
+
+
+@app.route("/verification/<job_id>/events", methods=["GET"])
+def verification_events(job_id: str) -> Any:
+    """
+    Stream a verification job as server-sent events.
+
+    Sends a ``status`` event for the current state, ``: keep-alive`` comments
+    while the LLM call runs, and a final ``result`` event with the verdict
+    (or ``error``).
+    """
+    if _verification_jobs.get(job_id) is None:
+        return jsonify({"error": "Unknown or expired verification job"}), 404
+    events = _verification_jobs.events(job_id, heartbeat_seconds=VERIFICATION_SSE_HEARTBEAT)
+    return Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.route("/verify", methods=["POST"])
 def verify() -> Any:
     payload = request.get_json(force=True) or {}
@@ -231,7 +1151,9 @@ def verify() -> Any:
         return jsonify({"error": "article_text is required"}), 400
     try:
         client = get_groq_client()
-        result = client.verify_article(article_text)
+        result = client.verify_article(
+            fit_prompt_text(article_text, "verify"), bypass_cache=bool(payload.get("bypass_cache"))
+        )
         return jsonify(
             {
                 "prediction": result.prediction,
@@ -248,6 +1170,34 @@ def verify() -> Any:
         return jsonify({"error": "Verification failed", "details": str(exc)}), 500
 
 
+def _stream_answer(chunks: Iterator[str]) -> Response:
+    """
+    Relay LLM output as server-sent events: ``token`` events with each text
+    chunk, then ``done`` with the full answer (or ``error`` mid-stream).
+    """
+    # Pull the first chunk before responding so connection/auth failures still
+    # surface as ordinary JSON errors from the caller.
+    first = next(chunks, None)
+
+    def generate():
+        parts = []
+        try:
+            for chunk in itertools.chain([] if first is None else [first], chunks):
+                parts.append(chunk)
+                yield format_sse("token", {"text": chunk})
+        except Exception as exc:
+            logger.warning("Q&A stream failed: %s", exc)
+            yield format_sse("error", {"error": str(exc)})
+            return
+        yield format_sse("done", {"answer": "".join(parts)})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.route("/ask", methods=["POST"])
 def ask() -> Any:
     """
@@ -259,6 +1209,9 @@ def ask() -> Any:
     
     For direct questions:
         - Just provide question (no context_id or article fields)
+
+    With ``"stream": true`` (or ``Accept: text/event-stream``) the answer is
+    relayed as server-sent events while the LLM generates it.
     """
     payload = request.get_json(force=True) or {}
     question = payload.get("question")
@@ -268,35 +1221,42 @@ def ask() -> Any:
     try:
         client = get_groq_client()
         context_id = payload.get("context_id")
+        bypass_cache = bool(payload.get("bypass_cache"))
+        stream = bool(payload.get("stream")) or "text/event-stream" in request.headers.get("Accept", "")
         
         # Check if this is a follow-up question about an article
-        if context_id and context_id in _article_contexts:
+        context = get_article_context(context_id) if context_id else None
+        if context:
             # Follow-up question about a news article
-            context = _article_contexts[context_id]
-            # Clean text before sending to LLM
-            cleaned_text = clean_text_for_prompt(context["article_text"], max_length=8000)
+            cleaned_text = fit_prompt_text(context["article_text"], "followup", query=question)
             answer = client.answer_question(
                 question=question,
                 article_text=cleaned_text,
                 model_prediction=context["model_prediction"],
                 verification_summary=context["verification"] or "Not available",
+                bypass_cache=bypass_cache,
+                stream=stream,
             )
             logger.info("Answered follow-up question for context_id=%s", context_id)
         elif payload.get("article_text"):
             # Follow-up question with explicit context
-            cleaned_text = clean_text_for_prompt(payload.get("article_text", ""), max_length=8000)
+            cleaned_text = fit_prompt_text(payload.get("article_text", ""), "followup", query=question)
             answer = client.answer_question(
                 question=question,
                 article_text=cleaned_text,
                 model_prediction=payload.get("model_prediction", "Unknown"),
                 verification_summary=payload.get("verification_summary", "Not available"),
+                bypass_cache=bypass_cache,
+                stream=stream,
             )
             logger.info("Answered follow-up question with explicit context")
         else:
             # Direct question (general query)
-            answer = client.answer_question(question=question)
+            answer = client.answer_question(question=question, bypass_cache=bypass_cache, stream=stream)
             logger.info("Answered direct question")
         
+        if stream:
+            return _stream_answer(answer)
         return jsonify({"answer": answer})
     except ValueError as exc:
         return jsonify({"error": str(exc)}), 503
@@ -319,5 +1279,8 @@ def log_progress() -> Any:
 
 if __name__ == "__main__":
     update_progress_log("Starting Flask backend server.")
+    # With debug=True the reloader re-executes this module; only warm up in the serving child.
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_background_startup()
     app.run(host="0.0.0.0", port=5000, debug=True)
 
@@ -0,0 +1,61 @@
+"""
+Gunicorn configuration for pre-fork serving with a shared model.
+
+Usage (from the project root):
+    gunicorn -c backend/gunicorn.conf.py
+
+The model is loaded once in the master (``preload_app``) and inherited by
+every worker, so the weights are shared copy-on-write instead of being
+loaded per worker. Each worker then sets its own torch thread count and
+warms up before taking traffic.
+
+Unless GUNICORN_WORKERS is set, the worker count comes from the serving
+config (``scripts/tune_serving.py`` output, or a split derived from the
+detected CPU topology); workers read their torch thread counts from it too.
+With more than one worker, /ask contexts default to the shared SQLite store.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.utils.serving_config import resolve_serving_config  # noqa: E402
+
+_serving_config = resolve_serving_config(
+    Path(os.getenv("SERVING_CONFIG_PATH", "backend/serving_config.json")),
+    os.getenv("SERVING_CONFIG_MODE", "auto").lower(),
+)
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("GUNICORN_WORKERS") or (_serving_config.workers if _serving_config else 2))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+wsgi_app = "backend.app:app"
+# Workers must share /predict contexts or /ask follow-ups lose them; set before the app is imported.
+os.environ.setdefault("CONTEXT_BACKEND", "sqlite" if workers > 1 else "memory")
+preload_app = True
+
+
+def _default_torch_threads() -> int | None:
+    if _serving_config is not None and workers == _serving_config.workers:
+        return None  # init_worker applies the serving config
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - non-Linux
+        cpus = os.cpu_count() or 1
+    return max(1, cpus // max(1, workers))
+
+
+def when_ready(server):
+    # Runs in the master after the app is imported and before workers fork.
+    from backend import app as sanity_app
+
+    sanity_app.prepare_for_fork()
+
+
+def post_fork(server, worker):
+    from backend import app as sanity_app
+
+    sanity_app.init_worker(torch_threads=_default_torch_threads())
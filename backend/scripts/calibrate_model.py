@@ -0,0 +1,107 @@
+"""
+Fit confidence calibration for the fine-tuned model on the validation split.
+
+The calibrator is written next to the weights
+(``sanity_model.calibration.json``); the Flask app applies it to every
+transformer prediction before comparing against ``CONFIDENCE_THRESHOLD``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import torch
+
+try:
+    from ..utils import get_logger, predict_probabilities, update_progress_log
+    from ..utils.calibration import METHOD_ISOTONIC, METHOD_TEMPERATURE, default_calibration_path, fit_calibrator
+    from ..utils.model_loader import load_classifier
+except ImportError:  # pragma: no cover - script mode
+    import sys
+
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+    from utils import get_logger, predict_probabilities, update_progress_log
+    from utils.calibration import METHOD_ISOTONIC, METHOD_TEMPERATURE, default_calibration_path, fit_calibrator
+    from utils.model_loader import load_classifier
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+PROCESSED_DIR = BASE_DIR / "data" / "processed"
+MODEL_DIR = BASE_DIR / "model" / "distilbert"
+FINE_TUNED_MODEL_PATH = BASE_DIR / "model" / "sanity_model.safetensors"
+CALIBRATION_PATH = Path(os.getenv("CALIBRATION_PATH", str(default_calibration_path(FINE_TUNED_MODEL_PATH))))
+
+logger = get_logger(__name__)
+
+
+def model_probabilities(csv_path: Path, batch_size: int = 32) -> tuple[np.ndarray, list[int]]:
+    """Raw (uncalibrated) softmax probabilities of the fine-tuned model on a labelled CSV."""
+    df = pd.read_csv(csv_path)
+    if "text" not in df.columns or "label" not in df.columns:
+        raise ValueError("CSV must have 'text' and 'label' columns.")
+    texts = df["text"].fillna("").astype(str).tolist()
+    labels = df["label"].astype(int).tolist()
+    logger.info("Loaded %d labelled samples from %s", len(texts), csv_path)
+
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    tokenizer, model = load_classifier(MODEL_DIR, FINE_TUNED_MODEL_PATH, device=device)
+    return predict_probabilities(texts, tokenizer, model, device, batch_size=batch_size), labels
+
+
+def calibrate(val_path: Path, output_path: Path, method: str, batch_size: int = 32):
+    probs, labels = model_probabilities(val_path, batch_size=batch_size)
+    calibrator = fit_calibrator(probs, labels, method=method)
+    calibrator.save(output_path)
+    metrics = calibrator.metrics
+
+    print("\n" + "=" * 60)
+    print(f"CONFIDENCE CALIBRATION ({method})")
+    print("=" * 60)
+    print(f"\nValidation Set Size: {metrics['samples']}")
+    if method == METHOD_TEMPERATURE:
+        print(f"Temperature: {calibrator.temperature:.4f}")
+    print(f"{'':12}{'NLL':>10}{'ECE':>10}")
+    print(f"{'raw':12}{metrics['nll_before']:>10.4f}{metrics['ece_before']:>10.4f}")
+    print(f"{'calibrated':12}{metrics['nll_after']:>10.4f}{metrics['ece_after']:>10.4f}")
+    print(f"\nSaved calibration to {output_path}")
+
+    update_progress_log(
+        f"Calibrated model ({method}): ECE {metrics['ece_before']:.4f} -> {metrics['ece_after']:.4f}"
+    )
+    return calibrator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit temperature or isotonic calibration on the validation set.")
+    parser.add_argument(
+        "--val-csv",
+        type=str,
+        default=str(PROCESSED_DIR / "val.csv"),
+        help="Path to validation CSV file",
+    )
+    parser.add_argument(
+        "--method",
+        choices=[METHOD_TEMPERATURE, METHOD_ISOTONIC],
+        default=METHOD_TEMPERATURE,
+        help="Temperature scaling (one parameter, robust on small sets) or isotonic regression",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=str(CALIBRATION_PATH),
+        help="Where to write the calibration JSON (defaults next to the model weights)",
+    )
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    val_path = Path(args.val_csv)
+    if not val_path.exists():
+        raise FileNotFoundError(f"Validation CSV not found: {val_path}")
+    calibrate(val_path, Path(args.output), args.method, batch_size=args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Convert legacy torch weights (sanity_model.bin) to the canonical safetensors artifact.
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+try:
+    from ..utils import get_logger, update_progress_log
+    from ..utils.model_loader import ModelLoadError, build_classifier, convert_to_safetensors
+except ImportError:  # pragma: no cover - script mode
+    import sys
+
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+    from utils import get_logger, update_progress_log
+    from utils.model_loader import ModelLoadError, build_classifier, convert_to_safetensors
+
+from transformers import DistilBertConfig
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+MODEL_DIR = BASE_DIR / "model" / "distilbert"
+
+logger = get_logger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert a .bin state dict to safetensors.")
+    parser.add_argument("source", type=str, help="Legacy .bin weights file")
+    parser.add_argument("--output", type=str, default=None, help="Destination (defaults to <source>.safetensors)")
+    parser.add_argument("--model-dir", type=str, default=str(MODEL_DIR), help="Directory with config.json")
+    args = parser.parse_args()
+
+    destination = convert_to_safetensors(Path(args.source), Path(args.output) if args.output else None)
+    # Validate the converted file against the architecture before anyone serves it.
+    config = DistilBertConfig.from_pretrained(args.model_dir, local_files_only=True)
+    try:
+        build_classifier(config, destination)
+    except ModelLoadError:
+        destination.unlink(missing_ok=True)
+        raise
+    update_progress_log(f"Converted fine-tuned weights to {destination}.")
+
+
+if __name__ == "__main__":
+    main()
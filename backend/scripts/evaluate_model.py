@@ -5,6 +5,8 @@ Evaluate the fine-tuned model and generate confusion matrix.
 from __future__ import annotations
 
 import argparse
+import os
+import time
 from pathlib import Path
 
 import numpy as np
@@ -19,63 +21,40 @@ from sklearn.metrics import (
 from transformers import DistilBertForSequenceClassification, DistilBertTokenizerFast
 
 try:
-    from ..utils import get_logger, update_progress_log
+    from ..utils import get_logger, get_quantized_model, predict_probabilities, update_progress_log
+    from ..utils.cascade import LinearCascade, cascade_sweep
+    from ..utils.early_exit import default_heads_path, load_early_exit_model
+    from ..utils.model_loader import load_classifier
 except ImportError:  # pragma: no cover - script mode
     import sys
 
     sys.path.append(str(Path(__file__).resolve().parent.parent))
-    from utils import get_logger, update_progress_log
+    from utils import get_logger, get_quantized_model, predict_probabilities, update_progress_log
+    from utils.cascade import LinearCascade, cascade_sweep
+    from utils.early_exit import default_heads_path, load_early_exit_model
+    from utils.model_loader import load_classifier
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 PROCESSED_DIR = BASE_DIR / "data" / "processed"
 MODEL_DIR = BASE_DIR / "model" / "distilbert"
-FINE_TUNED_MODEL_PATH = BASE_DIR / "model" / "sanity_model.bin"
+FINE_TUNED_MODEL_PATH = BASE_DIR / "model" / "sanity_model.safetensors"
+LINEAR_MODEL_PATH = Path(os.getenv("LINEAR_MODEL_PATH", str(BASE_DIR / "model" / "linear_model.joblib")))
 
 logger = get_logger(__name__)
 
 
-def load_model_and_tokenizer():
+def load_model_and_tokenizer(device: torch.device | None = None):
     """Load fine-tuned model and tokenizer."""
-    tokenizer = DistilBertTokenizerFast.from_pretrained(MODEL_DIR)
-    model = DistilBertForSequenceClassification.from_pretrained(MODEL_DIR)
-    
-    if FINE_TUNED_MODEL_PATH.exists():
-        state_dict = torch.load(FINE_TUNED_MODEL_PATH, map_location="cpu")
-        model.load_state_dict(state_dict, strict=False)
-        logger.info("Loaded fine-tuned weights from %s", FINE_TUNED_MODEL_PATH)
-    
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    model.to(device)
-    model.eval()
+    device = device or torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    tokenizer, model = load_classifier(MODEL_DIR, FINE_TUNED_MODEL_PATH, device=device)
     return tokenizer, model, device
 
 
 def predict_batch(texts: list[str], tokenizer, model, device, batch_size: int = 32):
-    """Run inference on a batch of texts."""
-    all_predictions = []
-    all_probs = []
-    
-    for i in range(0, len(texts), batch_size):
-        batch_texts = texts[i : i + batch_size]
-        inputs = tokenizer(
-            batch_texts,
-            padding="max_length",
-            truncation=True,
-            max_length=512,
-            return_tensors="pt",
-        )
-        inputs = {k: v.to(device) for k, v in inputs.items()}
-        
-        with torch.no_grad():
-            outputs = model(**inputs)
-            logits = outputs.logits
-            probs = torch.softmax(logits, dim=-1).cpu().numpy()
-            predictions = np.argmax(probs, axis=-1)
-        
-        all_predictions.extend(predictions.tolist())
-        all_probs.extend(probs.tolist())
-    
-    return np.array(all_predictions), np.array(all_probs)
+    """Run inference on a batch of texts (length-bucketed, padded per batch)."""
+    probs = predict_probabilities(texts, tokenizer, model, device, batch_size=batch_size)
+    predictions = np.argmax(probs, axis=-1)
+    return predictions, probs
 
 
 def evaluate(test_path: Path, output_dir: Path | None = None):
@@ -200,6 +179,160 @@ def evaluate(test_path: Path, output_dir: Path | None = None):
     }
 
 
+def _load_test_set(test_path: Path) -> tuple[list[str], list[int]]:
+    test_df = pd.read_csv(test_path)
+    if "text" not in test_df.columns or "label" not in test_df.columns:
+        raise ValueError("Test CSV must have 'text' and 'label' columns.")
+    return test_df["text"].fillna("").astype(str).tolist(), test_df["label"].astype(int).tolist()
+
+
+def _timed_metrics(texts, true_labels, tokenizer, model, device, batch_size: int) -> dict:
+    started = time.perf_counter()
+    predictions, _ = predict_batch(texts, tokenizer, model, device, batch_size=batch_size)
+    elapsed = time.perf_counter() - started
+    _, _, f1, _ = precision_recall_fscore_support(
+        true_labels, predictions, average="binary", zero_division=0
+    )
+    return {
+        "accuracy": accuracy_score(true_labels, predictions),
+        "f1": f1,
+        "seconds": elapsed,
+        "predictions": predictions,
+    }
+
+
+def evaluate_quantized_parity(test_path: Path, batch_size: int = 32):
+    """Compare the INT8 dynamic-quantized backend against fp32 on CPU."""
+    texts, true_labels = _load_test_set(test_path)
+    logger.info("Loaded %d test samples for INT8 parity check", len(texts))
+
+    cpu = torch.device("cpu")
+    tokenizer, fp32_model, _ = load_model_and_tokenizer(device=cpu)
+    fp32 = _timed_metrics(texts, true_labels, tokenizer, fp32_model, cpu, batch_size)
+
+    int8_model = get_quantized_model(
+        lambda: DistilBertForSequenceClassification(fp32_model.config),
+        lambda: fp32_model,
+        FINE_TUNED_MODEL_PATH,
+    )
+    int8 = _timed_metrics(texts, true_labels, tokenizer, int8_model, cpu, batch_size)
+
+    agreement = float(np.mean(fp32["predictions"] == int8["predictions"]))
+    speedup = fp32["seconds"] / int8["seconds"] if int8["seconds"] else float("inf")
+
+    print("\n" + "=" * 60)
+    print("INT8 QUANTIZATION PARITY (CPU)")
+    print("=" * 60)
+    print(f"\nTest Set Size: {len(texts)}")
+    print(f"{'':12}{'Accuracy':>10}{'F1':>10}{'Seconds':>10}")
+    print(f"{'fp32':12}{fp32['accuracy']:>10.4f}{fp32['f1']:>10.4f}{fp32['seconds']:>10.2f}")
+    print(f"{'int8':12}{int8['accuracy']:>10.4f}{int8['f1']:>10.4f}{int8['seconds']:>10.2f}")
+    print(f"\nAccuracy delta: {int8['accuracy'] - fp32['accuracy']:+.4f}")
+    print(f"F1 delta:       {int8['f1'] - fp32['f1']:+.4f}")
+    print(f"Prediction agreement: {agreement * 100:.2f}%")
+    print(f"Speedup: {speedup:.2f}x")
+
+    update_progress_log(
+        f"INT8 parity: accuracy delta {int8['accuracy'] - fp32['accuracy']:+.4f}, speedup {speedup:.2f}x"
+    )
+    return {
+        "accuracy_delta": int8["accuracy"] - fp32["accuracy"],
+        "f1_delta": int8["f1"] - fp32["f1"],
+        "agreement": agreement,
+        "speedup": speedup,
+    }
+
+
+def evaluate_cascade(test_path: Path, thresholds: list[float], batch_size: int = 32):
+    """Cascade accuracy and share of traffic that skips DistilBERT, per threshold."""
+    texts, true_labels = _load_test_set(test_path)
+    logger.info("Loaded %d test samples for cascade evaluation", len(texts))
+
+    cascade = LinearCascade.load(LINEAR_MODEL_PATH)
+    started = time.perf_counter()
+    linear_probs = cascade.predict_proba(texts)
+    linear_seconds = time.perf_counter() - started
+
+    tokenizer, model, device = load_model_and_tokenizer()
+    started = time.perf_counter()
+    _, transformer_probs = predict_batch(texts, tokenizer, model, device, batch_size=batch_size)
+    transformer_seconds = time.perf_counter() - started
+
+    rows = cascade_sweep(linear_probs, transformer_probs, true_labels, thresholds)
+    linear_ms = linear_seconds / len(texts) * 1000
+    transformer_ms = transformer_seconds / len(texts) * 1000
+    linear_acc = accuracy_score(true_labels, linear_probs.argmax(axis=-1))
+    transformer_acc = accuracy_score(true_labels, transformer_probs.argmax(axis=-1))
+
+    print("\n" + "=" * 60)
+    print("CASCADE EVALUATION (linear -> DistilBERT)")
+    print("=" * 60)
+    print(f"\nTest Set Size: {len(texts)}")
+    print(f"Linear only:      accuracy {linear_acc:.4f}  ({linear_ms:.2f} ms/article)")
+    print(f"DistilBERT only:  accuracy {transformer_acc:.4f}  ({transformer_ms:.2f} ms/article)")
+    print(f"\n{'Threshold':>10}{'Accuracy':>10}{'Skipped':>10}{'Lin. acc':>10}{'Est. ms':>10}")
+    for row in rows:
+        estimated_ms = linear_ms + (1 - row["skip_rate"]) * transformer_ms
+        row["estimated_ms_per_article"] = estimated_ms
+        print(
+            f"{row['threshold']:>10.2f}{row['accuracy']:>10.4f}{row['skip_rate'] * 100:>9.1f}%"
+            f"{row['linear_accuracy_on_skipped']:>10.4f}{estimated_ms:>10.2f}"
+        )
+
+    update_progress_log(
+        "Cascade sweep: "
+        + ", ".join(f"t={r['threshold']:.2f} acc={r['accuracy']:.4f} skip={r['skip_rate']:.0%}" for r in rows)
+    )
+    return rows
+
+
+def evaluate_early_exit(test_path: Path, thresholds: list[float], batch_size: int = 1):
+    """Average layers executed, latency saving and accuracy impact of early exit, per threshold."""
+    texts, true_labels = _load_test_set(test_path)
+    logger.info("Loaded %d test samples for early-exit evaluation", len(texts))
+
+    tokenizer, model, device = load_model_and_tokenizer()
+    full = _timed_metrics(texts, true_labels, tokenizer, model, device, batch_size)
+    _, exit_model = load_early_exit_model(
+        MODEL_DIR, FINE_TUNED_MODEL_PATH, default_heads_path(FINE_TUNED_MODEL_PATH), device=device
+    )
+    full_ms = full["seconds"] / len(texts) * 1000
+
+    print("\n" + "=" * 60)
+    print("EARLY-EXIT EVALUATION")
+    print("=" * 60)
+    print(f"\nTest Set Size: {len(texts)} (batch size {batch_size})")
+    print(f"Full model: accuracy {full['accuracy']:.4f}, {full_ms:.2f} ms/article, {exit_model.config.n_layers} layers")
+    print(f"\n{'Threshold':>10}{'Accuracy':>10}{'Delta':>9}{'Avg layers':>12}{'ms/article':>12}{'Saving':>9}")
+    rows = []
+    for threshold in thresholds:
+        exit_model.threshold = threshold
+        exit_model.reset_stats()
+        metrics = _timed_metrics(texts, true_labels, tokenizer, exit_model, device, batch_size)
+        ms = metrics["seconds"] / len(texts) * 1000
+        row = {
+            "threshold": threshold,
+            "accuracy": metrics["accuracy"],
+            "accuracy_delta": metrics["accuracy"] - full["accuracy"],
+            "avg_layers": exit_model.stats()["avg_layers_executed"],
+            "ms_per_article": ms,
+            "latency_saving": 1 - ms / full_ms if full_ms else 0.0,
+        }
+        rows.append(row)
+        print(
+            f"{threshold:>10.2f}{row['accuracy']:>10.4f}{row['accuracy_delta']:>+9.4f}"
+            f"{row['avg_layers']:>12.2f}{ms:>12.2f}{row['latency_saving'] * 100:>8.1f}%"
+        )
+
+    update_progress_log(
+        "Early-exit sweep: "
+        + ", ".join(
+            f"t={r['threshold']:.2f} layers={r['avg_layers']:.2f} saving={r['latency_saving']:.0%}" for r in rows
+        )
+    )
+    return rows
+
+
 def main():
     parser = argparse.ArgumentParser(description="Evaluate fine-tuned model and generate confusion matrix.")
     parser.add_argument(
@@ -214,12 +347,48 @@ def main():
         default=None,
         help="Directory to save confusion matrix and report (optional)",
     )
+    parser.add_argument(
+        "--parity",
+        action="store_true",
+        help="Compare the INT8 quantized backend against fp32 (accuracy/F1 delta and speedup)",
+    )
+    parser.add_argument(
+        "--cascade-thresholds",
+        type=str,
+        default=None,
+        help="Comma-separated linear-stage thresholds (e.g. 0.8,0.9,0.95) to evaluate the cascade",
+    )
+    parser.add_argument(
+        "--early-exit",
+        action="store_true",
+        help="Evaluate the early-exit backend (average layers, latency saving, accuracy delta)",
+    )
+    parser.add_argument(
+        "--exit-thresholds",
+        type=str,
+        default="0.8,0.9,0.95",
+        help="Comma-separated exit thresholds for --early-exit",
+    )
     args = parser.parse_args()
     
     test_path = Path(args.test_csv)
     if not test_path.exists():
         raise FileNotFoundError(f"Test CSV not found: {test_path}")
     
+    if args.parity:
+        evaluate_quantized_parity(test_path)
+        return
+
+    if args.early_exit:
+        thresholds = [float(value) for value in args.exit_thresholds.split(",") if value.strip()]
+        evaluate_early_exit(test_path, thresholds)
+        return
+
+    if args.cascade_thresholds:
+        thresholds = [float(value) for value in args.cascade_thresholds.split(",") if value.strip()]
+        evaluate_cascade(test_path, thresholds)
+        return
+
     output_dir = Path(args.output_dir) if args.output_dir else None
     evaluate(test_path, output_dir)
 
@@ -0,0 +1,123 @@
+"""
+Export the fine-tuned DistilBERT classifier to ONNX for ONNX Runtime serving.
+"""
+
+from __future__ import annotations
+
+import argparse
+import inspect
+import os
+from pathlib import Path
+
+import pandas as pd
+import torch
+from transformers import DistilBertForSequenceClassification, DistilBertTokenizerFast
+
+try:
+    from ..utils import get_logger, update_progress_log
+    from ..utils.model_loader import load_classifier
+    from ..utils.onnx_backend import (
+        ONNX_INPUT_NAMES,
+        ONNX_OUTPUT_NAMES,
+        OnnxSequenceClassifier,
+        check_onnx_equivalence,
+        create_session,
+    )
+except ImportError:  # pragma: no cover - script mode
+    import sys
+
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+    from utils import get_logger, update_progress_log
+    from utils.model_loader import load_classifier
+    from utils.onnx_backend import (
+        ONNX_INPUT_NAMES,
+        ONNX_OUTPUT_NAMES,
+        OnnxSequenceClassifier,
+        check_onnx_equivalence,
+        create_session,
+    )
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+PROCESSED_DIR = BASE_DIR / "data" / "processed"
+MODEL_DIR = Path(os.getenv("MODEL_DIR", str(BASE_DIR / "model" / "distilbert")))
+FINE_TUNED_MODEL_PATH = Path(os.getenv("FINE_TUNED_MODEL_PATH", str(BASE_DIR / "model" / "sanity_model.safetensors")))
+
+logger = get_logger(__name__)
+
+FALLBACK_SAMPLES = [
+    "Breaking: officials confirm the new policy takes effect next week.",
+    "Scientists reveal shocking secret that doctors don't want you to know!",
+    "The city council met on Tuesday to discuss the annual budget. " * 40,
+]
+
+
+def load_fine_tuned_model() -> tuple[DistilBertTokenizerFast, DistilBertForSequenceClassification]:
+    return load_classifier(MODEL_DIR, FINE_TUNED_MODEL_PATH)
+
+
+def export_onnx(model: DistilBertForSequenceClassification, tokenizer, output_path: Path, opset: int) -> None:
+    """Export with dynamic batch and sequence axes."""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    dummy = tokenizer(["dynamic axes example", "a second, longer example sentence"], padding=True, return_tensors="pt")
+    dynamic_axes = {
+        "input_ids": {0: "batch", 1: "sequence"},
+        "attention_mask": {0: "batch", 1: "sequence"},
+        "logits": {0: "batch"},
+    }
+    export_kwargs = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        # The TorchScript exporter honours dynamic_axes on every torch version we support.
+        export_kwargs["dynamo"] = False
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (dummy["input_ids"], dummy["attention_mask"]),
+            str(output_path),
+            input_names=list(ONNX_INPUT_NAMES),
+            output_names=list(ONNX_OUTPUT_NAMES),
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            do_constant_folding=True,
+            **export_kwargs,
+        )
+    logger.info("Exported ONNX model to %s", output_path)
+
+
+def load_sample_texts(limit: int) -> list[str]:
+    """Pick verification samples from test.csv, falling back to built-in examples."""
+    test_path = PROCESSED_DIR / "test.csv"
+    if test_path.exists():
+        texts = pd.read_csv(test_path)["text"].fillna("").astype(str).tolist()[:limit]
+        if texts:
+            return texts
+    return FALLBACK_SAMPLES[:limit]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export the fine-tuned DistilBERT to ONNX.")
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=str(FINE_TUNED_MODEL_PATH.with_suffix(".onnx")),
+        help="Destination .onnx file",
+    )
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--atol", type=float, default=1e-4, help="Max allowed logit difference vs PyTorch")
+    parser.add_argument("--samples", type=int, default=8, help="Number of texts used for the equivalence check")
+    parser.add_argument("--skip-verify", action="store_true", help="Skip the PyTorch output-equivalence check")
+    args = parser.parse_args()
+
+    output_path = Path(args.output)
+    tokenizer, model = load_fine_tuned_model()
+    export_onnx(model, tokenizer, output_path, args.opset)
+
+    if not args.skip_verify:
+        onnx_model = OnnxSequenceClassifier(create_session(output_path))
+        max_diff = check_onnx_equivalence(model, onnx_model, tokenizer, load_sample_texts(args.samples), atol=args.atol)
+        logger.info("ONNX output matches PyTorch (max abs logit diff %.2e).", max_diff)
+
+    update_progress_log(f"Exported ONNX model to {output_path}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Report resident vs shared memory for a Gunicorn master and its workers.
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+try:
+    from ..utils import child_pids, process_memory
+except ImportError:  # pragma: no cover - script mode
+    import sys
+
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+    from utils import child_pids, process_memory
+
+
+def _mb(value: int) -> str:
+    return f"{value / (1024 * 1024):10.1f}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Show per-worker resident/shared memory (Linux only).")
+    parser.add_argument("--pid", type=int, required=True, help="Gunicorn master PID")
+    args = parser.parse_args()
+
+    rows = [("master", process_memory(args.pid))]
+    rows += [("worker", process_memory(pid)) for pid in child_pids(args.pid)]
+    rows = [(role, mem) for role, mem in rows if mem]
+    if not rows:
+        raise SystemExit(f"No memory information available for PID {args.pid}.")
+
+    print(f"{'role':8}{'pid':>8}{'RSS MB':>11}{'shared MB':>11}{'private MB':>11}{'PSS MB':>11}")
+    for role, mem in rows:
+        pss = _mb(mem["pss_bytes"]) if "pss_bytes" in mem else f"{'n/a':>10}"
+        print(
+            f"{role:8}{mem['pid']:>8} {_mb(mem['rss_bytes'])} {_mb(mem['shared_bytes'])} "
+            f"{_mb(mem['private_bytes'])} {pss}"
+        )
+
+    workers = [mem for role, mem in rows if role == "worker"]
+    if workers:
+        avg_private = sum(mem["private_bytes"] for mem in workers) / len(workers)
+        print(f"\nWorkers: {len(workers)} | average private per worker: {avg_private / (1024 * 1024):.1f} MB")
+        if all("pss_bytes" in mem for _, mem in rows):
+            total_pss = sum(mem["pss_bytes"] for _, mem in rows)
+            print(f"Total proportional footprint (PSS): {total_pss / (1024 * 1024):.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
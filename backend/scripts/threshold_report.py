@@ -0,0 +1,172 @@
+"""
+Expected LLM verification rate versus accuracy for each confidence threshold.
+
+Articles whose (calibrated) confidence falls below ``CONFIDENCE_THRESHOLD``
+are auto-verified with Groq. This report sweeps thresholds on a labelled
+split and, given an LLM budget, recommends the highest threshold whose
+verification rate stays within it. Writes a CSV, plus a plot when
+matplotlib is installed.
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    from ..utils import get_logger, update_progress_log
+    from ..utils.calibration import load_calibrator, recommend_threshold, threshold_sweep
+    from .calibrate_model import CALIBRATION_PATH, PROCESSED_DIR, model_probabilities
+except ImportError:  # pragma: no cover - script mode
+    import sys
+
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+    from utils import get_logger, update_progress_log
+    from utils.calibration import load_calibrator, recommend_threshold, threshold_sweep
+    from calibrate_model import CALIBRATION_PATH, PROCESSED_DIR, model_probabilities
+
+try:
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+except ImportError:  # pragma: no cover - optional
+    plt = None
+
+logger = get_logger(__name__)
+
+
+def plot_report(rows: list[dict], output_path: Path, recommended: dict | None, budget: float | None) -> None:
+    thresholds = [row["threshold"] for row in rows]
+    fig, rate_axis = plt.subplots(figsize=(8, 5))
+    rate_axis.plot(thresholds, [row["verification_rate"] * 100 for row in rows], color="tab:orange")
+    rate_axis.set_xlabel("Confidence threshold")
+    rate_axis.set_ylabel("Sent to LLM verification (%)", color="tab:orange")
+    if budget is not None:
+        rate_axis.axhline(budget * 100, color="tab:orange", linestyle=":", label="LLM budget")
+    accuracy_axis = rate_axis.twinx()
+    accuracy_axis.plot(thresholds, [row["accepted_accuracy"] for row in rows], label="Accepted accuracy")
+    if "expected_accuracy" in rows[0]:
+        accuracy_axis.plot(thresholds, [row["expected_accuracy"] for row in rows], label="Expected accuracy")
+    accuracy_axis.set_ylabel("Accuracy")
+    if recommended:
+        accuracy_axis.axvline(recommended["threshold"], color="grey", linestyle="--", label="Recommended")
+    accuracy_axis.legend(loc="lower right")
+    fig.tight_layout()
+    fig.savefig(output_path, dpi=120)
+    plt.close(fig)
+
+
+def threshold_report(
+    csv_path: Path,
+    thresholds: list[float],
+    output_dir: Path,
+    max_verification_rate: float | None = None,
+    llm_accuracy: float | None = None,
+    calibrated: bool = True,
+):
+    probs, labels = model_probabilities(csv_path)
+    calibrator = load_calibrator(CALIBRATION_PATH) if calibrated else None
+    if calibrator is not None:
+        probs = calibrator.apply(probs)
+    elif calibrated:
+        logger.warning("No calibration at %s; reporting raw softmax confidences.", CALIBRATION_PATH)
+
+    rows = threshold_sweep(probs, labels, thresholds, llm_accuracy=llm_accuracy)
+    recommended = recommend_threshold(rows, max_verification_rate) if max_verification_rate is not None else None
+
+    print("\n" + "=" * 60)
+    print(f"VERIFICATION THRESHOLD REPORT ({calibrator.method if calibrator else 'raw'} confidences)")
+    print("=" * 60)
+    print(f"\nSamples: {len(labels)}   Model accuracy: {rows[0]['model_accuracy']:.4f}")
+    header = f"{'Threshold':>10}{'To LLM':>10}{'Accepted acc':>14}"
+    print("\n" + header + (f"{'Expected acc':>14}" if llm_accuracy is not None else ""))
+    for row in rows:
+        line = f"{row['threshold']:>10.2f}{row['verification_rate'] * 100:>9.1f}%{row['accepted_accuracy']:>14.4f}"
+        if llm_accuracy is not None:
+            line += f"{row['expected_accuracy']:>14.4f}"
+        print(line)
+
+    if max_verification_rate is not None:
+        if recommended:
+            print(
+                f"\nRecommended: CONFIDENCE_THRESHOLD={recommended['threshold']:.2f} "
+                f"({recommended['verification_rate'] * 100:.1f}% of articles verified, "
+                f"budget {max_verification_rate * 100:.1f}%)"
+            )
+        else:
+            print(f"\nNo threshold keeps verification within {max_verification_rate * 100:.1f}%.")
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    csv_out = output_dir / "threshold_report.csv"
+    pd.DataFrame(rows).to_csv(csv_out, index=False)
+    logger.info("Saved threshold sweep to %s", csv_out)
+    if plt is not None:
+        plot_path = output_dir / "threshold_report.png"
+        plot_report(rows, plot_path, recommended, max_verification_rate)
+        logger.info("Saved threshold plot to %s", plot_path)
+    else:
+        logger.info("matplotlib not installed; skipping the plot (CSV written).")
+
+    if recommended:
+        update_progress_log(
+            f"Threshold report: recommend {recommended['threshold']:.2f} "
+            f"({recommended['verification_rate']:.0%} verified, accepted acc {recommended['accepted_accuracy']:.4f})"
+        )
+    return rows, recommended
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep confidence thresholds: LLM verification rate vs accuracy.")
+    parser.add_argument(
+        "--csv",
+        type=str,
+        default=str(PROCESSED_DIR / "test.csv"),
+        help="Labelled CSV to evaluate on (use a split the calibrator was not fitted on)",
+    )
+    parser.add_argument(
+        "--thresholds",
+        type=str,
+        default=",".join(f"{value:.2f}" for value in np.arange(0.50, 1.0, 0.02)),
+        help="Comma-separated thresholds to evaluate",
+    )
+    parser.add_argument(
+        "--max-verification-rate",
+        type=float,
+        default=None,
+        help="LLM budget as the fraction of articles that may be verified (e.g. 0.1)",
+    )
+    parser.add_argument(
+        "--llm-accuracy",
+        type=float,
+        default=None,
+        help="Assumed accuracy of LLM verdicts, to estimate end-to-end accuracy",
+    )
+    parser.add_argument("--raw", action="store_true", help="Ignore the calibration file")
+    parser.add_argument(
+        "--output-dir",
+        type=str,
+        default=str(Path(__file__).resolve().parent.parent / "reports"),
+        help="Directory for threshold_report.csv / .png",
+    )
+    args = parser.parse_args()
+
+    csv_path = Path(args.csv)
+    if not csv_path.exists():
+        raise FileNotFoundError(f"CSV not found: {csv_path}")
+    thresholds = [float(value) for value in args.thresholds.split(",") if value.strip()]
+    threshold_report(
+        csv_path,
+        thresholds,
+        Path(args.output_dir),
+        max_verification_rate=args.max_verification_rate,
+        llm_accuracy=args.llm_accuracy,
+        calibrated=not args.raw,
+    )
+
+
+if __name__ == "__main__":
+    main()
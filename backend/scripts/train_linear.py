@@ -0,0 +1,104 @@
+"""
+Train the TF-IDF + logistic-regression first stage of the /predict cascade.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from pathlib import Path
+
+import joblib
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, precision_recall_fscore_support
+from sklearn.pipeline import Pipeline
+
+try:
+    from ..utils import get_logger, update_progress_log
+    from ..utils.cascade import LinearCascade
+except ImportError:  # pragma: no cover - script mode
+    import sys
+
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+    from utils import get_logger, update_progress_log
+    from utils.cascade import LinearCascade
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+PROCESSED_DIR = BASE_DIR / "data" / "processed"
+LINEAR_MODEL_PATH = Path(os.getenv("LINEAR_MODEL_PATH", str(BASE_DIR / "model" / "linear_model.joblib")))
+
+logger = get_logger(__name__)
+
+
+def build_pipeline(max_features: int, c: float) -> Pipeline:
+    return Pipeline(
+        [
+            (
+                "tfidf",
+                TfidfVectorizer(
+                    lowercase=True,
+                    ngram_range=(1, 2),
+                    min_df=2,
+                    max_features=max_features,
+                    sublinear_tf=True,
+                ),
+            ),
+            ("clf", LogisticRegression(C=c, max_iter=1000)),
+        ]
+    )
+
+
+def _load_split(name: str) -> pd.DataFrame:
+    path = PROCESSED_DIR / f"{name}.csv"
+    if not path.exists():
+        raise FileNotFoundError("Processed datasets missing. Run preprocess_data.py first.")
+    df = pd.read_csv(path)
+    df["text"] = df["text"].fillna("").astype(str)
+    df["label"] = df["label"].astype(int)
+    return df
+
+
+def train_linear(max_features: int, c: float, threshold: float, output: Path) -> None:
+    train_df = _load_split("train")
+    val_df = _load_split("val")
+
+    logger.info("Training TF-IDF + logistic regression on %d articles.", len(train_df))
+    pipeline = build_pipeline(max_features, c)
+    pipeline.fit(train_df["text"], train_df["label"])
+
+    cascade = LinearCascade(pipeline, threshold=threshold)
+    probs = cascade.predict_proba(val_df["text"].tolist())
+    predictions = probs.argmax(axis=-1)
+    accuracy = accuracy_score(val_df["label"], predictions)
+    _, _, f1, _ = precision_recall_fscore_support(val_df["label"], predictions, average="binary", zero_division=0)
+    confident = cascade.confident(probs)
+    confident_accuracy = accuracy_score(val_df["label"][confident], predictions[confident]) if confident.any() else 0.0
+    logger.info(
+        "Validation | accuracy=%.4f f1=%.4f | threshold %.2f decides %.1f%% at accuracy %.4f",
+        accuracy,
+        f1,
+        threshold,
+        confident.mean() * 100,
+        confident_accuracy,
+    )
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(pipeline, output)
+    logger.info("Linear model saved to %s", output)
+    update_progress_log(f"Trained linear cascade model (val accuracy {accuracy:.4f}).")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train the linear first stage of the prediction cascade.")
+    parser.add_argument("--max-features", type=int, default=200_000)
+    parser.add_argument("--c", type=float, default=4.0, help="Inverse regularisation strength")
+    parser.add_argument("--threshold", type=float, default=0.9, help="Cascade threshold reported on val")
+    parser.add_argument("--output", type=str, default=str(LINEAR_MODEL_PATH))
+    args = parser.parse_args()
+    train_linear(args.max_features, args.c, args.threshold, Path(args.output))
+
+
+if __name__ == "__main__":
+    main()
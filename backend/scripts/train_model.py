@@ -22,16 +22,21 @@ from transformers import (
 
 try:
     from ..utils import get_logger, update_progress_log
+    from ..utils.early_exit import EarlyExitClassifier, default_heads_path, save_exit_heads
+    from ..utils.model_loader import load_classifier, save_classifier
 except ImportError:  # pragma: no cover - script mode
     import sys
 
     sys.path.append(str(Path(__file__).resolve().parent.parent))
     from utils import get_logger, update_progress_log
+    from utils.early_exit import EarlyExitClassifier, default_heads_path, save_exit_heads
+    from utils.model_loader import load_classifier, save_classifier
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 PROCESSED_DIR = BASE_DIR / "data" / "processed"
 MODEL_DIR = BASE_DIR / "model" / "distilbert"
-FINE_TUNED_MODEL_PATH = BASE_DIR / "model" / "sanity_model.bin"
+FINE_TUNED_MODEL_PATH = BASE_DIR / "model" / "sanity_model.safetensors"
+EARLY_EXIT_HEADS_PATH = default_heads_path(FINE_TUNED_MODEL_PATH)
 
 logger = get_logger(__name__)
 
@@ -98,7 +103,6 @@ def train_model(epochs: int, batch_size: int, max_len: int, learning_rate: float
         logging_strategy="steps",
         logging_steps=100,
         report_to=None,
-        save_safetensors=False,
     )
 
     trainer = Trainer(
@@ -112,24 +116,75 @@ def train_model(epochs: int, batch_size: int, max_len: int, learning_rate: float
     logger.info("Starting training for %s epochs.", epochs)
     update_progress_log("Started DistilBERT fine-tuning run.")
     trainer.train()
-    try:
-        trainer.save_model(MODEL_DIR)
-    except Exception as exc:  # pragma: no cover - windows file lock fallback
-        logger.warning("trainer.save_model failed (%s). Saving manually.", exc)
-        model.save_pretrained(MODEL_DIR, safe_serialization=False)
-
-    torch.save(model.state_dict(), FINE_TUNED_MODEL_PATH)
+    # One artifact: config/tokenizer in MODEL_DIR, weights once as safetensors.
+    save_classifier(trainer.model, tokenizer, MODEL_DIR, FINE_TUNED_MODEL_PATH)
     logger.info("Training complete. Model saved to %s", FINE_TUNED_MODEL_PATH)
     update_progress_log("Completed DistilBERT fine-tuning run.")
 
 
+def compute_exit_metrics(eval_pred) -> Dict[str, float]:
+    """Accuracy of each exit head (last column is the unchanged final classifier)."""
+    logits, labels = eval_pred
+    predictions = np.argmax(logits, axis=-1)  # (n, exits + 1)
+    metrics = {f"exit{idx + 1}_accuracy": accuracy_score(labels, predictions[:, idx]) for idx in range(logits.shape[1] - 1)}
+    metrics["final_accuracy"] = accuracy_score(labels, predictions[:, -1])
+    return metrics
+
+
+def train_exit_heads(epochs: int, batch_size: int, max_len: int, learning_rate: float, exit_layers: list[int]) -> None:
+    """Attach exit heads to the fine-tuned classifier and train only the heads."""
+    tokenizer, base = load_classifier(MODEL_DIR, FINE_TUNED_MODEL_PATH)
+    model = EarlyExitClassifier(base, exit_layers)
+    model.freeze_backbone()
+
+    train_dataset, val_dataset = load_datasets(tokenizer, max_len)
+    training_args = TrainingArguments(
+        output_dir=str(BASE_DIR / "model_output" / "early_exit"),
+        num_train_epochs=epochs,
+        per_device_train_batch_size=batch_size,
+        per_device_eval_batch_size=batch_size,
+        eval_strategy="epoch",
+        save_strategy="no",
+        learning_rate=learning_rate,
+        weight_decay=0.01,
+        logging_strategy="steps",
+        logging_steps=100,
+        report_to=None,
+    )
+    trainer = Trainer(
+        model=model,
+        args=training_args,
+        train_dataset=train_dataset,
+        eval_dataset=val_dataset,
+        compute_metrics=compute_exit_metrics,
+    )
+
+    logger.info("Training early-exit heads after layers %s for %s epochs.", model.exit_layers, epochs)
+    update_progress_log("Started early-exit head training run.")
+    trainer.train()
+    save_exit_heads(model, EARLY_EXIT_HEADS_PATH)
+    logger.info("Early-exit heads saved to %s", EARLY_EXIT_HEADS_PATH)
+    update_progress_log("Completed early-exit head training run.")
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Fine-tune DistilBERT for fake news detection.")
     parser.add_argument("--epochs", type=int, default=3)
     parser.add_argument("--batch-size", type=int, default=8)
     parser.add_argument("--max-len", type=int, default=256)
     parser.add_argument("--lr", type=float, default=3e-5)
+    parser.add_argument(
+        "--early-exit",
+        action="store_true",
+        help="Train intermediate exit heads on top of the already fine-tuned model (backbone frozen)",
+    )
+    parser.add_argument("--exit-layers", type=str, default="1,2,3,4,5", help="Layers followed by an exit head")
+    parser.add_argument("--exit-lr", type=float, default=5e-4, help="Learning rate for the exit heads")
     args = parser.parse_args()
+    if args.early_exit:
+        exit_layers = [int(layer) for layer in args.exit_layers.split(",") if layer.strip()]
+        train_exit_heads(args.epochs, args.batch_size, args.max_len, args.exit_lr, exit_layers)
+        return
     train_model(args.epochs, args.batch_size, args.max_len, args.lr)
 
 
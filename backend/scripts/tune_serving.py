@@ -0,0 +1,261 @@
+"""
+Benchmark worker x torch-thread splits on replayed articles and write serving_config.json.
+
+Each trial mirrors pre-fork serving: the model is loaded once in this process,
+``workers`` processes are forked, each sets its torch intra/inter-op threads,
+warms up and then pulls articles from a shared queue (one in flight per
+worker) through ``run_model_batch``. Reports p50/p99 latency and throughput
+per combination; the winner is written where the app and gunicorn.conf.py
+read it at startup.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import queue
+import random
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+import pandas as pd
+
+try:
+    from .. import app as sanity_app
+    from ..utils import get_logger, update_progress_log
+    from ..utils.serving_config import (
+        ServingConfig,
+        choose_best,
+        detect_topology,
+        save_serving_config,
+        summarize_run,
+    )
+except ImportError:  # pragma: no cover - script mode
+    import sys
+
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+    from backend import app as sanity_app
+    from backend.utils import get_logger, update_progress_log
+    from backend.utils.serving_config import (
+        ServingConfig,
+        choose_best,
+        detect_topology,
+        save_serving_config,
+        summarize_run,
+    )
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+PROCESSED_DIR = BASE_DIR / "data" / "processed"
+SERVING_CONFIG_PATH = Path(os.getenv("SERVING_CONFIG_PATH", str(BASE_DIR / "serving_config.json")))
+
+logger = get_logger(__name__)
+
+
+def load_articles(path: Path, limit: int, seed: int) -> List[str]:
+    """Replayable sample: ``limit`` articles from a CSV/JSONL with a ``text`` field, fixed by ``seed``."""
+    if path.suffix == ".jsonl":
+        texts = [json.loads(line).get("text", "") for line in path.read_text().splitlines() if line.strip()]
+    else:
+        texts = pd.read_csv(path)["text"].fillna("").astype(str).tolist()
+    texts = [text for text in texts if text.strip()]
+    if not texts:
+        raise ValueError(f"No articles found in {path}.")
+    if len(texts) > limit:
+        texts = random.Random(seed).sample(texts, limit)
+    return texts
+
+
+def _powers_of_two_up_to(limit: int) -> List[int]:
+    values = [1]
+    while values[-1] * 2 <= limit:
+        values.append(values[-1] * 2)
+    if values[-1] != limit:
+        values.append(limit)
+    return values
+
+
+def _parse_ints(value: str | None, default: Sequence[int]) -> List[int]:
+    if not value:
+        return list(default)
+    return sorted({int(part) for part in value.split(",") if part.strip()})
+
+
+def _worker_loop(
+    torch_threads: int,
+    interop_threads: int,
+    articles: Sequence[str],
+    warmup: int,
+    tasks: Any,
+    results: Any,
+    ready: Any,
+) -> None:
+    import torch
+
+    try:
+        torch.set_num_threads(torch_threads)
+        try:
+            torch.set_num_interop_threads(interop_threads)
+        except RuntimeError as exc:
+            logger.warning("Could not set inter-op threads: %s", exc)
+        for text in articles[:warmup]:
+            sanity_app.run_model_batch([text])
+        ready.wait()
+
+        latencies: List[float] = []
+        first_start = last_end = None
+        while True:
+            try:
+                index = tasks.get(timeout=1.0)
+            except queue.Empty:
+                break
+            if index is None:
+                break
+            started = time.perf_counter()
+            sanity_app.run_model_batch([articles[index]])
+            last_end = time.perf_counter()
+            first_start = first_start or started
+            latencies.append((last_end - started) * 1000)
+        results.put({"latencies": latencies, "start": first_start, "end": last_end})
+    except Exception as exc:  # pragma: no cover - surfaced by the parent
+        results.put({"error": repr(exc)})
+
+
+def run_trial(
+    workers: int,
+    torch_threads: int,
+    interop_threads: int,
+    articles: Sequence[str],
+    warmup: int,
+) -> Dict[str, Any]:
+    """Run one combination and return its latency/throughput summary."""
+    ctx = mp.get_context("fork")
+    tasks = ctx.Queue()
+    results = ctx.Queue()
+    ready = ctx.Barrier(workers + 1, timeout=600)
+    for index in range(len(articles)):
+        tasks.put(index)
+    for _ in range(workers):
+        tasks.put(None)
+
+    processes = [
+        ctx.Process(
+            target=_worker_loop,
+            args=(torch_threads, interop_threads, articles, warmup, tasks, results, ready),
+            daemon=True,
+        )
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    ready.wait()
+
+    outcomes = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    errors = [outcome["error"] for outcome in outcomes if "error" in outcome]
+    if errors:
+        raise RuntimeError(f"Trial workers={workers} threads={torch_threads} failed: {errors[0]}")
+    latencies = [ms for outcome in outcomes for ms in outcome["latencies"]]
+    starts = [outcome["start"] for outcome in outcomes if outcome["start"] is not None]
+    ends = [outcome["end"] for outcome in outcomes if outcome["end"] is not None]
+    wall = (max(ends) - min(starts)) if starts and ends else 0.0
+    return {
+        "workers": workers,
+        "torch_threads": torch_threads,
+        "interop_threads": interop_threads,
+        **summarize_run(latencies, wall),
+    }
+
+
+def main() -> None:
+    topology = detect_topology()
+    cores = topology.usable_cores
+
+    parser = argparse.ArgumentParser(description="Tune Gunicorn workers and torch threads for this box.")
+    parser.add_argument("--articles", type=str, default=str(PROCESSED_DIR / "test.csv"), help="CSV/JSONL with a text field")
+    parser.add_argument("--samples", type=int, default=200, help="Articles replayed per trial")
+    parser.add_argument("--seed", type=int, default=13, help="Sampling seed (keeps runs comparable)")
+    parser.add_argument("--warmup", type=int, default=3, help="Warm-up articles per worker (not timed)")
+    parser.add_argument("--workers", type=str, default=None, help="Comma-separated worker counts")
+    parser.add_argument("--threads", type=str, default=None, help="Comma-separated intra-op thread counts")
+    parser.add_argument("--interop", type=str, default="1", help="Comma-separated inter-op thread counts")
+    parser.add_argument("--objective", choices=("throughput", "latency"), default="throughput")
+    parser.add_argument("--max-p99-ms", type=float, default=None, help="p99 budget for the throughput objective")
+    parser.add_argument("--allow-oversubscribe", action="store_true", help="Also try workers*threads > CPUs")
+    parser.add_argument("--output", type=str, default=str(SERVING_CONFIG_PATH))
+    args = parser.parse_args()
+
+    articles = load_articles(Path(args.articles), args.samples, args.seed)
+    worker_counts = _parse_ints(args.workers, _powers_of_two_up_to(cores))
+    thread_counts = _parse_ints(args.threads, _powers_of_two_up_to(cores))
+    interop_counts = _parse_ints(args.interop, [1])
+    combos = [
+        (w, t, i)
+        for w in worker_counts
+        for t in thread_counts
+        for i in interop_counts
+        if args.allow_oversubscribe or w * t <= topology.logical_cpus
+    ]
+    if not combos:
+        parser.error("No worker/thread combination fits this box; pass --allow-oversubscribe.")
+
+    logger.info(
+        "Tuning on %s | %d articles | %d combinations", topology.fingerprint(), len(articles), len(combos)
+    )
+    # Load once in this process, exactly as the pre-fork master does.
+    sanity_app.prepare_for_fork()
+
+    results = []
+    for workers, threads, interop in combos:
+        result = run_trial(workers, threads, interop, articles, args.warmup)
+        results.append(result)
+        logger.info(
+            "workers=%d threads=%d interop=%d | p50=%.1fms p99=%.1fms throughput=%.2f/s",
+            workers,
+            threads,
+            interop,
+            result["p50_ms"],
+            result["p99_ms"],
+            result["throughput_rps"],
+        )
+
+    best = choose_best(results, args.objective, args.max_p99_ms)
+    print("\n" + "=" * 64)
+    print(f"{'workers':>8} {'threads':>8} {'interop':>8} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>9}")
+    for result in results:
+        marker = " *" if result is best else ""
+        print(
+            f"{result['workers']:>8} {result['torch_threads']:>8} {result['interop_threads']:>8} "
+            f"{result['p50_ms']:>9.1f} {result['p99_ms']:>9.1f} {result['throughput_rps']:>9.2f}{marker}"
+        )
+    print("=" * 64)
+
+    config = ServingConfig(
+        workers=best["workers"],
+        torch_threads=best["torch_threads"],
+        interop_threads=best["interop_threads"],
+        source="tuned",
+        topology=topology.fingerprint(),
+        benchmark={
+            "objective": args.objective,
+            "max_p99_ms": args.max_p99_ms,
+            "backend": sanity_app._active_backend,
+            "articles": str(args.articles),
+            "samples": len(articles),
+            "seed": args.seed,
+            "best": best,
+            "sweep": results,
+        },
+    )
+    save_serving_config(config, Path(args.output))
+    update_progress_log(
+        f"Tuned serving config: {config.workers} workers x {config.torch_threads} threads ({args.objective})."
+    )
+
+
+if __name__ == "__main__":
+    main()
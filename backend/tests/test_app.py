@@ -1,14 +1,24 @@
+import json
+import threading
+import time
 import types
 
+import numpy as np
 import pytest
 
 from backend import app as backend_app
+from backend.utils.cascade import LinearCascade
+from backend.utils.context_store import ContextStore
+from backend.utils.prompt_budget import GAP_MARKER, PromptBudget, TokenCounter
+from backend.utils.verification_controller import VerificationController
 
 
 @pytest.fixture()
 def client(monkeypatch):
     backend_app.app.testing = True
     monkeypatch.setattr(backend_app, "load_model", lambda: ("tokenizer", "model"))
+    monkeypatch.setattr(backend_app, "_verification_controller", VerificationController(max_calls_per_second=0))
+    backend_app._prediction_cache.clear()
     return backend_app.app.test_client()
 
 
@@ -31,6 +41,25 @@ def test_predict_success(client, monkeypatch):
     assert pytest.approx(data["confidence"], rel=1e-3) == 0.92
 
 
+
+def test_predict_without_room_for_the_context_returns_no_context_id(client, monkeypatch):
+    monkeypatch.setattr(backend_app, "_article_contexts", ContextStore(max_bytes=200))
+    monkeypatch.setattr(backend_app, "resolve_text", lambda payload: payload["text"])
+    monkeypatch.setattr(
+        backend_app,
+        "run_model_inference",
+        lambda text: {
+            "label": "Real",
+            "confidence": 0.92,
+            "needs_verification": False,
+            "probabilities": {"fake": 0.08, "real": 0.92},
+        },
+    )
+    response = client.post("/predict", json={"text": " ".join(f"token{index}" for index in range(2000))})
+    assert response.status_code == 200
+    assert response.get_json()["context_id"] is None
+    assert len(backend_app._article_contexts) == 0
+
 def test_predict_validation_error(client, monkeypatch):
     def raise_error(_payload):
         raise ValueError("No text provided.")
@@ -49,7 +78,7 @@ def test_verify_endpoint(client, monkeypatch):
     )
 
     class DummyGroq:
-        def verify_article(self, article_text):
+        def verify_article(self, article_text, bypass_cache=False):
             assert article_text == "sample"
             return dummy_response
 
@@ -61,6 +90,24 @@ def test_verify_endpoint(client, monkeypatch):
     assert "reasoning" in data
 
 
+
+def test_verify_endpoint_fits_long_articles_to_the_prompt_budget(client, monkeypatch):
+    sent = []
+
+    class DummyGroq:
+        def verify_article(self, article_text, bypass_cache=False):
+            sent.append(article_text)
+            return types.SimpleNamespace(prediction="Real", reasoning="Fine.", raw={})
+
+    budget = PromptBudget(TokenCounter(), budgets={"verify": 100})
+    monkeypatch.setattr(backend_app, "_prompt_budget", budget)
+    monkeypatch.setattr(backend_app, "get_groq_client", lambda: DummyGroq())
+    article = " ".join(f"Sentence number {index} adds another detail to the story." for index in range(300))
+    assert client.post("/verify", json={"article_text": article}).status_code == 200
+    assert GAP_MARKER in sent[0] and len(sent[0]) < len(article) / 5
+    stats = budget.stats()["flows"]["verify"]
+    assert stats["compressed"] == 1 and stats["tokens_out"] <= 100 < stats["tokens_in"]
+
 def test_verify_requires_article_text(client):
     response = client.post("/verify", json={})
     assert response.status_code == 400
@@ -95,3 +142,404 @@ def test_log_endpoint(client, monkeypatch):
     assert response.status_code == 200
     assert captured["msg"] == "Test entry"
 
+
+
+def test_run_model_inference_uses_batch_path(monkeypatch):
+    monkeypatch.setattr(backend_app, "BATCHING_ENABLED", True)
+    monkeypatch.setattr(backend_app, "PIPELINE_ENABLED", False)
+    monkeypatch.setattr(
+        backend_app,
+        "run_model_batch",
+        lambda texts: [{"label": "Fake", "text": text} for text in texts],
+    )
+    result = backend_app.run_model_inference("headline")
+    assert result == {"label": "Fake", "text": "headline"}
+
+
+def test_calibration_is_applied_before_thresholding(monkeypatch):
+    probs = np.array([[0.1, 0.9]])
+    assert backend_app._build_results(probs)[0]["needs_verification"] is False
+    monkeypatch.setattr(backend_app, "get_calibrator", lambda: backend_app.Calibrator("temperature", temperature=4.0))
+    result = backend_app._build_results(probs)[0]
+    assert result["label"] == "Real"
+    assert result["confidence"] < backend_app.CONFIDENCE_THRESHOLD
+    assert result["needs_verification"] is True
+
+
+def test_stats_endpoint(client):
+    response = client.get("/stats")
+    assert response.status_code == 200
+    assert "batching" in response.get_json()
+
+
+def test_predict_long_document_opt_in(client, monkeypatch):
+    monkeypatch.setattr(backend_app, "resolve_text", lambda payload: "long text")
+    captured = {}
+
+    def fake_long_inference(text, reducer=None):
+        captured["reducer"] = reducer
+        return {
+            "label": "Fake",
+            "confidence": 0.9,
+            "needs_verification": False,
+            "probabilities": {"fake": 0.9, "real": 0.1},
+            "long_document": {"reducer": reducer, "num_windows": 2, "truncated": False, "windows": []},
+        }
+
+    monkeypatch.setattr(backend_app, "run_long_document_inference", fake_long_inference)
+    response = client.post("/predict", json={"text": "foo", "long_document": True, "window_reducer": "max"})
+    assert response.status_code == 200
+    assert captured["reducer"] == "max"
+    assert response.get_json()["long_document"]["num_windows"] == 2
+
+
+def test_health_reports_inference_backend(client, monkeypatch):
+    monkeypatch.setattr(backend_app, "_active_backend", "quantized")
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.get_json()["backend"] == "quantized"
+
+
+def test_predict_cache_hit_skips_model_and_llm(client, monkeypatch):
+    monkeypatch.setattr(backend_app, "resolve_text", lambda payload: "viral article")
+    calls = {"model": 0, "llm": 0}
+
+    def fake_inference(text):
+        calls["model"] += 1
+        return {
+            "label": "Fake",
+            "confidence": 0.55,
+            "needs_verification": True,
+            "probabilities": {"fake": 0.55, "real": 0.45},
+        }
+
+    class DummyGroq:
+        def verify_article(self, article_text):
+            calls["llm"] += 1
+            return types.SimpleNamespace(prediction="Fake", reasoning="Fabricated.", raw={})
+
+    monkeypatch.setattr(backend_app, "run_model_inference", fake_inference)
+    monkeypatch.setattr(backend_app, "get_groq_client", lambda: DummyGroq())
+
+    first = client.post("/predict", json={"text": "foo", "async_verification": False}).get_json()
+    second = client.post("/predict", json={"text": "foo", "async_verification": False}).get_json()
+    assert calls == {"model": 1, "llm": 1}
+    assert first["cached"] is False and second["cached"] is True
+    assert second["auto_verification"] == {"prediction": "Fake", "reasoning": "Fabricated."}
+
+
+def test_predict_returns_before_async_verification(client, monkeypatch):
+    monkeypatch.setattr(backend_app, "resolve_text", lambda payload: "borderline article")
+    release = threading.Event()
+
+    def fake_inference(text):
+        return {
+            "label": "Real",
+            "confidence": 0.6,
+            "needs_verification": True,
+            "probabilities": {"fake": 0.4, "real": 0.6},
+        }
+
+    class SlowGroq:
+        def verify_article(self, article_text):
+            release.wait(5)
+            return types.SimpleNamespace(prediction="Real", reasoning="Sourced.", raw={})
+
+    monkeypatch.setattr(backend_app, "run_model_inference", fake_inference)
+    monkeypatch.setattr(backend_app, "get_groq_client", lambda: SlowGroq())
+
+    body = client.post("/predict", json={"text": "foo"}).get_json()
+    job = body["verification_job"]
+    assert "auto_verification" not in body
+    assert job["status"] in ("pending", "running")
+    assert client.get(job["status_url"]).get_json()["result"] is None
+
+    release.set()
+    stream = client.get(job["events_url"])
+    assert stream.mimetype == "text/event-stream"
+    events = [chunk for chunk in stream.get_data(as_text=True).split("\n\n") if chunk.startswith("event:")]
+    assert events[-1].startswith("event: result")
+    assert json.loads(events[-1].split("data: ", 1)[1])["result"]["prediction"] == "Real"
+
+    status = client.get(job["status_url"]).get_json()
+    assert status["status"] == "done"
+    assert backend_app.get_article_context(body["context_id"])["verification"] == "Sourced."
+    again = client.post("/predict", json={"text": "foo"}).get_json()
+    assert again["auto_verification"] == {"prediction": "Real", "reasoning": "Sourced."}
+    assert "verification_job" not in again
+
+
+def test_deduplicated_async_verification_patches_every_context(client, monkeypatch):
+    monkeypatch.setattr(backend_app, "resolve_text", lambda payload: "shared borderline article")
+    release = threading.Event()
+    calls = []
+
+    def fake_inference(text):
+        return {
+            "label": "Real",
+            "confidence": 0.6,
+            "needs_verification": True,
+            "probabilities": {"fake": 0.4, "real": 0.6},
+        }
+
+    class SlowGroq:
+        def verify_article(self, article_text):
+            calls.append(article_text)
+            release.wait(5)
+            return types.SimpleNamespace(prediction="Real", reasoning="Sourced.", raw={})
+
+    monkeypatch.setattr(backend_app, "run_model_inference", fake_inference)
+    monkeypatch.setattr(backend_app, "get_groq_client", lambda: SlowGroq())
+
+    first = client.post("/predict", json={"text": "foo"}).get_json()
+    second = client.post("/predict", json={"text": "foo"}).get_json()
+    assert first["verification_job"]["job_id"] == second["verification_job"]["job_id"]
+    assert first["context_id"] != second["context_id"]
+
+    release.set()
+    status = backend_app._verification_jobs.wait(first["verification_job"]["job_id"], timeout=5)
+    assert status["status"] == "done" and len(calls) == 1
+    for body in (first, second):
+        # Read the stored context directly: no fallback through the job registry.
+        assert backend_app._article_contexts.get(body["context_id"])["verification"] == "Sourced."
+
+
+
+def test_only_groq_errors_count_toward_the_verification_circuit():
+    assert backend_app._is_provider_failure(backend_app.GroqAPIError("Groq API error: 503"))
+    assert not backend_app._is_provider_failure(backend_app.GroqRateLimited("Client-side rate limit"))
+    assert not backend_app._is_provider_failure(ValueError("GROQ_API_KEY is missing"))
+
+def test_open_circuit_skips_auto_verification(client, monkeypatch):
+    monkeypatch.setattr(backend_app, "resolve_text", lambda payload: payload["text"])
+    monkeypatch.setattr(
+        backend_app, "_verification_controller", VerificationController(failure_threshold=2, open_seconds=60)
+    )
+    calls = []
+
+    def fake_inference(text):
+        return {
+            "label": "Fake",
+            "confidence": 0.52,
+            "needs_verification": True,
+            "probabilities": {"fake": 0.52, "real": 0.48},
+        }
+
+    class DownGroq:
+        def verify_article(self, article_text):
+            calls.append(article_text)
+            raise backend_app.GroqAPIError("Groq API request failed: 503")
+
+    monkeypatch.setattr(backend_app, "run_model_inference", fake_inference)
+    monkeypatch.setattr(backend_app, "get_groq_client", lambda: DownGroq())
+
+    for text in ("a", "b"):
+        body = client.post("/predict", json={"text": text, "async_verification": False}).get_json()
+        assert "auto_verification" not in body and "verification_skipped" not in body
+    assert backend_app._verification_controller.state == "open"
+
+    sync = client.post("/predict", json={"text": "c", "async_verification": False}).get_json()
+    queued = client.post("/predict", json={"text": "d"}).get_json()
+    assert len(calls) == 2
+    for body in (sync, queued):
+        assert body["label"] == "Fake"
+        assert body["verification_skipped"]["reason"] == "circuit_open"
+        assert body["verification_skipped"]["retry_after_seconds"] > 0
+        assert "verification_job" not in body
+    stats = client.get("/stats").get_json()["verification_controller"]
+    assert stats["state"] == "open" and stats["skipped"]["circuit_open"] == 2
+
+
+def test_concurrent_identical_predictions_share_one_forward_pass(client, monkeypatch):
+    monkeypatch.setattr(backend_app, "_inference_flight", backend_app.SingleFlight("inference"))
+    calls = []
+
+    def slow_inference(text):
+        calls.append(text)
+        time.sleep(0.2)
+        return {
+            "label": "Real",
+            "confidence": 0.97,
+            "needs_verification": False,
+            "probabilities": {"fake": 0.03, "real": 0.97},
+        }
+
+    monkeypatch.setattr(backend_app, "run_model_inference", slow_inference)
+    monkeypatch.setattr(backend_app, "PREDICTION_CACHE_ENABLED", False)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(backend_app.predict_article({"text": "breaking news"})))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert [result["label"] for result in results] == ["Real"] * 4
+    assert backend_app._inference_flight.stats()["collapsed"] == 3
+
+
+def test_verification_status_unknown_job(client):
+    assert client.get("/verification/missing").status_code == 404
+    assert client.get("/verification/missing/events").status_code == 404
+
+
+def test_predict_batch_streams_ndjson_with_inline_errors(client, monkeypatch):
+    def fake_resolve(payload):
+        if not payload.get("text"):
+            raise ValueError("No text provided.")
+        return payload["text"]
+
+    monkeypatch.setattr(backend_app, "resolve_text", fake_resolve)
+    monkeypatch.setattr(
+        backend_app,
+        "run_model_inference",
+        lambda text: {
+            "label": "Real",
+            "confidence": 0.9,
+            "needs_verification": False,
+            "probabilities": {"fake": 0.1, "real": 0.9},
+        },
+    )
+    response = client.post("/predict_batch", json={"items": [{"text": "a"}, {}, "bad", {"text": "b"}]})
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    by_index = {line["index"]: line for line in lines}
+    assert sorted(by_index) == [0, 1, 2, 3]
+    assert by_index[0]["status"] == "ok" and by_index[0]["label"] == "Real"
+    assert by_index[1]["status"] == "error"
+    assert by_index[2]["status"] == "error"
+    assert by_index[3]["article_text"] == "b"
+
+
+def test_predict_batch_requires_items(client):
+    assert client.post("/predict_batch", json={"items": []}).status_code == 400
+
+
+def test_probes_never_load_the_model(client, monkeypatch):
+    def fail_load():
+        raise AssertionError("probes must not load the model")
+
+    monkeypatch.setattr(backend_app, "load_model", fail_load)
+    monkeypatch.setattr(backend_app, "_model", None)
+    monkeypatch.setitem(backend_app._startup_state, "status", "loading")
+
+    assert client.get("/livez").status_code == 200
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.get_json()["status"] == "loading"
+    assert client.get("/health").get_json()["model"] == "loading"
+
+
+def test_readyz_after_startup(client, monkeypatch):
+    monkeypatch.setitem(backend_app._startup_state, "status", "ready")
+    assert client.get("/readyz").status_code == 200
+
+
+def test_predict_cascade_reports_deciding_stage(client, monkeypatch):
+    class FakeLinear:
+        def predict_proba(self, texts):
+            return np.array([[0.97, 0.03] if "hoax" in text else [0.5, 0.5] for text in texts])
+
+        classes_ = np.array([0, 1])
+
+    calls = []
+
+    def fake_inference(text):
+        calls.append(text)
+        return {
+            "label": "Real",
+            "confidence": 0.9,
+            "needs_verification": False,
+            "probabilities": {"fake": 0.1, "real": 0.9},
+        }
+
+    monkeypatch.setattr(backend_app, "_linear_cascade", LinearCascade(FakeLinear(), threshold=0.9))
+    monkeypatch.setattr(backend_app, "run_model_inference", fake_inference)
+    monkeypatch.setattr(backend_app, "resolve_text", lambda payload: payload["text"])
+
+    clear_cut = client.post("/predict", json={"text": "obvious hoax", "cascade": True}).get_json()
+    unsure = client.post("/predict", json={"text": "budget news", "cascade": True}).get_json()
+    default = client.post("/predict", json={"text": "obvious hoax"}).get_json()
+
+    assert (clear_cut["stage"], clear_cut["label"]) == ("linear", "Fake")
+    assert (unsure["stage"], unsure["label"]) == ("transformer", "Real")
+    assert default["stage"] == "transformer"
+    assert calls == ["budget news", "obvious hoax"]
+
+
+def test_corrupt_linear_model_disables_the_cascade_once(tmp_path, monkeypatch):
+    import joblib
+
+    path = tmp_path / "linear_model.joblib"
+    path.write_bytes(b"\x80\x04 truncated pickle")
+    loads = []
+    real_load = joblib.load
+
+    def counting_load(*args, **kwargs):
+        loads.append(1)
+        return real_load(*args, **kwargs)
+
+    monkeypatch.setattr(joblib, "load", counting_load)
+    monkeypatch.setattr(backend_app, "LINEAR_MODEL_PATH", path)
+    monkeypatch.setattr(backend_app, "_linear_cascade", None)
+    monkeypatch.setattr(backend_app, "_linear_cascade_error", None)
+
+    assert backend_app.get_linear_cascade() is None
+    assert backend_app.get_linear_cascade() is None
+    assert loads == [1]  # the failure is cached
+    assert backend_app._linear_cascade_error
+
+
+def _serving_config_calls(monkeypatch):
+    import torch
+
+    from backend.utils.serving_config import ServingConfig
+
+    calls = []
+    monkeypatch.setattr(backend_app, "get_serving_config", lambda: ServingConfig(workers=2, torch_threads=3))
+    monkeypatch.setattr(backend_app, "_serving_config_applied", False)
+    monkeypatch.setattr(backend_app, "TORCH_THREADS_PER_WORKER", 0)
+    monkeypatch.setattr(backend_app, "TORCH_INTEROP_THREADS", 0)
+    monkeypatch.setattr(torch, "set_num_threads", calls.append)
+    monkeypatch.setattr(torch, "set_num_interop_threads", lambda threads: None)
+    monkeypatch.setattr(backend_app, "load_model", lambda: (object(), object()))
+    monkeypatch.setattr(backend_app, "_startup_state", {"status": "pending", "phases_ms": {}, "error": None})
+    for flag in ("PIPELINE_ENABLED", "BATCHING_ENABLED", "CASCADE_MODE"):
+        monkeypatch.setattr(backend_app, flag, False)
+    return calls
+
+
+def test_standalone_startup_applies_the_whole_serving_config(monkeypatch):
+    calls = _serving_config_calls(monkeypatch)
+    assert backend_app.startup(warmup=False)["status"] == "ready"
+    assert calls == [6]  # one process gets every worker's share
+
+
+def test_worker_startup_applies_its_share_once(monkeypatch):
+    calls = _serving_config_calls(monkeypatch)
+    backend_app.init_worker(warmup=False)
+    assert calls == [3]
+
+
+def test_early_exit_backend_defaults_heads_next_to_the_weights(tmp_path, monkeypatch):
+    import torch
+
+    weights = tmp_path / "sanity_model.safetensors"
+    seen = []
+
+    def fake_load(model_dir, weights_path, heads_path, threshold, device):
+        seen.append(heads_path)
+        return "tokenizer", torch.nn.Identity()
+
+    monkeypatch.setattr(backend_app.sanity_utils, "load_early_exit_model", fake_load)
+    monkeypatch.setattr(backend_app, "INFERENCE_BACKEND", "early_exit")
+    monkeypatch.setattr(backend_app, "FINE_TUNED_MODEL_PATH", weights)
+    monkeypatch.setattr(backend_app, "EARLY_EXIT_HEADS_PATH", None)
+    for name in ("_tokenizer", "_model", "_active_backend"):
+        monkeypatch.setattr(backend_app, name, None)
+    backend_app.load_model()
+    assert seen == [tmp_path / "sanity_model.exits.safetensors"]
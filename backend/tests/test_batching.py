@@ -0,0 +1,52 @@
+import threading
+
+import pytest
+
+from backend.utils.batching import MicroBatcher
+
+
+def test_concurrent_submissions_share_a_batch():
+    calls = []
+    release = threading.Event()
+
+    def handler(items):
+        calls.append(list(items))
+        release.wait(1)
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(handler, max_batch_size=4, max_wait_ms=50)
+    try:
+        futures = [batcher.submit(i) for i in range(4)]
+        release.set()
+        assert [f.result(timeout=2) for f in futures] == [0, 2, 4, 6]
+    finally:
+        batcher.stop(timeout=1)
+
+    assert calls == [[0, 1, 2, 3]]
+    stats = batcher.stats()
+    assert stats["batches"] == 1
+    assert stats["items"] == 4
+    assert stats["batch_size_histogram"] == {4: 1}
+
+
+def test_batch_size_is_capped():
+    batcher = MicroBatcher(lambda items: list(items), max_batch_size=2, max_wait_ms=20)
+    try:
+        futures = [batcher.submit(i) for i in range(5)]
+        assert [f.result(timeout=2) for f in futures] == list(range(5))
+    finally:
+        batcher.stop(timeout=1)
+    assert batcher.stats()["max_observed_batch_size"] <= 2
+
+
+def test_handler_errors_propagate_to_callers():
+    def handler(_items):
+        raise RuntimeError("boom")
+
+    batcher = MicroBatcher(handler, max_batch_size=2, max_wait_ms=1)
+    try:
+        with pytest.raises(RuntimeError, match="boom"):
+            batcher("x", timeout=2)
+    finally:
+        batcher.stop(timeout=1)
+    assert batcher.stats()["errors"] == 1
@@ -0,0 +1,64 @@
+import threading
+import time
+
+from backend.utils.cache import TieredCache, content_hash, normalize_text
+
+
+def test_lru_eviction_and_counters():
+    cache = TieredCache(max_entries=2, ttl_seconds=0)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_entries_expire():
+    cache = TieredCache(max_entries=4, ttl_seconds=60)
+    cache.set("short", "value", ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("short") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_sqlite_tier_survives_restart(tmp_path):
+    db_path = tmp_path / "cache.sqlite3"
+    TieredCache(db_path=db_path, namespace="predictions").set("key", {"label": "Real"})
+
+    restarted = TieredCache(db_path=db_path, namespace="predictions")
+    assert restarted.get("key") == {"label": "Real"}
+    assert restarted.stats()["disk_hits"] == 1
+    assert TieredCache(db_path=db_path, namespace="other").get("key") is None
+
+
+def test_slow_disk_read_does_not_block_memory_hits(tmp_path):
+    cache = TieredCache(db_path=tmp_path / "cache.sqlite3", namespace="predictions")
+    cache.set("hot", "in memory")
+    reading, release = threading.Event(), threading.Event()
+    disk_get = cache._disk_get
+
+    def slow_disk_get(key):
+        reading.set()
+        release.wait(5)
+        return disk_get(key)
+
+    cache._disk_get = slow_disk_get
+    miss = threading.Thread(target=cache.get, args=("cold",))
+    miss.start()
+    assert reading.wait(5)
+    hit = threading.Thread(target=cache.get, args=("hot",))
+    hit.start()
+    hit.join(2)
+    blocked = hit.is_alive()
+    release.set()
+    miss.join(5)
+    hit.join(5)
+    assert not blocked
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_normalized_text_shares_hash():
+    assert content_hash("v1", normalize_text("Breaking  News\n")) == content_hash("v1", normalize_text("breaking news"))
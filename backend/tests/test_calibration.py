@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from backend.utils.calibration import (
+    CalibrationError,
+    Calibrator,
+    default_calibration_path,
+    expected_calibration_error,
+    fit_calibrator,
+    load_calibrator,
+    recommend_threshold,
+    threshold_sweep,
+)
+
+
+def _overconfident(samples=2000, seed=0):
+    """Labels drawn from a true P(real), reported through a too-sharp softmax."""
+    rng = np.random.default_rng(seed)
+    true_real = rng.uniform(0.05, 0.95, samples)
+    labels = (rng.uniform(size=samples) < true_real).astype(int)
+    logit = np.log(true_real / (1 - true_real)) * 3.0
+    real = 1 / (1 + np.exp(-logit))
+    return np.stack([1 - real, real], axis=-1), labels
+
+
+def test_default_path_sits_next_to_the_weights(tmp_path):
+    assert default_calibration_path(tmp_path / "sanity_model.safetensors") == tmp_path / "sanity_model.calibration.json"
+
+
+def test_temperature_scaling_softens_overconfident_probabilities():
+    probs, labels = _overconfident()
+    calibrator = fit_calibrator(probs, labels)
+    assert calibrator.temperature == pytest.approx(3.0, rel=0.15)
+    assert calibrator.metrics["ece_after"] < calibrator.metrics["ece_before"]
+    assert calibrator.metrics["nll_after"] < calibrator.metrics["nll_before"]
+    calibrated = calibrator.apply(probs)
+    assert np.allclose(calibrated.sum(axis=-1), 1.0)
+    assert np.array_equal(calibrated.argmax(axis=-1), probs.argmax(axis=-1))
+    assert calibrator.apply(probs[0]).shape == (2,)
+
+
+def test_isotonic_calibration_reduces_ece():
+    probs, labels = _overconfident(seed=1)
+    calibrator = fit_calibrator(probs, labels, method="isotonic")
+    assert expected_calibration_error(calibrator.apply(probs), labels) < expected_calibration_error(probs, labels)
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    path = tmp_path / "model.calibration.json"
+    assert load_calibrator(path) is None
+    Calibrator("isotonic", x_thresholds=[0.0, 1.0], y_values=[0.2, 0.8]).save(path)
+    loaded = load_calibrator(path)
+    assert np.allclose(loaded.apply(np.array([0.5, 0.5])), [0.5, 0.5])
+    path.write_text('{"method": "temperature", "temperature": -1}')
+    with pytest.raises(CalibrationError):
+        load_calibrator(path)
+
+
+def test_threshold_sweep_and_budget_recommendation():
+    probs = np.array([[0.95, 0.05], [0.2, 0.8], [0.6, 0.4], [0.45, 0.55]])
+    labels = [0, 1, 1, 1]
+    rows = threshold_sweep(probs, labels, [0.5, 0.7, 0.9], llm_accuracy=1.0)
+    assert [row["verification_rate"] for row in rows] == [0.0, 0.5, 0.75]
+    assert rows[0]["accepted_accuracy"] == 0.75
+    assert rows[1]["accepted_accuracy"] == 1.0
+    assert rows[1]["expected_accuracy"] == 1.0
+    assert recommend_threshold(rows, 0.5)["threshold"] == 0.7
+    assert recommend_threshold(rows, 0.0)["threshold"] == 0.5
+    assert recommend_threshold(threshold_sweep(probs, labels, [0.99]), 0.1) is None
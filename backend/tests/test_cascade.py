@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from backend.utils.cascade import LinearCascade, LinearModelError, cascade_sweep
+
+
+class ReversedPipeline:
+    """Stores classes as [1, 0] to check column reordering."""
+
+    classes_ = np.array([1, 0])
+
+    def predict_proba(self, texts):
+        return np.array([[0.95, 0.05] if "real" in text else [0.4, 0.6] for text in texts])
+
+
+def test_linear_stage_decides_confident_rows_only():
+    cascade = LinearCascade(ReversedPipeline(), threshold=0.9)
+    escalated = []
+
+    def transformer(texts):
+        escalated.extend(texts)
+        return np.array([[0.8, 0.2]] * len(texts))
+
+    probs, stages = cascade.classify(["real report", "murky claim"], transformer)
+
+    np.testing.assert_allclose(probs, [[0.05, 0.95], [0.8, 0.2]])
+    assert stages == ["linear", "transformer"]
+    assert escalated == ["murky claim"]
+    assert cascade.stats()["skip_rate"] == 0.5
+
+
+def test_rejects_non_binary_labels():
+    class ThreeWay:
+        classes_ = np.array([0, 1, 2])
+
+    with pytest.raises(LinearModelError):
+        LinearCascade(ThreeWay())
+
+
+def test_sweep_trades_accuracy_for_skips():
+    linear = np.array([[0.99, 0.01], [0.7, 0.3], [0.6, 0.4]])
+    transformer = np.array([[0.9, 0.1], [0.2, 0.8], [0.3, 0.7]])
+    labels = [0, 1, 1]
+
+    low, high = cascade_sweep(linear, transformer, labels, [0.5, 0.95])
+
+    assert (low["skip_rate"], low["accuracy"]) == (1.0, pytest.approx(1 / 3))
+    assert (high["skip_rate"], high["accuracy"]) == (pytest.approx(1 / 3), 1.0)
+    assert high["linear_accuracy_on_skipped"] == 1.0
@@ -0,0 +1,134 @@
+import time
+import uuid
+
+import pytest
+
+from backend.utils.context_backends import (
+    CachedContextStore,
+    KeyValueContextBackend,
+    LocalKeyValueClient,
+    SqliteContextBackend,
+    create_context_store,
+)
+from backend.utils import context_backends
+from backend.utils.context_store import ContextStore, ContextTooLarge
+
+ARTICLE = "The council approved the budget after a long debate. " * 100
+
+
+def _context(text=ARTICLE):
+    return {"article_text": text, "model_prediction": "Real", "model_confidence": 0.8, "verification": None}
+
+
+def test_sqlite_backend_is_shared_between_workers(tmp_path):
+    path = tmp_path / "contexts.sqlite3"
+    worker_a = SqliteContextBackend(path)
+    worker_b = SqliteContextBackend(path)
+
+    worker_a["ctx"] = _context()
+    worker_a["other"] = _context()
+    assert worker_b["ctx"]["article_text"] == ARTICLE
+    assert worker_b.patch("ctx", verification="Confirmed.")
+    assert worker_a["ctx"]["verification"] == "Confirmed."
+    assert not worker_b.patch("missing", verification="x")
+    stats = worker_a.stats()
+    assert (stats["entries"], stats["unique_texts"]) == (2, 1)
+    assert stats["text_bytes"] < len(ARTICLE) / 10
+
+
+def test_sqlite_backend_prunes_expired_and_excess_rows(tmp_path):
+    backend = SqliteContextBackend(tmp_path / "contexts.sqlite3", max_entries=2, prune_every=0)
+    for index in range(4):
+        backend[str(index)] = _context(f"article {index}")
+    backend.prune()
+    assert "0" not in backend and "3" in backend
+    assert backend.stats()["unique_texts"] == 2
+
+    expiring = SqliteContextBackend(tmp_path / "short.sqlite3", ttl_seconds=0.05)
+    expiring["ctx"] = _context()
+    time.sleep(0.1)
+    assert expiring.get("ctx") is None
+
+
+
+def _unique_text(words=300):
+    return " ".join(uuid.uuid4().hex for _ in range(words))
+
+
+def test_sqlite_backend_rejects_oversized_and_evicts_lru_over_the_byte_budget(tmp_path, monkeypatch):
+    monkeypatch.setattr(context_backends, "_TOUCH_INTERVAL_SECONDS", 0)
+    backend = SqliteContextBackend(tmp_path / "contexts.sqlite3", max_bytes=20_000, prune_every=0)
+    with pytest.raises(ContextTooLarge):
+        backend["huge"] = _context(_unique_text(3000))
+    assert "huge" not in backend and backend.stats()["rejected"] == 1
+
+    for index in range(6):
+        backend[str(index)] = _context(_unique_text())  # ~6 KB compressed each
+        time.sleep(0.01)
+    assert backend.get("0") is not None  # read: now the most recently used
+    backend.prune()
+    stats = backend.stats()
+    assert stats["live_bytes"] <= 20_000 and stats["evictions"] > 0
+    assert "0" in backend and "5" in backend and "1" not in backend
+    assert stats["unique_texts"] == stats["entries"]
+
+def test_key_value_backend_with_local_stand_in():
+    client = LocalKeyValueClient()
+    backend = KeyValueContextBackend(client, ttl_seconds=60)
+    backend["a"] = _context()
+    backend["b"] = _context()
+    assert backend["a"]["article_text"] == ARTICLE
+    assert backend.patch("a", verification="Checked.")
+    assert backend["a"]["verification"] == "Checked."
+    # Article text is stored once for both contexts.
+    assert sum(key.startswith("sanity:ctx:text:") for key in client._data) == 1
+    del backend["a"]
+    assert "a" not in backend and "b" in backend
+
+
+
+def test_key_value_backend_rejects_a_context_over_max_bytes():
+    backend = KeyValueContextBackend(LocalKeyValueClient(), max_bytes=5_000)
+    with pytest.raises(ContextTooLarge):
+        backend["big"] = _context(_unique_text())
+    assert "big" not in backend
+
+def test_read_through_cache_serves_repeat_lookups_locally():
+    backend = KeyValueContextBackend(LocalKeyValueClient())
+    store = CachedContextStore(backend, ttl_seconds=60)
+    other_worker = CachedContextStore(backend, ttl_seconds=60)
+
+    store["ctx"] = _context()
+    assert other_worker["ctx"]["model_prediction"] == "Real"
+    started = time.perf_counter()
+    for _ in range(1000):
+        other_worker.get("ctx")
+    assert (time.perf_counter() - started) / 1000 < 1e-3
+    stats = other_worker.stats()["local_cache"]
+    assert (stats["misses"], stats["hits"]) == (1, 1000)
+
+    # A worker's own patch drops its local copy; others see it after their TTL.
+    assert store.patch("ctx", verification="Done.")
+    assert store["ctx"]["verification"] == "Done."
+
+
+def test_factory_selects_backend(tmp_path):
+    assert isinstance(create_context_store("memory"), ContextStore)
+    assert isinstance(create_context_store("sqlite", db_path=tmp_path / "c.sqlite3").backend, SqliteContextBackend)
+    assert isinstance(create_context_store("kv", kv_client=LocalKeyValueClient()).backend, KeyValueContextBackend)
+    with pytest.raises(ValueError):
+        create_context_store("kv")
+    with pytest.raises(ValueError):
+        create_context_store("etcd")
+
+
+def test_backend_missing_a_method_fails_at_construction():
+    class NoDelete(context_backends._ContextMapping):
+        def get(self, context_id, default=None):
+            return default
+
+        def set(self, context_id, context):
+            pass
+
+    with pytest.raises(TypeError):
+        NoDelete()
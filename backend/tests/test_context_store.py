@@ -0,0 +1,76 @@
+import pytest
+
+from backend.utils.context_store import ContextStore, ContextTooLarge
+
+ARTICLE = "Officials confirmed the report on Tuesday. " * 200
+
+
+def _context(text=ARTICLE, label="Real"):
+    return {"article_text": text, "model_prediction": label, "model_confidence": 0.9, "verification": None}
+
+
+def test_roundtrip_returns_copies_and_patch_updates_fields():
+    store = ContextStore()
+    store["a"] = _context()
+    context = store["a"]
+    assert context["article_text"] == ARTICLE and context["model_prediction"] == "Real"
+    context["verification"] = "mutated copy"
+    assert store["a"]["verification"] is None
+    assert store.patch("a", verification="Checked.")
+    assert store["a"]["verification"] == "Checked."
+    assert not store.patch("missing", verification="x")
+    with pytest.raises(ValueError):
+        store.patch("a", article_text="other")
+
+
+def test_text_is_compressed_and_shared_between_contexts():
+    store = ContextStore()
+    for context_id in ("a", "b", "c"):
+        store[context_id] = _context()
+    stats = store.stats()
+    assert stats["entries"] == 3 and stats["unique_texts"] == 1 and stats["dedup_hits"] == 2
+    assert stats["raw_text_bytes"] == len(ARTICLE) and stats["text_bytes"] < len(ARTICLE) / 10
+    del store["a"], store["b"]
+    assert store["c"]["article_text"] == ARTICLE
+    del store["c"]
+    assert store.stats()["unique_texts"] == 0 and store.live_bytes == 0
+
+
+def test_lru_eviction_by_entry_and_byte_budget():
+    store = ContextStore(max_entries=2)
+    store["a"] = _context("first")
+    store["b"] = _context("second")
+    store.get("a")
+    store["c"] = _context("third")
+    assert "b" not in store and "a" in store and "c" in store
+    assert store.stats()["evictions"] == 1
+
+    small = ContextStore(max_bytes=600)
+    for index in range(10):
+        small[str(index)] = _context(f"unique article {index} " * 20)
+    assert small.live_bytes <= 600
+    assert "9" in small and "0" not in small
+
+
+
+def test_context_larger_than_the_budget_is_rejected():
+    store = ContextStore(max_bytes=600)
+    store["a"] = _context("small article")
+    oversized = " ".join(f"token{index}" for index in range(2000))
+    with pytest.raises(ContextTooLarge):
+        store["a"] = _context(oversized)
+    with pytest.raises(ContextTooLarge):
+        store["b"] = _context(oversized)
+    assert store["a"]["article_text"] == "small article"  # the earlier context is untouched
+    assert "b" not in store
+    stats = store.stats()
+    assert stats["rejected"] == 2 and stats["evictions"] == 0 and stats["unique_texts"] == 1
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("backend.utils.context_store.time.time", lambda: now[0])
+    store = ContextStore(ttl_seconds=60)
+    store["a"] = _context()
+    now[0] += 61
+    assert store.get("a") is None
+    assert store.stats()["expirations"] == 1 and store.live_bytes == 0
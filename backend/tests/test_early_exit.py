@@ -0,0 +1,72 @@
+import pytest
+import torch
+from transformers import DistilBertConfig, DistilBertForSequenceClassification
+
+from backend.utils.early_exit import EarlyExitClassifier, default_heads_path, save_exit_heads
+
+
+@pytest.fixture
+def base():
+    config = DistilBertConfig(
+        vocab_size=40, dim=16, n_layers=3, n_heads=2, hidden_dim=32, max_position_embeddings=32
+    )
+    torch.manual_seed(0)
+    return DistilBertForSequenceClassification(config).eval()
+
+
+@pytest.fixture
+def batch():
+    input_ids = torch.randint(5, 40, (3, 8))
+    attention_mask = torch.ones_like(input_ids)
+    attention_mask[1, 5:] = 0
+    attention_mask[2, 2:] = 0
+    return {"input_ids": input_ids, "attention_mask": attention_mask}
+
+
+def test_unreachable_threshold_reproduces_the_full_model(base, batch):
+    model = EarlyExitClassifier(base, [1, 2], threshold=1.01).eval()
+    with torch.no_grad():
+        expected = base(**batch).logits
+        output = model(**batch)
+    torch.testing.assert_close(output.logits, expected)
+    assert output.exit_layers.tolist() == [3, 3, 3]
+    assert model.stats()["avg_layers_executed"] == 3.0
+
+
+def test_rows_leave_independently_and_the_rest_match_the_full_model(base, batch):
+    model = EarlyExitClassifier(base, [1, 2], threshold=0.9).eval()
+
+    def confident_for_middle_row(hidden_states):
+        logits = torch.zeros(hidden_states.shape[0], 2)
+        logits[1, 0] = 10.0
+        return logits
+
+    model.heads["1"].forward = confident_for_middle_row
+    model.heads["2"].forward = lambda hidden_states: torch.zeros(hidden_states.shape[0], 2)
+
+    with torch.no_grad():
+        expected = base(**batch).logits
+        output = model(**batch)
+
+    assert output.exit_layers.tolist() == [3, 1, 3]
+    assert output.logits[1].tolist() == [10.0, 0.0]
+    torch.testing.assert_close(output.logits[[0, 2]], expected[[0, 2]])
+    assert model.stats()["exit_histogram"] == {1: 1, 3: 2}
+
+
+def test_training_loss_only_updates_heads(base, batch, tmp_path):
+    model = EarlyExitClassifier(base, [1, 2])
+    model.freeze_backbone()
+    model.train()
+    assert not model.base.training
+
+    output = model(**batch, labels=torch.tensor([0, 1, 0]))
+    output.loss.backward()
+    assert output.logits.shape == (3, 3, 2)  # two exits + final classifier
+    assert all(p.grad is None for p in model.base.parameters())
+    assert all(p.grad is not None for p in model.heads.parameters())
+
+    path = default_heads_path(tmp_path / "sanity_model.safetensors")
+    assert path.name == "sanity_model.exits.safetensors"
+    save_exit_heads(model, path)
+    assert path.exists()
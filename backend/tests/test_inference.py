@@ -0,0 +1,73 @@
+import types
+
+import numpy as np
+import torch
+
+from backend.utils.inference import (
+    pad_batch,
+    predict_probabilities,
+    reduce_window_probabilities,
+    split_into_windows,
+)
+
+
+class FakeTokenizer:
+    pad_token_id = 0
+
+    def __call__(self, texts, truncation=True, max_length=512):
+        return {"input_ids": [[1] * min(len(text.split()), max_length) for text in texts]}
+
+
+class LengthModel:
+    """Scores each row by its unpadded length and records batch widths."""
+
+    def __init__(self):
+        self.widths = []
+
+    def __call__(self, input_ids, attention_mask):
+        self.widths.append(input_ids.shape[1])
+        lengths = attention_mask.sum(dim=1).float()
+        return types.SimpleNamespace(logits=torch.stack([-lengths, lengths], dim=1))
+
+
+def test_pad_batch_pads_to_longest_sequence():
+    batch = pad_batch([[5, 6], [7, 8, 9]], pad_token_id=0)
+    assert batch["input_ids"].tolist() == [[5, 6, 0], [7, 8, 9]]
+    assert batch["attention_mask"].tolist() == [[1, 1, 0], [1, 1, 1]]
+
+
+def test_predict_probabilities_buckets_and_restores_order():
+    texts = ["a b c d e f", "a", "a b c d e", "a b"]
+    model = LengthModel()
+    probs = predict_probabilities(texts, FakeTokenizer(), model, "cpu", batch_size=2)
+
+    # Sorted buckets: [1, 2] tokens then [5, 6] tokens.
+    assert model.widths == [2, 6]
+    real = probs[:, 1]
+    assert list(real.argsort()) == [1, 3, 2, 0]
+
+
+class WordTokenizer(FakeTokenizer):
+    cls_token_id = 101
+    sep_token_id = 102
+
+    def __call__(self, text, add_special_tokens=True, truncation=False):
+        return {"input_ids": list(range(1, len(text.split()) + 1))}
+
+
+def test_split_into_windows_overlaps_and_caps():
+    text = " ".join(["w"] * 20)
+    windows, truncated = split_into_windows(WordTokenizer(), text, max_length=10, stride=2, max_windows=8)
+    assert [w.start_token for w in windows] == [0, 6, 12]
+    assert windows[0].input_ids == [101, 1, 2, 3, 4, 5, 6, 7, 8, 102]
+    assert not truncated
+
+    windows, truncated = split_into_windows(WordTokenizer(), text, max_length=10, stride=2, max_windows=2)
+    assert len(windows) == 2 and truncated
+
+
+def test_reduce_window_probabilities():
+    probs = np.array([[0.6, 0.4], [0.1, 0.9]])
+    assert np.allclose(reduce_window_probabilities(probs, [10, 30], "mean"), [0.35, 0.65])
+    assert np.allclose(reduce_window_probabilities(probs, [10, 30], "max"), [0.1, 0.9])
+    assert np.allclose(reduce_window_probabilities(probs, [10, 30], "weighted"), [0.225, 0.775])
@@ -0,0 +1,304 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from backend.utils import llm_handler
+from backend.utils.cache import TieredCache
+from backend.utils.llm_handler import GroqAPIError, GroqClient, response_cache_key, retry_after_seconds
+from backend.utils.llm_ledger import current_ledger, track_llm_calls
+from backend.utils.rate_limit import RateLimiter, RateLimitTimeout, TokenBucket
+
+
+class StubGroq:
+    """Local chat-completions server replaying a scripted list of (status, headers, body)."""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.requests = []
+        self.ports = set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers["Content-Length"])
+                stub.requests.append(json.loads(self.rfile.read(length)))
+                stub.ports.add(self.client_address[1])
+                status, headers, body = stub.script.pop(0) if len(stub.script) > 1 else stub.script[0]
+                data = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+                self.send_response(status)
+                for key, value in {**headers, "Content-Length": str(len(data))}.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1/chat/completions"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _completion(content="Prediction: Real\nReasoning: Fine.", total=30):
+    return {
+        "choices": [{"message": {"content": content}}],
+        "usage": {"prompt_tokens": total - 10, "completion_tokens": 10, "total_tokens": total},
+    }
+
+
+@pytest.fixture()
+def stub():
+    servers = []
+
+    def make(*script):
+        server = StubGroq(script)
+        servers.append(server)
+        return server
+
+    yield make
+    for server in servers:
+        server.close()
+
+
+def _client(url, **kwargs):
+    kwargs.setdefault("rate_limiter", RateLimiter())
+    return GroqClient(
+        api_key="test", api_url=url, session=llm_handler.create_session(), backoff_base=0.01, **kwargs
+    )
+
+
+def test_retries_429_honouring_retry_after_and_tracks_usage(stub, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(llm_handler.time, "sleep", sleeps.append)
+    server = stub(
+        (429, {"Retry-After": "2"}, {"error": "slow down"}),
+        (503, {}, {"error": "busy"}),
+        (200, {}, _completion(total=42)),
+    )
+    client = _client(server.url)
+
+    assert client.call_llm([{"role": "user", "content": "hi"}]) == "Prediction: Real\nReasoning: Fine."
+    assert sleeps[0] == 2.0 and 0 <= sleeps[1] <= 0.02
+    usage = client.usage()
+    assert (usage["requests"], usage["retries"], usage["failures"]) == (3, 2, 0)
+    assert usage["total_tokens"] == 42 and usage["completion_tokens"] == 10
+
+
+def test_client_errors_are_not_retried(stub):
+    server = stub((400, {}, {"error": "bad request"}))
+    client = _client(server.url)
+    with pytest.raises(GroqAPIError):
+        client.call_llm([{"role": "user", "content": "hi"}])
+    assert len(server.requests) == 1
+
+
+def test_gives_up_after_max_retries(stub, monkeypatch):
+    monkeypatch.setattr(llm_handler.time, "sleep", lambda seconds: None)
+    server = stub((500, {}, {"error": "down"}))
+    client = _client(server.url, max_retries=2)
+    with pytest.raises(GroqAPIError):
+        client.call_llm([{"role": "user", "content": "hi"}])
+    assert len(server.requests) == 3
+    assert client.usage()["failures"] == 1
+
+
+
+def test_retries_do_not_take_rate_limiter_capacity_again(stub, monkeypatch):
+    monkeypatch.setattr(llm_handler.time, "sleep", lambda seconds: None)
+    server = stub((503, {}, {"error": "busy"}), (503, {}, {"error": "busy"}), (200, {}, _completion()))
+    limiter = RateLimiter(requests_per_minute=2, tokens_per_minute=100_000)
+    client = _client(server.url, rate_limiter=limiter, rate_limit_wait=0)
+    client.call_llm([{"role": "user", "content": "hi"}])
+    assert len(server.requests) == 3
+    assert limiter.stats()["acquired"] == 1
+    client.call_llm([{"role": "user", "content": "again"}])  # the second request slot is still free
+
+
+def test_rate_limit_wait_longer_than_allowed_fails_without_sending(stub):
+    server = stub((200, {}, _completion()))
+    now = [0.0]
+    limiter = RateLimiter(requests_per_minute=1, clock=lambda: now[0], sleep=lambda seconds: None)
+    client = _client(server.url, rate_limiter=limiter, rate_limit_wait=5)
+    client.call_llm([{"role": "user", "content": "hi"}])
+    with pytest.raises(GroqAPIError, match="rate limit"):
+        client.call_llm([{"role": "user", "content": "next"}])
+    assert len(server.requests) == 1
+    assert client.usage()["failures"] == 1
+
+def test_session_reuses_connection(stub):
+    server = stub((200, {}, _completion()))
+    client = _client(server.url)
+    for _ in range(3):
+        client.call_llm([{"role": "user", "content": "hi"}])
+    assert len(server.ports) == 1
+
+
+def test_retry_after_parses_seconds_and_http_dates():
+    assert retry_after_seconds("3") == 3.0
+    assert retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert retry_after_seconds(None) is None
+    assert retry_after_seconds("soon") is None
+
+
+def test_token_bucket_queues_callers_behind_an_empty_bucket():
+    now = [0.0]
+    bucket = TokenBucket(capacity=2, refill_per_second=1, clock=lambda: now[0])
+    assert bucket.reserve(1) == 0.0
+    assert bucket.reserve(1) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    assert bucket.reserve(1) == pytest.approx(2.0)
+    now[0] = 10.0
+    assert bucket.available() == 2.0
+
+
+def test_rate_limiter_applies_request_and_token_limits():
+    now = [0.0]
+    sleeps = []
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=600, clock=lambda: now[0], sleep=sleeps.append)
+    assert limiter.acquire(tokens=600) == 0.0
+    # Token bucket is empty: 300 tokens take 30s to refill; the request bucket is still full.
+    assert limiter.acquire(tokens=300) == pytest.approx(30.0)
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(tokens=300, timeout=1)
+    limiter.record_usage(estimated_tokens=600, actual_tokens=100)
+    assert limiter.stats()["throttled"] == 1 and sleeps == [pytest.approx(30.0)]
+
+
+def test_verify_article_makes_exactly_one_provider_call(stub):
+    server = stub((200, {}, _completion("Prediction: Fake\nReasoning: Invented quotes.", total=50)))
+    client = _client(server.url)
+    with track_llm_calls() as ledger:
+        result = client.verify_article("Some article")
+    assert len(server.requests) == 1
+    assert (result.prediction, result.reasoning) == ("Fake", "Invented quotes.")
+    assert result.raw["usage"]["total_tokens"] == 50
+    summary = ledger.summary()
+    assert (summary["count"], summary["attempts"], summary["total_tokens"]) == (1, 1, 50)
+
+
+def test_verify_endpoint_reports_llm_calls(stub, monkeypatch):
+    from backend import app as backend_app
+
+    server = stub((200, {}, _completion(total=25)))
+    client = _client(server.url)
+    monkeypatch.setattr(backend_app, "get_groq_client", lambda: client)
+    response = backend_app.app.test_client().post("/verify", json={"article_text": "Some article"})
+    assert response.status_code == 200
+    assert response.headers["X-LLM-Calls"] == "1"
+    assert response.headers["X-LLM-Tokens"] == "25"
+    assert current_ledger() is None  # the request's ledger does not outlive it in this thread
+
+
+def test_response_cache_serves_identical_prompts_and_reports_savings(stub, tmp_path):
+    server = stub((200, {}, _completion("Prediction: Real\nReasoning: Sourced.", total=40)))
+    cache = TieredCache(max_entries=8, ttl_seconds=60, db_path=tmp_path / "llm.sqlite3", namespace="llm")
+    client = _client(server.url, response_cache=cache, cache_ttls={"verify": 120})
+
+    first = client.verify_article("Same article")
+    with track_llm_calls() as ledger:
+        second = client.verify_article("Same article")
+    assert len(server.requests) == 1 and ledger.count == 0
+    assert second.raw == first.raw
+    client.verify_article("Same article", bypass_cache=True)
+    assert len(server.requests) == 2
+
+    usage = client.usage()
+    assert (usage["cache_hits"], usage["cache_misses"]) == (1, 1)
+    assert usage["cache_hit_rate"] == 0.5 and usage["saved_tokens"] == 40
+    assert usage["saved_latency_ms"] > 0
+
+    # The SQLite tier survives a fresh client/cache (e.g. a restarted worker).
+    fresh_cache = TieredCache(max_entries=8, db_path=tmp_path / "llm.sqlite3", namespace="llm")
+    fresh = _client(server.url, response_cache=fresh_cache)
+    assert fresh.verify_article("Same article").prediction == "Real"
+    assert len(server.requests) == 2 and fresh_cache.stats()["disk_hits"] == 1
+
+
+def test_response_cache_key_depends_on_model_and_messages():
+    messages = [{"role": "user", "content": "hi"}]
+    assert response_cache_key("a", messages) == response_cache_key("a", [dict(messages[0])])
+    assert response_cache_key("a", messages) != response_cache_key("b", messages)
+    assert response_cache_key("a", messages) != response_cache_key("a", [{"role": "user", "content": "hi!"}])
+
+
+def _sse_completion(*deltas, total=12):
+    chunks = [{"choices": [{"delta": {"content": delta}}]} for delta in deltas]
+    chunks.append({"choices": [{"delta": {}}], "x_groq": {"usage": {"total_tokens": total}}})
+    return "".join(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n" for chunk in chunks) + "data: [DONE]\n\n"
+
+
+def test_answer_question_streams_deltas_and_caches_the_full_answer(stub):
+    server = stub((200, {"Content-Type": "text/event-stream"}, _sse_completion("Because ", "sources ", "agree.")))
+    client = _client(server.url, response_cache=TieredCache(max_entries=8))
+
+    with track_llm_calls() as ledger:
+        chunks = list(client.answer_question("Why?", stream=True))
+    assert chunks == ["Because ", "sources ", "agree."]
+    assert server.requests[0]["stream"] is True
+    call = ledger.calls[0]
+    assert call.total_tokens == 12 and call.first_token_ms is not None
+    assert client.usage()["streams"] == 1
+
+    # Both the streaming and the plain path reuse the assembled answer.
+    assert list(client.answer_question("Why?", stream=True)) == ["Because sources agree."]
+    assert client.answer_question("Why?") == "Because sources agree."
+    assert len(server.requests) == 1
+
+
+
+def test_streamed_error_responses_are_closed_before_retrying(stub, monkeypatch):
+    monkeypatch.setattr(llm_handler.time, "sleep", lambda seconds: None)
+    server = stub(
+        (503, {}, {"error": "busy"}),
+        (400, {}, {"error": "bad request"}),
+    )
+    client = _client(server.url)
+    responses = []
+    post = client.session.post
+
+    def recording_post(*args, **kwargs):
+        response = post(*args, **kwargs)
+        closes = []
+        response.close = lambda close=response.close: (closes.append(1), close())
+        responses.append(closes)
+        return response
+
+    monkeypatch.setattr(client.session, "post", recording_post)
+    with pytest.raises(GroqAPIError):
+        list(client.answer_question("Why?", stream=True))
+    assert len(server.requests) == 2
+    assert all(closes for closes in responses)  # the retried 503 and the final 400
+
+def test_stream_decodes_utf8_without_a_charset(stub):
+    server = stub((200, {"Content-Type": "text/event-stream"}, _sse_completion("Café ", "naïve ", "— 東京")))
+    client = _client(server.url)
+    assert "".join(client.answer_question("Où?", stream=True)) == "Café naïve — 東京"
+
+
+def test_ask_relays_tokens_as_server_sent_events(stub, monkeypatch):
+    from backend import app as backend_app
+
+    server = stub(
+        (200, {"Content-Type": "text/event-stream"}, _sse_completion("Hello ", "there.")),
+        (200, {}, _completion("Hello there.")),
+    )
+    client = _client(server.url)
+    monkeypatch.setattr(backend_app, "get_groq_client", lambda: client)
+    http = backend_app.app.test_client()
+
+    response = http.post("/ask", json={"question": "Hi?", "stream": True})
+    assert response.mimetype == "text/event-stream"
+    events = [chunk for chunk in response.get_data(as_text=True).split("\n\n") if chunk]
+    assert [event.split("\n")[0] for event in events] == ["event: token", "event: token", "event: done"]
+    assert json.loads(events[-1].split("data: ", 1)[1]) == {"answer": "Hello there."}
+
+    plain = http.post("/ask", json={"question": "Hi?", "bypass_cache": True})
+    assert plain.get_json() == {"answer": "Hello there."}
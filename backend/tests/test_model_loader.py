@@ -0,0 +1,53 @@
+import pytest
+import torch
+from transformers import DistilBertConfig, DistilBertForSequenceClassification, DistilBertTokenizerFast
+
+from backend.utils.model_loader import ModelLoadError, load_classifier, resolve_weights_path, save_classifier
+
+VOCAB = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "the", "news", "is", "fake", "real"]
+
+
+@pytest.fixture
+def tiny_model(tmp_path):
+    vocab_file = tmp_path / "vocab.txt"
+    vocab_file.write_text("\n".join(VOCAB))
+    tokenizer = DistilBertTokenizerFast(vocab_file=str(vocab_file))
+    config = DistilBertConfig(
+        vocab_size=len(VOCAB), dim=16, n_layers=1, n_heads=2, hidden_dim=32, max_position_embeddings=64
+    )
+    torch.manual_seed(0)
+    return tokenizer, DistilBertForSequenceClassification(config).eval()
+
+
+def test_round_trip_reproduces_logits(tmp_path, tiny_model):
+    tokenizer, model = tiny_model
+    weights = tmp_path / "sanity_model.safetensors"
+    save_classifier(model, tokenizer, tmp_path / "model", weights)
+
+    loaded_tokenizer, loaded = load_classifier(tmp_path / "model", weights)
+    inputs = loaded_tokenizer(["the news is fake"], return_tensors="pt")
+    inputs.pop("token_type_ids", None)
+    with torch.no_grad():
+        assert torch.allclose(model(**inputs).logits, loaded(**inputs).logits, atol=1e-6)
+    assert not any(p.is_meta for p in loaded.parameters())
+    assert not any(b.is_meta for b in loaded.buffers())
+
+
+def test_mismatched_weights_fail_loudly(tmp_path, tiny_model):
+    tokenizer, model = tiny_model
+    weights = tmp_path / "sanity_model.safetensors"
+    save_classifier(model, tokenizer, tmp_path / "model", weights)
+    bigger = DistilBertConfig.from_pretrained(tmp_path / "model", n_layers=2)
+    bigger.save_pretrained(tmp_path / "model")
+
+    with pytest.raises(ModelLoadError):
+        load_classifier(tmp_path / "model", weights)
+
+
+def test_resolves_legacy_sibling_and_reports_missing(tmp_path):
+    legacy = tmp_path / "sanity_model.bin"
+    legacy.write_bytes(b"")
+    assert resolve_weights_path(tmp_path, tmp_path / "sanity_model.safetensors") == legacy
+
+    with pytest.raises(ModelLoadError):
+        resolve_weights_path(tmp_path / "empty", tmp_path / "missing.safetensors")
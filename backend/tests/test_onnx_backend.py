@@ -0,0 +1,50 @@
+import types
+
+import numpy as np
+import pytest
+import torch
+
+from backend.utils.onnx_backend import OnnxBackendError, OnnxSequenceClassifier, check_onnx_equivalence
+
+
+class FakeSession:
+    def __init__(self, offset=0.0):
+        self.offset = offset
+
+    def get_inputs(self):
+        return [types.SimpleNamespace(name="input_ids"), types.SimpleNamespace(name="attention_mask")]
+
+    def run(self, output_names, feed):
+        assert output_names == ["logits"]
+        lengths = feed["attention_mask"].sum(axis=1).astype(np.float32)
+        return [np.stack([-lengths, lengths + self.offset], axis=1)]
+
+
+class TorchTwin:
+    def eval(self):
+        return self
+
+    def __call__(self, input_ids, attention_mask):
+        lengths = attention_mask.sum(dim=1).float()
+        return types.SimpleNamespace(logits=torch.stack([-lengths, lengths], dim=1))
+
+
+class FakeTokenizer:
+    def __call__(self, texts, padding=True, truncation=True, max_length=512, return_tensors="pt"):
+        width = max(len(t.split()) for t in texts)
+        mask = torch.tensor([[1] * len(t.split()) + [0] * (width - len(t.split())) for t in texts])
+        return {"input_ids": mask * 7, "attention_mask": mask, "token_type_ids": torch.zeros_like(mask)}
+
+
+def test_wrapper_returns_torch_logits_and_drops_unknown_inputs():
+    model = OnnxSequenceClassifier(FakeSession())
+    out = model(**FakeTokenizer()(["a b", "a"]))
+    assert isinstance(out.logits, torch.Tensor)
+    assert out.logits.tolist() == [[-2.0, 2.0], [-1.0, 1.0]]
+
+
+def test_equivalence_check_detects_drift():
+    texts = ["a b c", "a"]
+    assert check_onnx_equivalence(TorchTwin(), OnnxSequenceClassifier(FakeSession()), FakeTokenizer(), texts) == 0.0
+    with pytest.raises(OnnxBackendError):
+        check_onnx_equivalence(TorchTwin(), OnnxSequenceClassifier(FakeSession(offset=0.5)), FakeTokenizer(), texts)
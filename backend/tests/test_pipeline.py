@@ -0,0 +1,107 @@
+import threading
+import types
+
+import numpy as np
+import pytest
+import torch
+
+from backend.utils.batching import MicroBatcher
+from backend.utils.inference import predict_probabilities
+from backend.utils.pipeline import InferencePipeline
+
+
+class WordTokenizer:
+    pad_token_id = 0
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, truncation=True, max_length=512):
+        self.calls.append(list(texts))
+        return {"input_ids": [[len(word) for word in text.split()][:max_length] for text in texts]}
+
+
+class LengthModel:
+    """Logits depend on the number of real tokens, so padding mistakes show up."""
+
+    def __init__(self, gate=None):
+        self.gate = gate
+        self.started = threading.Event()
+
+    def __call__(self, input_ids, attention_mask):
+        self.started.set()
+        if self.gate:
+            self.gate.wait(2)
+        lengths = attention_mask.sum(dim=1).float()
+        return types.SimpleNamespace(logits=torch.stack([lengths / 10, -lengths / 10], dim=1))
+
+
+def test_pipeline_matches_sequential_path_in_input_order():
+    texts = ["a bb ccc dddd", "a", "a bb", "a bb ccc dddd eeeee ffffff"]
+    pipeline = InferencePipeline(WordTokenizer(), LengthModel(), "cpu", batch_size=2)
+    try:
+        piped = pipeline(texts, timeout=2)
+    finally:
+        pipeline.stop(timeout=1)
+
+    expected = predict_probabilities(texts, WordTokenizer(), LengthModel(), "cpu", batch_size=2)
+    np.testing.assert_allclose(piped, expected, atol=1e-6)
+    stats = pipeline.stats()
+    assert stats["jobs"] == 1 and stats["in_flight"] == 0
+    assert set(stats["stages"]) == {"tokenize", "forward_wait", "forward", "postprocess"}
+    assert stats["bottleneck"] in ("tokenize", "forward", "postprocess")
+
+
+def test_next_batch_is_tokenized_while_model_runs():
+    gate = threading.Event()
+    tokenizer, model = WordTokenizer(), LengthModel(gate)
+    pipeline = InferencePipeline(tokenizer, model, "cpu")
+    try:
+        first = pipeline.submit(["first batch"])
+        assert model.started.wait(2)
+        second = pipeline.submit(["second batch"], postprocess=lambda probs: probs.shape)
+        for _ in range(200):
+            if len(tokenizer.calls) == 2:
+                break
+            threading.Event().wait(0.01)
+        # The forward pass of the first batch is still blocked.
+        assert tokenizer.calls == [["first batch"], ["second batch"]]
+        assert not first.done()
+        gate.set()
+        assert first.result(timeout=2).shape == (1, 2)
+        assert second.result(timeout=2) == (1, 2)
+    finally:
+        gate.set()
+        pipeline.stop(timeout=1)
+
+
+def test_model_errors_reach_the_caller():
+    class Broken:
+        def __call__(self, **inputs):
+            raise RuntimeError("forward failed")
+
+    pipeline = InferencePipeline(WordTokenizer(), Broken(), "cpu")
+    try:
+        with pytest.raises(RuntimeError, match="forward failed"):
+            pipeline(["text"], timeout=2)
+    finally:
+        pipeline.stop(timeout=1)
+    assert pipeline.stats()["errors"] == 1
+
+
+def test_batcher_accepts_future_returning_handler():
+    pipeline = InferencePipeline(WordTokenizer(), LengthModel(), "cpu")
+    batcher = MicroBatcher(
+        lambda texts: pipeline.submit(texts, postprocess=lambda probs: [round(float(row[0]), 3) for row in probs]),
+        max_batch_size=4,
+        max_wait_ms=20,
+    )
+    try:
+        futures = [batcher.submit("a " * n) for n in (1, 2, 3)]
+        results = [future.result(timeout=2) for future in futures]
+    finally:
+        batcher.stop(timeout=1)
+        pipeline.stop(timeout=1)
+    assert results == sorted(results)  # more tokens, higher "fake" logit
+    assert batcher.stats()["items"] == 3
+    assert batcher.stats()["in_flight"] == 0
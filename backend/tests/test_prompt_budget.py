@@ -0,0 +1,72 @@
+import types
+
+from backend.utils import prompt_budget
+from backend.utils.prompt_budget import GAP_MARKER, PromptBudget, TokenCounter, split_sentences
+
+LEAD = "The city council approved the new transit budget on Monday. Buses will run every ten minutes. Fares stay the same."
+FILLER = " ".join(f"Resident number {index} shared an unrelated anecdote about the weather." for index in range(60))
+KEY = "The transit budget was funded by a regional sales tax increase."
+ARTICLE = f"{LEAD} {FILLER} {KEY} {FILLER}"
+
+
+def test_heuristic_counter_grows_with_text():
+    counter = TokenCounter("some-unknown-model")
+    assert counter.count("") == 0
+    assert 0 < counter.count("one two three") < counter.count("one two three " * 10)
+
+
+def test_unavailable_tiktoken_encoding_falls_back_to_heuristic(monkeypatch):
+    def offline(name):
+        raise OSError("network unreachable")
+
+    fake = types.SimpleNamespace(encoding_for_model=offline, get_encoding=offline)
+    monkeypatch.setattr(prompt_budget, "tiktoken", fake)
+    counter = TokenCounter()  # nothing is loaded at construction
+    assert counter.method == "tiktoken (not loaded)"
+    assert counter.count("one two three") == 4  # max(ceil(13 / 4), ceil(3 * 1.3))
+    assert counter.method == "heuristic"
+
+
+def test_short_text_is_passed_through_unchanged():
+    budget = PromptBudget(TokenCounter(), budgets={"verify": 500})
+    fitted = budget.fit(LEAD, "verify")
+    assert fitted.text == LEAD
+    assert not fitted.compressed
+    assert fitted.sentences_kept == fitted.sentences_total == 3
+
+
+def test_long_text_is_fitted_with_lead_and_gap_markers():
+    counter = TokenCounter()
+    budget = PromptBudget(counter, budgets={"verify": 200})
+    fitted = budget.fit(ARTICLE, "verify")
+    assert fitted.compressed
+    assert fitted.tokens <= 200 < fitted.original_tokens
+    assert fitted.text.startswith(LEAD)
+    assert GAP_MARKER in fitted.text
+    kept = [sentence for sentence in split_sentences(fitted.text) if sentence != GAP_MARKER]
+    positions = [ARTICLE.index(sentence.replace(GAP_MARKER, "").strip()) for sentence in kept]
+    assert positions == sorted(positions)
+
+
+def test_followup_prefers_sentences_matching_the_question():
+    budget = PromptBudget(TokenCounter(), budgets={"followup": 120}, lead_sentences=1)
+    fitted = budget.fit(ARTICLE, "followup", query="How was the transit budget funded? Which tax?")
+    assert KEY in fitted.text
+    assert budget.fit(ARTICLE, "followup").text.count(KEY) == 0
+
+
+def test_oversized_lead_sentence_is_truncated_to_budget():
+    budget = PromptBudget(TokenCounter(), budgets={"verify": 20})
+    fitted = budget.fit("word " * 500, "verify")
+    assert fitted.tokens <= 20
+    assert fitted.text.endswith(GAP_MARKER)
+
+
+def test_stats_track_tokens_saved_per_flow():
+    budget = PromptBudget(TokenCounter(), budgets={"verify": 200})
+    budget.fit(ARTICLE, "verify")
+    budget.fit(LEAD, "verify")
+    stats = budget.stats()["flows"]["verify"]
+    assert stats["calls"] == 2 and stats["compressed"] == 1
+    assert stats["tokens_saved"] == stats["tokens_in"] - stats["tokens_out"] > 0
+    assert 0 < stats["saved_ratio"] < 1
@@ -0,0 +1,68 @@
+import os
+
+import pytest
+import torch
+from torch import nn
+
+from backend.utils.quantization import get_quantized_model, quantized_cache_path
+
+
+def _factory():
+    return nn.Sequential(nn.Linear(8, 4), nn.ReLU(), nn.Linear(4, 2))
+
+
+@pytest.fixture()
+def weights(tmp_path):
+    torch.manual_seed(0)
+    trained = _factory()
+    path = tmp_path / "sanity_model.safetensors"
+    path.write_bytes(b"fp32 weights")
+    loads = []
+
+    def fp32_loader():
+        loads.append(1)
+        return trained
+
+    return path, trained, fp32_loader, loads
+
+
+def test_int8_cache_is_built_then_reused(weights):
+    path, trained, fp32_loader, loads = weights
+    cache = quantized_cache_path(path)
+    assert cache.name == "sanity_model.int8.pt" and not cache.exists()
+
+    built = get_quantized_model(_factory, fp32_loader, path)
+    assert cache.exists() and len(loads) == 1
+
+    cached = get_quantized_model(_factory, fp32_loader, path)
+    assert len(loads) == 1  # served from the cache, fp32 model not loaded again
+    inputs = torch.randn(3, 8)
+    assert torch.allclose(built(inputs), cached(inputs))
+    assert not torch.allclose(_factory()(inputs), cached(inputs))
+
+
+def test_int8_cache_is_rebuilt_when_weights_change(weights):
+    path, trained, fp32_loader, loads = weights
+    get_quantized_model(_factory, fp32_loader, path)
+    cache = quantized_cache_path(path)
+    # The fp32 weights were replaced after the cache was written.
+    stale = path.stat().st_mtime - 60
+    os.utime(cache, (stale, stale))
+
+    get_quantized_model(_factory, fp32_loader, path)
+    assert len(loads) == 2
+    assert cache.stat().st_mtime >= path.stat().st_mtime
+
+    get_quantized_model(_factory, fp32_loader, path)
+    assert len(loads) == 2
+
+
+def test_corrupt_int8_cache_is_rebuilt(weights):
+    path, trained, fp32_loader, loads = weights
+    get_quantized_model(_factory, fp32_loader, path)
+    quantized_cache_path(path).write_bytes(b"not a state dict")
+    os.utime(quantized_cache_path(path), (path.stat().st_mtime + 1,) * 2)
+
+    model = get_quantized_model(_factory, fp32_loader, path)
+    assert len(loads) == 2
+    assert model(torch.randn(1, 8)).shape == (1, 2)
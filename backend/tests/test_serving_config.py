@@ -0,0 +1,61 @@
+import json
+
+from backend.utils.serving_config import (
+    CpuTopology,
+    ServingConfig,
+    choose_best,
+    detect_topology,
+    recommend_config,
+    resolve_serving_config,
+    save_serving_config,
+    summarize_run,
+)
+
+
+def _write_topology(root, cpu, package, core):
+    topology = root / f"cpu{cpu}" / "topology"
+    topology.mkdir(parents=True)
+    (topology / "physical_package_id").write_text(f"{package}\n")
+    (topology / "core_id").write_text(f"{core}\n")
+
+
+def test_detect_topology_counts_hyperthreads_once(tmp_path, monkeypatch):
+    monkeypatch.setattr("os.sched_getaffinity", lambda pid: {0, 1, 2, 3})
+    for cpu, core in enumerate([0, 1, 0, 1]):
+        _write_topology(tmp_path / "cpu", cpu, 0, core)
+    (tmp_path / "cgroup").mkdir()
+    (tmp_path / "cgroup" / "cpu.max").write_text("150000 100000\n")
+
+    topology = detect_topology(tmp_path / "cpu", tmp_path / "cgroup")
+
+    assert (topology.logical_cpus, topology.physical_cores, topology.sockets) == (4, 2, 1)
+    assert topology.cgroup_cpus == 1.5
+    assert topology.usable_cores == 1
+
+
+def test_recommendation_splits_cores_between_workers_and_threads():
+    assert (recommend_config(CpuTopology(2, 2)).workers, recommend_config(CpuTopology(2, 2)).torch_threads) == (1, 2)
+    config = recommend_config(CpuTopology(16, 8))
+    assert (config.workers, config.torch_threads, config.interop_threads) == (4, 2, 1)
+
+
+def test_tuned_file_only_applies_on_matching_topology(tmp_path):
+    path = tmp_path / "serving_config.json"
+    here, elsewhere = CpuTopology(8, 8), CpuTopology(32, 16)
+    save_serving_config(ServingConfig(workers=3, torch_threads=2, source="tuned", topology=here.fingerprint()), path)
+    assert json.loads(path.read_text())["workers"] == 3
+
+    assert resolve_serving_config(path, "auto", here).source == "tuned"
+    assert resolve_serving_config(path, "auto", elsewhere).source == "auto"
+    assert resolve_serving_config(path, "file", elsewhere).workers == 3
+    assert resolve_serving_config(path, "off", here) is None
+
+
+def test_choose_best_respects_p99_budget():
+    fast_but_spiky = {"workers": 4, **summarize_run([5.0] * 98 + [90.0, 95.0], 0.5)}
+    steady = {"workers": 2, **summarize_run([10.0] * 100, 1.0)}
+
+    assert fast_but_spiky["p99_ms"] == 90.0
+    assert choose_best([fast_but_spiky, steady])["workers"] == 4
+    assert choose_best([fast_but_spiky, steady], max_p99_ms=50)["workers"] == 2
+    assert choose_best([fast_but_spiky, steady], objective="latency")["workers"] == 2
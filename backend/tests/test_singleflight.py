@@ -0,0 +1,60 @@
+import threading
+import time
+
+import pytest
+
+from backend.utils.singleflight import SingleFlight
+
+
+def _run_concurrently(count, target):
+    results, errors = [], []
+
+    def worker():
+        try:
+            results.append(target())
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return results, errors
+
+
+def test_concurrent_duplicates_share_one_execution():
+    flight = SingleFlight("test")
+    executions = []
+
+    def slow():
+        executions.append(1)
+        time.sleep(0.2)
+        return {"label": "Real"}
+
+    results, errors = _run_concurrently(5, lambda: flight.do("key", slow))
+    assert not errors and len(executions) == 1
+    assert all(result is results[0] for result in results)
+    stats = flight.stats()
+    assert (stats["calls"], stats["executions"], stats["collapsed"], stats["in_flight"]) == (5, 1, 4, 0)
+
+
+def test_waiters_receive_the_leaders_exception_and_key_is_released():
+    flight = SingleFlight("test")
+
+    def failing():
+        time.sleep(0.2)
+        raise ValueError("bad url")
+
+    results, errors = _run_concurrently(3, lambda: flight.do("key", failing))
+    assert not results and len(errors) == 3
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert flight.do("key", lambda: "retried") == "retried"
+
+
+def test_sequential_and_distinct_calls_are_not_collapsed():
+    flight = SingleFlight("test")
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("a", lambda: 2) == 2
+    assert flight.do("b", lambda: 3) == 3
+    assert flight.stats()["collapsed"] == 0
@@ -0,0 +1,208 @@
+import threading
+
+import pytest
+
+from backend.utils.verification_controller import VerificationController, VerificationSkipped
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def _controller(clock, **kwargs):
+    options = {"max_calls_per_second": 0, "max_concurrent": 0, "failure_threshold": 2, "open_seconds": 30}
+    options.update(kwargs)
+    return VerificationController(clock=clock, sleep=clock.sleep, **options)
+
+
+def _fail():
+    raise RuntimeError("provider down")
+
+
+def test_circuit_opens_after_consecutive_failures_and_skips_calls():
+    clock = FakeClock()
+    controller = _controller(clock)
+    assert controller.call(lambda: "ok") == "ok"
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            controller.call(_fail)
+    assert controller.state == "open"
+
+    clock.now += 10
+    with pytest.raises(VerificationSkipped) as skipped:
+        controller.call(lambda: pytest.fail("must not be called"))
+    assert skipped.value.reason == "circuit_open"
+    assert skipped.value.retry_after == pytest.approx(20)
+    with pytest.raises(VerificationSkipped):
+        controller.check()
+    assert controller.stats()["skipped"]["circuit_open"] == 2
+
+
+def test_success_resets_the_failure_streak():
+    controller = _controller(FakeClock())
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            controller.call(_fail)
+        controller.call(lambda: "ok")
+    assert controller.state == "closed"
+
+
+def test_half_open_probe_closes_or_reopens_the_circuit():
+    clock = FakeClock()
+    controller = _controller(clock, failure_threshold=1)
+    with pytest.raises(RuntimeError):
+        controller.call(_fail)
+    clock.now += 31
+    assert controller.state == "half_open"
+    controller.check()
+
+    with pytest.raises(RuntimeError):
+        controller.call(_fail)
+    assert controller.state == "open"
+
+    clock.now += 31
+    assert controller.call(lambda: "recovered") == "recovered"
+    assert controller.state == "closed"
+    assert controller.stats()["times_opened"] == 2
+
+
+def test_only_one_probe_runs_while_half_open():
+    clock = FakeClock()
+    controller = _controller(clock, failure_threshold=1)
+    with pytest.raises(RuntimeError):
+        controller.call(_fail)
+    clock.now += 31
+    started, release = threading.Event(), threading.Event()
+
+    def probe():
+        started.set()
+        release.wait(5)
+        return "ok"
+
+    thread = threading.Thread(target=controller.call, args=(probe,))
+    thread.start()
+    started.wait(5)
+    with pytest.raises(VerificationSkipped):
+        controller.call(lambda: "second")
+    release.set()
+    thread.join(5)
+    assert controller.state == "closed"
+
+
+def test_slow_calls_count_as_failures():
+    clock = FakeClock()
+    controller = _controller(clock, slow_call_ms=1000)
+
+    def slow():
+        clock.now += 2
+        return "late"
+
+    assert controller.call(slow) == "late"
+    assert controller.call(slow) == "late"
+    assert controller.state == "open"
+    assert controller.stats()["slow_calls"] == 2
+
+
+def test_rate_limit_skips_or_waits_within_timeout():
+    clock = FakeClock()
+    controller = _controller(clock, max_calls_per_second=1)
+    controller.call(lambda: "first")
+    with pytest.raises(VerificationSkipped) as skipped:
+        controller.call(lambda: "second")
+    assert skipped.value.reason == "rate_limited"
+    assert controller.call(lambda: "waited", timeout=2) == "waited"
+    assert clock.now == pytest.approx(1)
+
+
+def test_concurrency_limit_skips_when_no_slot_is_free():
+    controller = VerificationController(max_calls_per_second=0, max_concurrent=1)
+    started, release = threading.Event(), threading.Event()
+
+    def busy():
+        started.set()
+        release.wait(5)
+
+    thread = threading.Thread(target=controller.call, args=(busy,))
+    thread.start()
+    started.wait(5)
+    with pytest.raises(VerificationSkipped) as skipped:
+        controller.call(lambda: "second")
+    assert skipped.value.reason == "concurrency_limit"
+    release.set()
+    thread.join(5)
+    assert controller.call(lambda: "free again") == "free again"
+    assert controller.stats()["in_flight"] == 0
+
+
+def test_concurrency_skip_refunds_the_rate_token():
+    clock = FakeClock()
+    controller = _controller(clock, max_calls_per_second=1, max_concurrent=1)
+    started, release = threading.Event(), threading.Event()
+
+    def busy():
+        started.set()
+        release.wait(5)
+
+    thread = threading.Thread(target=controller.call, args=(busy,), kwargs={"timeout": 5})
+    thread.start()
+    started.wait(5)
+    clock.now += 1  # one token refilled
+    for _ in range(3):
+        with pytest.raises(VerificationSkipped) as skipped:
+            controller.call(lambda: "blocked")
+        assert skipped.value.reason == "concurrency_limit"
+    release.set()
+    thread.join(5)
+    # The refused calls gave their tokens back, so the next one is not rate limited.
+    assert controller.call(lambda: "admitted") == "admitted"
+    assert controller.stats()["skipped"]["rate_limited"] == 0
+
+
+def test_rate_and_slot_waits_share_one_deadline():
+    clock = FakeClock()
+    controller = _controller(clock, max_calls_per_second=1, max_concurrent=1)
+    started, release = threading.Event(), threading.Event()
+
+    def busy():
+        started.set()
+        release.wait(5)
+
+    thread = threading.Thread(target=controller.call, args=(busy,))
+    thread.start()
+    started.wait(5)
+    with pytest.raises(VerificationSkipped) as skipped:
+        controller.call(lambda: "blocked", timeout=2)  # 1s for the rate token, then 1s left for a slot
+    assert skipped.value.reason == "concurrency_limit"
+    assert clock.now == pytest.approx(2, abs=0.06)
+    release.set()
+    thread.join(5)
+
+
+class LocalThrottle(RuntimeError):
+    pass
+
+
+def test_errors_that_are_not_provider_failures_leave_the_circuit_alone():
+    controller = _controller(
+        FakeClock(), failure_threshold=1, is_failure=lambda exc: not isinstance(exc, LocalThrottle)
+    )
+
+    def throttled():
+        raise LocalThrottle("client-side rate limit")
+
+    for _ in range(3):
+        with pytest.raises(LocalThrottle):
+            controller.call(throttled)
+    stats = controller.stats()
+    assert controller.state == "closed"
+    assert (stats["failures"], stats["ignored_errors"], stats["in_flight"]) == (0, 3, 0)
+    with pytest.raises(RuntimeError):
+        controller.call(_fail)
+    assert controller.state == "open"
@@ -0,0 +1,98 @@
+import threading
+
+import pytest
+
+from backend.utils.context_backends import SqliteContextBackend
+from backend.utils.verification_jobs import VerificationJobManager, VerificationQueueFull
+
+
+def test_job_runs_and_calls_completion_hook_before_done():
+    manager = VerificationJobManager(max_workers=1)
+    seen = []
+    job = manager.submit(lambda: {"prediction": "Fake"}, on_complete=lambda done: seen.append(done.status))
+    snapshot = manager.wait(job.job_id, timeout=5)
+    assert snapshot["status"] == "done"
+    assert snapshot["result"] == {"prediction": "Fake"}
+    assert seen == ["running"]
+
+
+def test_failed_job_reports_error():
+    manager = VerificationJobManager(max_workers=1)
+
+    def boom():
+        raise RuntimeError("llm down")
+
+    snapshot = manager.wait(manager.submit(boom).job_id, timeout=5)
+    assert snapshot["status"] == "failed"
+    assert snapshot["error"] == "llm down"
+    assert manager.stats()["failed"] == 1
+
+
+def test_same_key_shares_job_and_queue_is_bounded():
+    manager = VerificationJobManager(max_workers=1, max_pending=1)
+    release = threading.Event()
+    first = manager.submit(lambda: release.wait(5) and {"ok": True}, key="article")
+    assert manager.submit(lambda: {"ok": False}, key="article") is first
+    with pytest.raises(VerificationQueueFull):
+        manager.submit(lambda: {}, key="other")
+    release.set()
+    assert manager.wait(first.job_id, timeout=5)["result"] == {"ok": True}
+    stats = manager.stats()
+    assert (stats["deduplicated"], stats["rejected"], stats["active"]) == (1, 1, 0)
+
+
+def test_deduplicated_submits_are_all_in_context_ids():
+    manager = VerificationJobManager(max_workers=1)
+    release = threading.Event()
+    patched = []
+    first = manager.submit(
+        lambda: release.wait(5) and {"ok": True},
+        key="article",
+        context_id="ctx-1",
+        on_complete=lambda done: patched.extend(done.context_ids),
+    )
+    assert manager.submit(lambda: {}, key="article", context_id="ctx-2") is first
+    assert manager.submit(lambda: {}, key="article", context_id="ctx-2") is first
+    release.set()
+    snapshot = manager.wait(first.job_id, timeout=5)
+    assert snapshot["context_id"] == "ctx-1"
+    assert snapshot["context_ids"] == ["ctx-1", "ctx-2"]
+    assert patched == ["ctx-1", "ctx-2"]
+
+
+def test_events_stream_status_then_result():
+    manager = VerificationJobManager(max_workers=1)
+    release = threading.Event()
+    job = manager.submit(lambda: release.wait(5) and {"prediction": "Real"})
+    threading.Timer(0.1, release.set).start()
+    events = list(manager.events(job.job_id, heartbeat_seconds=0.01))
+    assert events[0].startswith("event: status")
+    assert ": keep-alive\n\n" in events
+    assert events[-1].startswith("event: result")
+
+
+def test_finished_jobs_expire():
+    manager = VerificationJobManager(max_workers=1, retention_seconds=0)
+    job = manager.submit(lambda: {})
+    manager.wait(job.job_id, timeout=5)
+    manager.submit(lambda: {})
+    assert manager.get(job.job_id) is None
+
+
+def test_jobs_are_visible_to_another_worker_through_a_shared_store(tmp_path):
+    path = tmp_path / "contexts.sqlite3"
+    worker_a = VerificationJobManager(max_workers=1, store=SqliteContextBackend(path))
+    worker_b = VerificationJobManager(max_workers=1, store=SqliteContextBackend(path), poll_seconds=0.01)
+    release = threading.Event()
+    job = worker_a.submit(lambda: release.wait(5) and {"prediction": "Fake"}, context_id="ctx")
+
+    assert worker_b.get(job.job_id)["status"] in ("pending", "running")
+    assert worker_b.wait(job.job_id, timeout=0.05)["status"] in ("pending", "running")
+    threading.Timer(0.1, release.set).start()
+    events = list(worker_b.events(job.job_id, heartbeat_seconds=0.05))
+    assert events[0].startswith("event: status")
+    assert events[-1].startswith("event: result") and '"Fake"' in events[-1]
+    snapshot = worker_b.get(job.job_id)
+    assert snapshot["status"] == "done" and snapshot["context_ids"] == ["ctx"]
+    assert worker_b.get("missing") is None
+    assert VerificationJobManager(max_workers=1).get(job.job_id) is None  # no store, no sharing
@@ -1,10 +1,59 @@
 """Utility package for the Sanity backend."""
 
+import importlib
+from typing import Any
+
 from .logger import get_logger, update_progress_log, log_and_raise
 from .pdf_extractor import extract_text_from_pdf, PDFExtractionError
-from .webpage_extractor import extract_text_from_url, WebExtractionError
-from .llm_handler import GroqClient, GroqResponse, GroqAPIError
+from .webpage_extractor import extract_text_from_url, normalize_url, WebExtractionError
+from .llm_handler import GroqClient, GroqResponse, GroqAPIError, GroqRateLimited
+from .llm_ledger import LLMCallLedger, end_ledger, start_ledger, track_llm_calls
+from .rate_limit import RateLimiter, TokenBucket
 from .text_cleaner import clean_text_for_prompt
+from .prompt_budget import PromptBudget, TokenCounter
+from .batching import MicroBatcher
+from .cache import TieredCache, content_hash, normalize_text
+from .context_store import ContextStore, ContextTooLarge
+from .context_backends import CONTEXT_BACKENDS, create_context_store
+from .calibration import Calibrator, default_calibration_path, load_calibrator
+from .cascade import STAGE_LINEAR, STAGE_TRANSFORMER, LinearCascade, LinearModelError, cascade_sweep
+from .memory import child_pids, process_memory
+from .singleflight import SingleFlight
+from .serving_config import ServingConfig, detect_topology, resolve_serving_config
+from .verification_controller import VerificationController, VerificationSkipped
+from .verification_jobs import VerificationJobManager, VerificationQueueFull, format_sse
+
+# Torch/ONNX-backed helpers are imported on first attribute access so that
+# importing the package (and the Flask app) stays cheap.
+_LAZY_EXPORTS = {
+    "predict_long_document": (".inference", "predict_long_document"),
+    "predict_probabilities": (".inference", "predict_probabilities"),
+    "warm_up_model": (".inference", "warm_up_model"),
+    "InferencePipeline": (".pipeline", "InferencePipeline"),
+    "ModelLoadError": (".model_loader", "ModelLoadError"),
+    "load_classifier": (".model_loader", "load_classifier"),
+    "save_classifier": (".model_loader", "save_classifier"),
+    "resolve_weights_path": (".model_loader", "resolve_weights_path"),
+    "convert_to_safetensors": (".model_loader", "convert_to_safetensors"),
+    "EarlyExitClassifier": (".early_exit", "EarlyExitClassifier"),
+    "load_early_exit_model": (".early_exit", "load_early_exit_model"),
+    "default_heads_path": (".early_exit", "default_heads_path"),
+    "get_quantized_model": (".quantization", "get_quantized_model"),
+    "quantize_model": (".quantization", "quantize_model"),
+    "OnnxBackendError": (".onnx_backend", "OnnxBackendError"),
+    "OnnxSequenceClassifier": (".onnx_backend", "OnnxSequenceClassifier"),
+    "create_onnx_session": (".onnx_backend", "create_session"),
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _LAZY_EXPORTS[name]
+    value = getattr(importlib.import_module(module_name, __name__), attribute)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     "get_logger",
@@ -13,10 +62,64 @@ __all__ = [
     "extract_text_from_pdf",
     "PDFExtractionError",
     "extract_text_from_url",
+    "normalize_url",
     "WebExtractionError",
     "GroqClient",
     "GroqResponse",
     "GroqAPIError",
+    "GroqRateLimited",
+    "LLMCallLedger",
+    "end_ledger",
+    "start_ledger",
+    "track_llm_calls",
+    "RateLimiter",
+    "TokenBucket",
     "clean_text_for_prompt",
+    "PromptBudget",
+    "TokenCounter",
+    "MicroBatcher",
+    "TieredCache",
+    "content_hash",
+    "normalize_text",
+    "ContextStore",
+    "ContextTooLarge",
+    "CONTEXT_BACKENDS",
+    "create_context_store",
+    "Calibrator",
+    "default_calibration_path",
+    "load_calibrator",
+    "LinearCascade",
+    "LinearModelError",
+    "STAGE_LINEAR",
+    "STAGE_TRANSFORMER",
+    "cascade_sweep",
+    "child_pids",
+    "process_memory",
+    "SingleFlight",
+    "ServingConfig",
+    "detect_topology",
+    "resolve_serving_config",
+    "VerificationController",
+    "VerificationSkipped",
+    "VerificationJobManager",
+    "VerificationQueueFull",
+    "format_sse",
+    "predict_long_document",
+    "predict_probabilities",
+    "warm_up_model",
+    "InferencePipeline",
+    "ModelLoadError",
+    "load_classifier",
+    "save_classifier",
+    "resolve_weights_path",
+    "convert_to_safetensors",
+    "EarlyExitClassifier",
+    "load_early_exit_model",
+    "default_heads_path",
+    "get_quantized_model",
+    "quantize_model",
+    "OnnxBackendError",
+    "OnnxSequenceClassifier",
+    "create_onnx_session",
 ]
 
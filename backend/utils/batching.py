@@ -0,0 +1,228 @@
+"""
+Dynamic micro-batching for model inference.
+
+Concurrent callers submit single items; a background worker groups them into
+batches (bounded by size and wait time) and runs one handler call per batch.
+Handlers may return a Future (e.g. an InferencePipeline submission); the
+worker then collects the next batch while the previous one is still running.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Generic, List, Optional, Sequence, TypeVar, Union
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass
+class _PendingItem(Generic[T]):
+    item: T
+    future: Future
+    enqueued_at: float
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Queue single inference requests and run them as grouped batches.
+
+    Args:
+        handler: Callable receiving a list of items and returning one result per
+            item, or a Future resolving to that list
+        max_batch_size: Largest number of items grouped into one handler call
+        max_wait_ms: Longest time the first item of a batch waits for company
+        max_in_flight: Batches whose Future may be pending at once; further
+            items keep queueing (and grouping) until one completes
+        name: Worker thread name (used in logs)
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[T]], Union[Sequence[R], Future]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0,
+        max_in_flight: int = 2,
+        name: str = "micro-batcher",
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1.")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be non-negative.")
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1.")
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_in_flight = max_in_flight
+        self.name = name
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self._in_flight_count = 0
+        self._queue: "queue.Queue[_PendingItem[T]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._reset_stats()
+
+    def _reset_stats(self) -> None:
+        self._batches = 0
+        self._items = 0
+        self._max_seen_batch = 0
+        self._batch_size_histogram: Dict[int, int] = {}
+        self._total_queue_wait = 0.0
+        self._total_handler_time = 0.0
+        self._errors = 0
+
+    def start(self) -> None:
+        """Start the worker thread (idempotent)."""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+            logger.info(
+                "Started %s | max_batch_size=%d max_wait_ms=%.1f",
+                self.name,
+                self.max_batch_size,
+                self.max_wait * 1000,
+            )
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the worker thread after the current batch completes."""
+        self._stopped.set()
+        thread = self._thread
+        if thread:
+            thread.join(timeout)
+
+    def submit(self, item: T) -> Future:
+        """Queue a single item and return a future for its result."""
+        if not self._thread or not self._thread.is_alive():
+            self.start()
+        future: Future = Future()
+        self._queue.put(_PendingItem(item=item, future=future, enqueued_at=time.perf_counter()))
+        return future
+
+    def __call__(self, item: T, timeout: Optional[float] = None) -> R:
+        """Submit an item and block until its result is available."""
+        return self.submit(item).result(timeout=timeout)
+
+    def _collect_batch(self) -> List[_PendingItem[T]]:
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                # Drain whatever is already queued without waiting further.
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except queue.Empty:
+                    break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            batch = self._collect_batch()
+            if batch:
+                self._process(batch)
+
+    def _process(self, batch: List[_PendingItem[T]]) -> None:
+        batch = [pending for pending in batch if pending.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        self._in_flight.acquire()
+        with self._lock:
+            self._in_flight_count += 1
+        started = time.perf_counter()
+        try:
+            results = self.handler([pending.item for pending in batch])
+        except Exception as exc:
+            self._complete(batch, started, None, exc)
+            return
+        if isinstance(results, Future):
+            results.add_done_callback(lambda done: self._complete_future(batch, started, done))
+        else:
+            self._complete(batch, started, results, None)
+
+    def _complete_future(self, batch: List[_PendingItem[T]], started: float, done: Future) -> None:
+        exc = done.exception()
+        self._complete(batch, started, None if exc else done.result(), exc)
+
+    def _complete(
+        self,
+        batch: List[_PendingItem[T]],
+        started: float,
+        results: Optional[Sequence[R]],
+        exc: Optional[BaseException],
+    ) -> None:
+        try:
+            if exc is None and len(results) != len(batch):
+                exc = RuntimeError(f"Batch handler returned {len(results)} results for {len(batch)} items.")
+            if exc is not None:
+                logger.error("%s batch of %d failed: %s", self.name, len(batch), exc, exc_info=exc)
+                with self._lock:
+                    self._errors += 1
+                for pending in batch:
+                    pending.future.set_exception(exc)
+                return
+
+            finished = time.perf_counter()
+            for pending, result in zip(batch, results):
+                pending.future.set_result(result)
+            with self._lock:
+                size = len(batch)
+                self._batches += 1
+                self._items += size
+                self._max_seen_batch = max(self._max_seen_batch, size)
+                self._batch_size_histogram[size] = self._batch_size_histogram.get(size, 0) + 1
+                self._total_queue_wait += sum(started - pending.enqueued_at for pending in batch)
+                self._total_handler_time += finished - started
+        finally:
+            with self._lock:
+                self._in_flight_count -= 1
+            self._in_flight.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth and batch-size statistics for tuning."""
+        with self._lock:
+            batches = self._batches
+            items = self._items
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "max_in_flight": self.max_in_flight,
+                "queue_depth": self._queue.qsize(),
+                "in_flight": self._in_flight_count,
+                "batches": batches,
+                "items": items,
+                "errors": self._errors,
+                "avg_batch_size": items / batches if batches else 0.0,
+                "max_observed_batch_size": self._max_seen_batch,
+                "batch_size_histogram": dict(sorted(self._batch_size_histogram.items())),
+                "avg_queue_wait_ms": (self._total_queue_wait / items * 1000) if items else 0.0,
+                "avg_batch_latency_ms": (self._total_handler_time / batches * 1000) if batches else 0.0,
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._reset_stats()
+
+
+__all__ = ["MicroBatcher"]
@@ -0,0 +1,241 @@
+"""
+Bounded in-memory LRU cache with TTL and an optional SQLite tier.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def content_hash(*parts: str) -> str:
+    """Stable SHA-256 hex digest of the given string parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace and case so trivially different copies share a key."""
+    return " ".join(text.split()).lower()
+
+
+class TieredCache:
+    """
+    LRU cache with per-entry expiry and an optional on-disk SQLite tier.
+
+    Values must be JSON-serializable when the disk tier is enabled. Memory
+    misses fall through to SQLite and promote the entry back into memory, so
+    the disk tier survives restarts and can be shared by several processes.
+    SQLite I/O runs under its own lock, never under the memory LRU lock, so a
+    slow disk does not stall memory hits on other threads.
+
+    Args:
+        max_entries: Maximum number of entries kept in memory (LRU eviction)
+        ttl_seconds: Default time-to-live for new entries (0 disables expiry)
+        db_path: Optional SQLite file for the persistent tier
+        namespace: Logical partition inside the SQLite table
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600.0,
+        db_path: Optional[Path] = None,
+        namespace: str = "default",
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+        self.db_path = Path(db_path) if db_path else None
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_pid: Optional[int] = None
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        if self.db_path:
+            with self._db_lock:
+                self._open_db()
+
+    def _open_db(self) -> None:
+        assert self.db_path is not None
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=5.0)
+        self._db_pid = os.getpid()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        self._db.commit()
+        logger.info("Opened %s cache tier at %s", self.namespace, self.db_path)
+
+    def _expiry(self, ttl: Optional[float]) -> float:
+        ttl = self.ttl_seconds if ttl is None else ttl
+        return time.time() + ttl if ttl and ttl > 0 else float("inf")
+
+    def _remember(self, key: str, value: Any, expires_at: float) -> None:
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        # Callers hold _db_lock. SQLite connections must not cross fork(); reopen in the child process.
+        if self._db is not None and self._db_pid != os.getpid():
+            self._open_db()
+        return self._db
+
+    def _disk_get(self, key: str) -> Tuple[Any, float] | None:
+        """Row for ``key`` (possibly already expired), or None."""
+        with self._db_lock:
+            db = self._connection()
+            if not db:
+                return None
+            try:
+                row = db.execute(
+                    "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                ).fetchone()
+            except sqlite3.Error as exc:
+                logger.warning("%s cache disk read failed: %s", self.namespace, exc)
+                return None
+        if not row:
+            return None
+        value, expires_at = row
+        return json.loads(value), expires_at
+
+    def _disk_set(self, key: str, value: Any, expires_at: float) -> None:
+        with self._db_lock:
+            db = self._connection()
+            if not db:
+                return
+            try:
+                db.execute(
+                    "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                    (self.namespace, key, json.dumps(value), expires_at if expires_at != float("inf") else 1e18),
+                )
+                db.commit()
+            except sqlite3.Error as exc:
+                logger.warning("%s cache disk write failed: %s", self.namespace, exc)
+
+    def _disk_delete(self, key: str) -> None:
+        with self._db_lock:
+            db = self._connection()
+            if not db:
+                return
+            try:
+                db.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+                db.commit()
+            except sqlite3.Error as exc:
+                logger.warning("%s cache disk delete failed: %s", self.namespace, exc)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value or ``None`` on a miss/expired entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+        if entry is not None:
+            self._disk_delete(key)
+            return None
+
+        disk_entry = self._disk_get(key)
+        if disk_entry is not None and disk_entry[1] <= time.time():
+            self._disk_delete(key)
+            with self._lock:
+                self._expirations += 1
+            disk_entry = None
+        with self._lock:
+            if disk_entry is None:
+                self._misses += 1
+                return None
+            current = self._entries.get(key)
+            if current is not None:
+                # A set() landed while we were reading the disk; it is newer.
+                value = current[0]
+            else:
+                value, expires_at = disk_entry
+                self._remember(key, value, expires_at)
+            self._hits += 1
+            self._disk_hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store ``value``; ``ttl`` overrides the default time-to-live (seconds)."""
+        expires_at = self._expiry(ttl)
+        with self._lock:
+            self._remember(key, value, expires_at)
+        self._disk_set(key, value, expires_at)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+        self._disk_delete(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        with self._db_lock:
+            db = self._connection()
+            if db:
+                try:
+                    db.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+                    db.commit()
+                except sqlite3.Error as exc:
+                    logger.warning("%s cache disk clear failed: %s", self.namespace, exc)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "disk_tier": str(self.db_path) if self.db_path else None,
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
+
+
+__all__ = ["TieredCache", "content_hash", "normalize_text"]
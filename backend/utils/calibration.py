@@ -0,0 +1,253 @@
+"""
+Post-hoc confidence calibration for the classifier.
+
+Raw softmax confidences of a fine-tuned transformer are rarely calibrated,
+so a fixed ``CONFIDENCE_THRESHOLD`` sends the wrong articles to the LLM.
+A calibrator is fitted offline on the validation split
+(``scripts/calibrate_model.py``), stored as JSON next to the weights and
+applied to the model's probabilities at serving time. Applying it needs
+numpy only; fitting the isotonic variant needs scikit-learn.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+CALIBRATION_SUFFIX = ".calibration.json"
+METHOD_TEMPERATURE = "temperature"
+METHOD_ISOTONIC = "isotonic"
+_EPS = 1e-7
+
+
+class CalibrationError(ValueError):
+    """Raised when a calibration file cannot be used."""
+
+
+def default_calibration_path(weights_path: Path) -> Path:
+    """``sanity_model.safetensors`` -> ``sanity_model.calibration.json``."""
+    weights_path = Path(weights_path)
+    return weights_path.with_name(weights_path.name.split(".")[0] + CALIBRATION_SUFFIX)
+
+
+def _as_2d(probs: np.ndarray) -> np.ndarray:
+    probs = np.asarray(probs, dtype=np.float64)
+    return probs[None, :] if probs.ndim == 1 else probs
+
+
+def apply_temperature(probs: np.ndarray, temperature: float) -> np.ndarray:
+    """Temperature-scale softmax outputs (log-probabilities equal logits up to a per-row shift)."""
+    logits = np.log(np.clip(_as_2d(probs), _EPS, 1.0)) / temperature
+    logits -= logits.max(axis=-1, keepdims=True)
+    scaled = np.exp(logits)
+    return scaled / scaled.sum(axis=-1, keepdims=True)
+
+
+def negative_log_likelihood(probs: np.ndarray, labels: Sequence[int]) -> float:
+    probs = _as_2d(probs)
+    labels = np.asarray(labels, dtype=int)
+    return float(-np.mean(np.log(np.clip(probs[np.arange(len(labels)), labels], _EPS, 1.0))))
+
+
+def expected_calibration_error(probs: np.ndarray, labels: Sequence[int], bins: int = 15) -> float:
+    """Gap between confidence and accuracy, averaged over equal-width confidence bins."""
+    probs = _as_2d(probs)
+    labels = np.asarray(labels, dtype=int)
+    confidence = probs.max(axis=-1)
+    correct = probs.argmax(axis=-1) == labels
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    error = 0.0
+    for low, high in zip(edges[:-1], edges[1:]):
+        in_bin = (confidence > low) & (confidence <= high)
+        if in_bin.any():
+            error += in_bin.mean() * abs(confidence[in_bin].mean() - correct[in_bin].mean())
+    return float(error)
+
+
+@dataclass
+class Calibrator:
+    """
+    Maps raw two-class softmax probabilities to calibrated ones.
+
+    ``temperature`` scales the log-probabilities; ``isotonic`` maps P(real)
+    through a monotone step function given by ``x_thresholds``/``y_values``.
+    """
+
+    method: str = METHOD_TEMPERATURE
+    temperature: float = 1.0
+    x_thresholds: List[float] = field(default_factory=list)
+    y_values: List[float] = field(default_factory=list)
+    metrics: Dict[str, Any] = field(default_factory=dict)
+
+    def apply(self, probs: np.ndarray) -> np.ndarray:
+        """Calibrate one row or a batch of ``[p_fake, p_real]`` rows (same shape returned)."""
+        raw = np.asarray(probs, dtype=np.float64)
+        batch = _as_2d(raw)
+        if self.method == METHOD_TEMPERATURE:
+            calibrated = apply_temperature(batch, self.temperature)
+        elif self.method == METHOD_ISOTONIC:
+            real = np.interp(batch[:, 1], self.x_thresholds, self.y_values)
+            calibrated = np.stack([1.0 - real, real], axis=-1)
+        else:
+            raise CalibrationError(f"Unknown calibration method: {self.method}")
+        return calibrated[0] if raw.ndim == 1 else calibrated
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Calibrator":
+        calibrator = cls(**{key: data[key] for key in cls.__dataclass_fields__ if key in data})
+        if calibrator.method == METHOD_TEMPERATURE and calibrator.temperature <= 0:
+            raise CalibrationError("Temperature must be positive.")
+        if calibrator.method == METHOD_ISOTONIC and (
+            not calibrator.x_thresholds or len(calibrator.x_thresholds) != len(calibrator.y_values)
+        ):
+            raise CalibrationError("Isotonic calibration needs matching x_thresholds and y_values.")
+        if calibrator.method not in (METHOD_TEMPERATURE, METHOD_ISOTONIC):
+            raise CalibrationError(f"Unknown calibration method: {calibrator.method}")
+        return calibrator
+
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Path) -> "Calibrator":
+        try:
+            data = json.loads(Path(path).read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as exc:
+            raise CalibrationError(f"Cannot read calibration file {path}: {exc}") from exc
+        return cls.from_dict(data)
+
+
+def load_calibrator(path: Path) -> Optional[Calibrator]:
+    """Calibrator stored at ``path``, or None (raw probabilities) if there is none."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    calibrator = Calibrator.load(path)
+    logger.info("Loaded %s calibration from %s", calibrator.method, path)
+    return calibrator
+
+
+def fit_temperature(probs: np.ndarray, labels: Sequence[int], low: float = 0.05, high: float = 20.0) -> float:
+    """Temperature minimising validation NLL (golden-section search over log T)."""
+    probs = _as_2d(probs)
+
+    def loss(log_t: float) -> float:
+        return negative_log_likelihood(apply_temperature(probs, float(np.exp(log_t))), labels)
+
+    ratio = (np.sqrt(5) - 1) / 2
+    a, b = np.log(low), np.log(high)
+    c, d = b - ratio * (b - a), a + ratio * (b - a)
+    loss_c, loss_d = loss(c), loss(d)
+    for _ in range(80):
+        if loss_c < loss_d:
+            b, d, loss_d = d, c, loss_c
+            c = b - ratio * (b - a)
+            loss_c = loss(c)
+        else:
+            a, c, loss_c = c, d, loss_d
+            d = a + ratio * (b - a)
+            loss_d = loss(d)
+    return float(np.exp((a + b) / 2))
+
+
+def fit_isotonic(probs: np.ndarray, labels: Sequence[int]) -> tuple[List[float], List[float]]:
+    """Monotone map from raw P(real) to the observed frequency of real articles."""
+    from sklearn.isotonic import IsotonicRegression
+
+    probs = _as_2d(probs)
+    regression = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds="clip")
+    regression.fit(probs[:, 1], np.asarray(labels, dtype=float))
+    return regression.X_thresholds_.tolist(), regression.y_thresholds_.tolist()
+
+
+def fit_calibrator(probs: np.ndarray, labels: Sequence[int], method: str = METHOD_TEMPERATURE) -> Calibrator:
+    """Fit a calibrator and record before/after NLL and ECE on the same data."""
+    probs = _as_2d(probs)
+    if method == METHOD_TEMPERATURE:
+        calibrator = Calibrator(method, temperature=fit_temperature(probs, labels))
+    elif method == METHOD_ISOTONIC:
+        x_thresholds, y_values = fit_isotonic(probs, labels)
+        calibrator = Calibrator(method, x_thresholds=x_thresholds, y_values=y_values)
+    else:
+        raise CalibrationError(f"Unknown calibration method: {method}")
+    calibrated = calibrator.apply(probs)
+    calibrator.metrics = {
+        "samples": int(len(probs)),
+        "nll_before": negative_log_likelihood(probs, labels),
+        "nll_after": negative_log_likelihood(calibrated, labels),
+        "ece_before": expected_calibration_error(probs, labels),
+        "ece_after": expected_calibration_error(calibrated, labels),
+        "fitted_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    return calibrator
+
+
+def threshold_sweep(
+    probs: np.ndarray,
+    labels: Sequence[int],
+    thresholds: Sequence[float],
+    llm_accuracy: Optional[float] = None,
+) -> List[Dict[str, float]]:
+    """
+    Verification rate and accuracy at each confidence threshold.
+
+    Articles below the threshold go to the LLM. ``accepted_accuracy`` is the
+    classifier's accuracy on the rest; with ``llm_accuracy`` given,
+    ``expected_accuracy`` also credits verified articles at that rate.
+    """
+    probs = _as_2d(probs)
+    labels = np.asarray(labels, dtype=int)
+    confidence = probs.max(axis=-1)
+    correct = probs.argmax(axis=-1) == labels
+    rows = []
+    for threshold in thresholds:
+        verified = confidence < threshold
+        accepted = ~verified
+        row = {
+            "threshold": float(threshold),
+            "verification_rate": float(np.mean(verified)),
+            "model_accuracy": float(np.mean(correct)),
+            "accepted_accuracy": float(np.mean(correct[accepted])) if accepted.any() else 1.0,
+        }
+        if llm_accuracy is not None:
+            row["expected_accuracy"] = float(
+                (correct[accepted].sum() + llm_accuracy * verified.sum()) / len(labels)
+            )
+        rows.append(row)
+    return rows
+
+
+def recommend_threshold(rows: Sequence[Dict[str, float]], max_verification_rate: float) -> Optional[Dict[str, float]]:
+    """Highest threshold (most errors caught) whose verification rate fits the budget."""
+    within = [row for row in rows if row["verification_rate"] <= max_verification_rate]
+    return max(within, key=lambda row: row["threshold"]) if within else None
+
+
+__all__ = [
+    "CALIBRATION_SUFFIX",
+    "CalibrationError",
+    "Calibrator",
+    "METHOD_ISOTONIC",
+    "METHOD_TEMPERATURE",
+    "default_calibration_path",
+    "expected_calibration_error",
+    "fit_calibrator",
+    "load_calibrator",
+    "negative_log_likelihood",
+    "recommend_threshold",
+    "threshold_sweep",
+]
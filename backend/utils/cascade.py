@@ -0,0 +1,149 @@
+"""
+Two-stage cascade: a TF-IDF + logistic-regression scorer in front of DistilBERT.
+
+The linear model decides articles it is confident about; everything else
+is passed on to the transformer.
+"""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+STAGE_LINEAR = "linear"
+STAGE_TRANSFORMER = "transformer"
+
+
+class LinearModelError(RuntimeError):
+    """Raised when the linear cascade model is missing or unusable."""
+
+
+class LinearCascade:
+    """
+    Wraps a fitted sklearn pipeline (``TfidfVectorizer`` -> ``LogisticRegression``).
+
+    Args:
+        pipeline: Fitted estimator exposing ``predict_proba`` and ``classes_``
+        threshold: Minimum top-class probability for the linear stage to decide
+    """
+
+    def __init__(self, pipeline: Any, threshold: float = 0.9) -> None:
+        classes = [int(label) for label in pipeline.classes_]
+        if sorted(classes) != [0, 1]:
+            raise LinearModelError(f"Expected binary labels 0/1, got {classes}.")
+        self.pipeline = pipeline
+        self.threshold = threshold
+        # Column order matching the transformer's [fake, real] probabilities.
+        self._columns = [classes.index(0), classes.index(1)]
+        self._lock = threading.Lock()
+        self._linear = 0
+        self._transformer = 0
+
+    @classmethod
+    def load(cls, path: Path, threshold: float = 0.9) -> "LinearCascade":
+        import joblib
+
+        path = Path(path)
+        if not path.exists():
+            raise LinearModelError(f"Linear model not found at {path}; run scripts/train_linear.py.")
+        pipeline = joblib.load(path)
+        logger.info("Loaded linear cascade model from %s (threshold=%.2f)", path, threshold)
+        return cls(pipeline, threshold=threshold)
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        """Probabilities as an (n, 2) array of [fake, real]."""
+        if not texts:
+            return np.empty((0, 2), dtype=np.float32)
+        return self.pipeline.predict_proba(list(texts))[:, self._columns]
+
+    def confident(self, probs: np.ndarray, threshold: Optional[float] = None) -> np.ndarray:
+        """Boolean mask of rows the linear stage may decide on its own."""
+        threshold = self.threshold if threshold is None else threshold
+        return probs.max(axis=-1) >= threshold
+
+    def classify(
+        self,
+        texts: Sequence[str],
+        transformer: Callable[[List[str]], np.ndarray],
+        threshold: Optional[float] = None,
+    ) -> Tuple[np.ndarray, List[str]]:
+        """
+        Score ``texts`` with the cascade.
+
+        Args:
+            texts: Articles to classify
+            transformer: Returns [fake, real] probabilities for the texts it is given
+            threshold: Overrides the instance threshold
+
+        Returns:
+            Tuple of (probabilities in input order, deciding stage per text)
+        """
+        probs = self.predict_proba(texts)
+        confident = self.confident(probs, threshold)
+        escalated = [idx for idx, ok in enumerate(confident) if not ok]
+        if escalated:
+            probs = probs.copy()
+            probs[escalated] = transformer([texts[idx] for idx in escalated])
+        with self._lock:
+            self._transformer += len(escalated)
+            self._linear += len(texts) - len(escalated)
+        return probs, [STAGE_LINEAR if ok else STAGE_TRANSFORMER for ok in confident]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._linear + self._transformer
+            return {
+                "threshold": self.threshold,
+                "linear": self._linear,
+                "transformer": self._transformer,
+                "skip_rate": self._linear / total if total else 0.0,
+            }
+
+
+def cascade_sweep(
+    linear_probs: np.ndarray,
+    transformer_probs: np.ndarray,
+    labels: Sequence[int],
+    thresholds: Sequence[float],
+) -> List[Dict[str, float]]:
+    """
+    Accuracy and transformer skip rate of the cascade at each threshold.
+
+    Both stages are scored once on every example; each threshold then just
+    chooses which stage's prediction counts.
+    """
+    labels = np.asarray(labels)
+    linear_pred = linear_probs.argmax(axis=-1)
+    transformer_pred = transformer_probs.argmax(axis=-1)
+    confidence = linear_probs.max(axis=-1)
+    rows = []
+    for threshold in thresholds:
+        skipped = confidence >= threshold
+        predictions = np.where(skipped, linear_pred, transformer_pred)
+        rows.append(
+            {
+                "threshold": float(threshold),
+                "accuracy": float(np.mean(predictions == labels)),
+                "skip_rate": float(np.mean(skipped)),
+                "linear_accuracy_on_skipped": float(np.mean(linear_pred[skipped] == labels[skipped]))
+                if skipped.any()
+                else 0.0,
+            }
+        )
+    return rows
+
+
+__all__ = [
+    "LinearCascade",
+    "LinearModelError",
+    "STAGE_LINEAR",
+    "STAGE_TRANSFORMER",
+    "cascade_sweep",
+]
@@ -0,0 +1,603 @@
+"""
+Shared context backends so /ask follow-ups work on any worker.
+
+``ContextStore`` (in-process) remains the default. ``SqliteContextBackend``
+shares contexts between the Gunicorn workers of one node through a WAL-mode
+SQLite file; ``KeyValueContextBackend`` talks to a networked key-value store
+through a three-method client (``LocalKeyValueClient`` stands in for it in
+tests). Shared backends are wrapped in ``CachedContextStore``, a small
+per-worker read-through cache that keeps repeat lookups in memory.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Protocol, Tuple
+
+from .cache import content_hash
+from .context_store import TEXT_FIELD, ContextStore, ContextTooLarge
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+CONTEXT_BACKENDS = ("memory", "sqlite", "kv")
+# Reads refresh a context's LRU position at most this often (each refresh is a write).
+_TOUCH_INTERVAL_SECONDS = 60.0
+
+
+def _pack(value: Any, level: int) -> bytes:
+    return zlib.compress(json.dumps(value, default=str).encode("utf-8"), level)
+
+
+def _unpack(data: bytes) -> Any:
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+def _rollback(db: sqlite3.Connection) -> None:
+    if db.in_transaction:
+        db.execute("ROLLBACK")
+
+
+class _ContextMapping(ABC):
+    """Dict-style sugar over ``get``/``set``/``delete``, which every backend must implement."""
+
+    @abstractmethod
+    def get(self, context_id: str, default: Any = None) -> Any: ...
+
+    @abstractmethod
+    def set(self, context_id: str, context: Dict[str, Any]) -> None: ...
+
+    @abstractmethod
+    def delete(self, context_id: str) -> None: ...
+
+    def __setitem__(self, context_id: str, context: Dict[str, Any]) -> None:
+        self.set(context_id, context)
+
+    def __getitem__(self, context_id: str) -> Dict[str, Any]:
+        context = self.get(context_id)
+        if context is None:
+            raise KeyError(context_id)
+        return context
+
+    def __delitem__(self, context_id: str) -> None:
+        self.delete(context_id)
+
+    def __contains__(self, context_id: object) -> bool:
+        return isinstance(context_id, str) and self.get(context_id) is not None
+
+
+class SqliteContextBackend(_ContextMapping):
+    """
+    Contexts in a WAL-mode SQLite file shared by every worker on the node.
+
+    Article text is compressed and stored once per content hash. Expired and
+    over-budget rows (least recently used first) are pruned every
+    ``prune_every`` writes. A context that alone exceeds ``max_bytes`` is
+    rejected with ``ContextTooLarge``, as in the in-process store.
+
+    Args:
+        path: SQLite database file
+        ttl_seconds: Context lifetime since its last write (0 = no expiry)
+        max_entries: Most contexts kept (0 = unlimited)
+        max_bytes: Budget for compressed text plus metadata (0 = unlimited)
+        compress_level: zlib level for text and metadata
+        prune_every: Writes between pruning passes
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        ttl_seconds: float = 6 * 3600,
+        max_entries: int = 100_000,
+        max_bytes: int = 0,
+        compress_level: int = 6,
+        prune_every: int = 256,
+    ) -> None:
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        self.prune_every = prune_every
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_pid: Optional[int] = None
+        self._writes = 0
+        self._rejected = 0
+        self._evictions = 0
+        self._open_db()
+
+    def _open_db(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=5.0, isolation_level=None)
+        self._db_pid = os.getpid()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS context_texts (hash TEXT PRIMARY KEY, data BLOB NOT NULL)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS contexts ("
+            " id TEXT PRIMARY KEY,"
+            " text_hash TEXT,"
+            " metadata BLOB NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS contexts_updated ON contexts (updated_at)")
+        logger.info("Opened shared context store at %s", self.path)
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections must not cross fork(); reopen in the child process.
+        if self._db is None or self._db_pid != os.getpid():
+            self._open_db()
+        assert self._db is not None
+        return self._db
+
+    def _expiry(self) -> float:
+        return time.time() + self.ttl_seconds if self.ttl_seconds > 0 else 1e18
+
+    def get(self, context_id: str, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                db = self._connection()
+                row = db.execute(
+                    "SELECT c.metadata, c.expires_at, t.data, c.updated_at FROM contexts c"
+                    " LEFT JOIN context_texts t ON t.hash = c.text_hash WHERE c.id = ?",
+                    (context_id,),
+                ).fetchone()
+                now = time.time()
+                if row is not None and row[1] > now and row[3] < now - _TOUCH_INTERVAL_SECONDS:
+                    db.execute("UPDATE contexts SET updated_at = ? WHERE id = ?", (now, context_id))
+            except sqlite3.Error as exc:
+                logger.warning("Context read failed: %s", exc)
+                return default
+        if row is None or row[1] <= now:
+            return default
+        context = _unpack(row[0])
+        if row[2] is not None:
+            context[TEXT_FIELD] = zlib.decompress(row[2]).decode("utf-8")
+        return context
+
+    def set(self, context_id: str, context: Dict[str, Any]) -> None:
+        metadata = {key: value for key, value in context.items() if key != TEXT_FIELD}
+        text = context.get(TEXT_FIELD)
+        text_hash = content_hash(text) if text is not None else None
+        packed = _pack(metadata, self.compress_level)
+        data = zlib.compress(text.encode("utf-8"), self.compress_level) if text is not None else b""
+        needed = len(packed) + len(data)
+        if self.max_bytes and needed > self.max_bytes:
+            with self._lock:
+                self._rejected += 1
+            logger.warning(
+                "Context %s rejected: %d bytes exceeds the %d byte budget", context_id, needed, self.max_bytes
+            )
+            raise ContextTooLarge(f"Context needs {needed} bytes; the store budget is {self.max_bytes}.")
+        with self._lock:
+            db = self._connection()
+            try:
+                db.execute("BEGIN IMMEDIATE")
+                if text_hash is not None:
+                    db.execute("INSERT OR IGNORE INTO context_texts (hash, data) VALUES (?, ?)", (text_hash, data))
+                db.execute(
+                    "INSERT OR REPLACE INTO contexts (id, text_hash, metadata, expires_at, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (context_id, text_hash, packed, self._expiry(), time.time()),
+                )
+                db.execute("COMMIT")
+            except sqlite3.Error as exc:
+                _rollback(db)
+                logger.warning("Context write failed: %s", exc)
+                return
+            self._writes += 1
+            if self.prune_every and self._writes % self.prune_every == 0:
+                self._prune(db)
+
+    def patch(self, context_id: str, **fields: Any) -> bool:
+        """Update metadata fields atomically across workers; returns False if the context is gone."""
+        if TEXT_FIELD in fields:
+            raise ValueError("Replace the whole context to change its article text.")
+        with self._lock:
+            db = self._connection()
+            try:
+                db.execute("BEGIN IMMEDIATE")
+                row = db.execute(
+                    "SELECT metadata FROM contexts WHERE id = ? AND expires_at > ?", (context_id, time.time())
+                ).fetchone()
+                if row is None:
+                    db.execute("COMMIT")
+                    return False
+                metadata = {**_unpack(row[0]), **fields}
+                db.execute(
+                    "UPDATE contexts SET metadata = ?, expires_at = ?, updated_at = ? WHERE id = ?",
+                    (_pack(metadata, self.compress_level), self._expiry(), time.time(), context_id),
+                )
+                db.execute("COMMIT")
+                return True
+            except sqlite3.Error as exc:
+                _rollback(db)
+                logger.warning("Context patch failed: %s", exc)
+                return False
+
+    def delete(self, context_id: str) -> None:
+        with self._lock:
+            try:
+                self._connection().execute("DELETE FROM contexts WHERE id = ?", (context_id,))
+            except sqlite3.Error as exc:
+                logger.warning("Context delete failed: %s", exc)
+
+    def _prune(self, db: sqlite3.Connection) -> None:
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute("DELETE FROM contexts WHERE expires_at <= ?", (time.time(),))
+            if self.max_entries:
+                db.execute(
+                    "DELETE FROM contexts WHERE id IN"
+                    " (SELECT id FROM contexts ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+            if self.max_bytes:
+                self._evict_over_budget(db)
+            db.execute(
+                "DELETE FROM context_texts WHERE hash NOT IN"
+                " (SELECT text_hash FROM contexts WHERE text_hash IS NOT NULL)"
+            )
+            db.execute("COMMIT")
+        except sqlite3.Error as exc:
+            _rollback(db)
+            logger.warning("Context prune failed: %s", exc)
+
+    def _evict_over_budget(self, db: sqlite3.Connection) -> None:
+        """Delete least recently used contexts until metadata plus referenced text fits ``max_bytes``."""
+        text_sizes = dict(
+            db.execute(
+                "SELECT t.hash, LENGTH(t.data) FROM context_texts t"
+                " WHERE t.hash IN (SELECT text_hash FROM contexts WHERE text_hash IS NOT NULL)"
+            ).fetchall()
+        )
+        refs = dict(
+            db.execute(
+                "SELECT text_hash, COUNT(*) FROM contexts WHERE text_hash IS NOT NULL GROUP BY text_hash"
+            ).fetchall()
+        )
+        live = db.execute("SELECT COALESCE(SUM(LENGTH(metadata)), 0) FROM contexts").fetchone()[0]
+        live += sum(text_sizes.values())
+        if live <= self.max_bytes:
+            return
+        evicted = []
+        for context_id, text_hash, size in db.execute(
+            "SELECT id, text_hash, LENGTH(metadata) FROM contexts ORDER BY updated_at"
+        ).fetchall():
+            if live <= self.max_bytes:
+                break
+            evicted.append((context_id,))
+            live -= size
+            if text_hash is not None:
+                refs[text_hash] -= 1
+                if refs[text_hash] == 0:
+                    live -= text_sizes.get(text_hash, 0)
+        db.executemany("DELETE FROM contexts WHERE id = ?", evicted)
+        self._evictions += len(evicted)
+
+    def prune(self) -> None:
+        with self._lock:
+            self._prune(self._connection())
+
+    def clear(self) -> None:
+        with self._lock:
+            db = self._connection()
+            db.execute("DELETE FROM contexts")
+            db.execute("DELETE FROM context_texts")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            try:
+                db = self._connection()
+                entries = db.execute("SELECT COUNT(*) FROM contexts").fetchone()[0]
+                texts, text_bytes = db.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM context_texts"
+                ).fetchone()
+                metadata_bytes = db.execute("SELECT COALESCE(SUM(LENGTH(metadata)), 0) FROM contexts").fetchone()[0]
+            except sqlite3.Error as exc:
+                return {"backend": "sqlite", "path": str(self.path), "error": str(exc)}
+            rejected, evictions = self._rejected, self._evictions
+        return {
+            "backend": "sqlite",
+            "path": str(self.path),
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "unique_texts": texts,
+            "text_bytes": text_bytes,
+            "live_bytes": text_bytes + metadata_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "rejected": rejected,
+            "evictions": evictions,
+        }
+
+
+class KeyValueClient(Protocol):
+    """Minimal networked key-value store interface (bytes in, bytes out)."""
+
+    def get(self, key: str) -> Optional[bytes]: ...
+
+    def set(self, key: str, value: bytes, ttl_seconds: Optional[float] = None) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+
+class LocalKeyValueClient:
+    """In-process stand-in for a networked key-value store (tests and single-node dev)."""
+
+    def __init__(self) -> None:
+        self._data: Dict[str, Tuple[bytes, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[1] <= time.time():
+                del self._data[key]
+                return None
+            return item[0]
+
+    def set(self, key: str, value: bytes, ttl_seconds: Optional[float] = None) -> None:
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl_seconds if ttl_seconds else float("inf"))
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class RedisKeyValueClient:
+    """``KeyValueClient`` over Redis (requires the optional ``redis`` package)."""
+
+    def __init__(self, url: str) -> None:
+        try:
+            import redis
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise ImportError("CONTEXT_BACKEND=kv needs the 'redis' package (pip install redis).") from exc
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: bytes, ttl_seconds: Optional[float] = None) -> None:
+        self._client.set(key, value, ex=max(1, int(ttl_seconds)) if ttl_seconds else None)
+
+    def delete(self, key: str) -> None:
+        self._client.delete(key)
+
+
+class KeyValueContextBackend(_ContextMapping):
+    """
+    Contexts in a networked key-value store.
+
+    Metadata and article text live under separate keys so identical articles
+    are stored once; both expire through the store's own TTL. ``patch`` is a
+    read-modify-write and is not atomic across workers. ``max_bytes`` only
+    rejects single oversized contexts; the total is bounded by the store's
+    own memory policy (e.g. Redis ``maxmemory``).
+
+    Args:
+        client: Object implementing ``KeyValueClient``
+        ttl_seconds: Context lifetime since its last write (0 = no expiry)
+        prefix: Key namespace
+        compress_level: zlib level
+        max_bytes: Largest single context, compressed text plus metadata (0 = unlimited)
+    """
+
+    def __init__(
+        self,
+        client: KeyValueClient,
+        ttl_seconds: float = 6 * 3600,
+        prefix: str = "sanity:ctx:",
+        compress_level: int = 6,
+        max_bytes: int = 0,
+    ) -> None:
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self.compress_level = compress_level
+        self.max_bytes = max_bytes
+
+    def _ttl(self) -> Optional[float]:
+        return self.ttl_seconds if self.ttl_seconds > 0 else None
+
+    def get(self, context_id: str, default: Any = None) -> Any:
+        data = self.client.get(f"{self.prefix}{context_id}")
+        if data is None:
+            return default
+        record = _unpack(data)
+        context = record["metadata"]
+        if record.get("text_hash"):
+            text = self.client.get(f"{self.prefix}text:{record['text_hash']}")
+            if text is None:
+                return default
+            context[TEXT_FIELD] = zlib.decompress(text).decode("utf-8")
+        return context
+
+    def set(self, context_id: str, context: Dict[str, Any]) -> None:
+        metadata = {key: value for key, value in context.items() if key != TEXT_FIELD}
+        text = context.get(TEXT_FIELD)
+        text_hash = content_hash(text) if text is not None else None
+        data = zlib.compress(text.encode("utf-8"), self.compress_level) if text is not None else None
+        record = _pack({"metadata": metadata, "text_hash": text_hash}, self.compress_level)
+        needed = len(record) + len(data or b"")
+        if self.max_bytes and needed > self.max_bytes:
+            logger.warning(
+                "Context %s rejected: %d bytes exceeds the %d byte budget", context_id, needed, self.max_bytes
+            )
+            raise ContextTooLarge(f"Context needs {needed} bytes; the store budget is {self.max_bytes}.")
+        if data is not None:
+            # Rewritten on every set so shared text outlives each context referring to it.
+            self.client.set(f"{self.prefix}text:{text_hash}", data, self._ttl())
+        self.client.set(f"{self.prefix}{context_id}", record, self._ttl())
+
+    def patch(self, context_id: str, **fields: Any) -> bool:
+        if TEXT_FIELD in fields:
+            raise ValueError("Replace the whole context to change its article text.")
+        data = self.client.get(f"{self.prefix}{context_id}")
+        if data is None:
+            return False
+        record = _unpack(data)
+        record["metadata"].update(fields)
+        self.client.set(f"{self.prefix}{context_id}", _pack(record, self.compress_level), self._ttl())
+        return True
+
+    def delete(self, context_id: str) -> None:
+        self.client.delete(f"{self.prefix}{context_id}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "kv",
+            "client": type(self.client).__name__,
+            "ttl_seconds": self.ttl_seconds,
+            "max_bytes": self.max_bytes,
+        }
+
+
+class CachedContextStore(_ContextMapping):
+    """
+    Per-worker read-through cache in front of a shared backend.
+
+    Reads are served from a small in-memory LRU for ``ttl_seconds`` (so a
+    patch made by another worker shows up within that window); writes go
+    through to the backend and refresh the local copy.
+
+    Args:
+        backend: Shared backend (``SqliteContextBackend`` or ``KeyValueContextBackend``)
+        max_entries: Local LRU size
+        ttl_seconds: How long a local copy is trusted
+    """
+
+    def __init__(self, backend: Any, max_entries: int = 1024, ttl_seconds: float = 2.0) -> None:
+        self.backend = backend
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._local: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._backend_reads = 0
+        self._backend_read_seconds = 0.0
+
+    def _remember(self, context_id: str, context: Dict[str, Any]) -> None:
+        with self._lock:
+            self._local[context_id] = (dict(context), time.monotonic() + self.ttl_seconds)
+            self._local.move_to_end(context_id)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+
+    def get(self, context_id: str, default: Any = None) -> Any:
+        with self._lock:
+            item = self._local.get(context_id)
+            if item is not None and item[1] > time.monotonic():
+                self._local.move_to_end(context_id)
+                self._hits += 1
+                return dict(item[0])
+            self._local.pop(context_id, None)
+            self._misses += 1
+        started = time.perf_counter()
+        context = self.backend.get(context_id)
+        with self._lock:
+            self._backend_reads += 1
+            self._backend_read_seconds += time.perf_counter() - started
+        if context is None:
+            return default
+        self._remember(context_id, context)
+        return context
+
+    def set(self, context_id: str, context: Dict[str, Any]) -> None:
+        self.backend.set(context_id, context)
+        self._remember(context_id, context)
+
+    def patch(self, context_id: str, **fields: Any) -> bool:
+        with self._lock:
+            self._local.pop(context_id, None)
+        return self.backend.patch(context_id, **fields)
+
+    def delete(self, context_id: str) -> None:
+        with self._lock:
+            self._local.pop(context_id, None)
+        self.backend.delete(context_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            local = {
+                "entries": len(self._local),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "avg_backend_read_ms": self._backend_read_seconds / self._backend_reads * 1000
+                if self._backend_reads
+                else 0.0,
+            }
+        return {**self.backend.stats(), "local_cache": local}
+
+
+def create_context_store(
+    backend: str = "memory",
+    max_entries: int = 10_000,
+    max_bytes: int = 64 * 1024 * 1024,
+    ttl_seconds: float = 6 * 3600,
+    db_path: Optional[Path] = None,
+    kv_url: Optional[str] = None,
+    kv_client: Optional[KeyValueClient] = None,
+    local_cache_entries: int = 1024,
+    local_cache_ttl: float = 2.0,
+) -> Any:
+    """
+    Build the context store selected by ``backend`` (``memory``, ``sqlite`` or ``kv``).
+
+    Raises:
+        ValueError: For an unknown backend or missing ``db_path``/``kv_url``
+    """
+    backend = backend.lower()
+    if backend == "memory":
+        return ContextStore(max_entries=max_entries, max_bytes=max_bytes, ttl_seconds=ttl_seconds)
+    if backend == "sqlite":
+        if db_path is None:
+            raise ValueError("CONTEXT_BACKEND=sqlite needs a database path.")
+        shared: Any = SqliteContextBackend(
+            db_path, ttl_seconds=ttl_seconds, max_entries=max_entries, max_bytes=max_bytes
+        )
+    elif backend == "kv":
+        if kv_client is None:
+            if not kv_url:
+                raise ValueError("CONTEXT_BACKEND=kv needs CONTEXT_KV_URL.")
+            kv_client = RedisKeyValueClient(kv_url)
+        if max_bytes:
+            logger.warning(
+                "CONTEXT_BACKEND=kv only rejects single contexts over %d bytes; bound the total"
+                " with the store's own memory limit (e.g. Redis maxmemory).",
+                max_bytes,
+            )
+        shared = KeyValueContextBackend(kv_client, ttl_seconds=ttl_seconds, max_bytes=max_bytes)
+    else:
+        raise ValueError(f"Unknown context backend '{backend}'. Choose from {', '.join(CONTEXT_BACKENDS)}.")
+    return CachedContextStore(shared, max_entries=local_cache_entries, ttl_seconds=local_cache_ttl)
+
+
+__all__ = [
+    "CONTEXT_BACKENDS",
+    "CachedContextStore",
+    "KeyValueClient",
+    "KeyValueContextBackend",
+    "LocalKeyValueClient",
+    "RedisKeyValueClient",
+    "SqliteContextBackend",
+    "create_context_store",
+]
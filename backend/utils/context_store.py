@@ -0,0 +1,258 @@
+"""
+Bounded in-process store for /predict contexts used by /ask follow-ups.
+
+Article text is zlib-compressed and shared between contexts by content
+hash; the small per-context metadata (prediction, verification, ...) is
+kept as-is. Entries expire after a TTL and the least recently used ones are
+evicted when the entry or byte budget is exceeded. A context that alone
+exceeds the byte budget is rejected with ``ContextTooLarge``.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional
+
+from .cache import content_hash
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+TEXT_FIELD = "article_text"
+
+
+class ContextTooLarge(ValueError):
+    """Raised when a single context does not fit in the store's byte budget."""
+
+
+@dataclass
+class _Entry:
+    metadata: Dict[str, Any]
+    text_hash: Optional[str]
+    expires_at: float
+    size: int
+
+
+@dataclass
+class _Text:
+    data: bytes
+    raw_size: int
+    refs: int = 0
+
+
+class ContextStore:
+    """
+    Dict-like LRU store of article contexts with TTL and byte budget.
+
+    ``store[context_id] = {"article_text": ..., ...}`` stores a context and
+    ``store.get(context_id)`` returns a fresh copy with the text inflated.
+    Use ``patch`` to change fields of a stored context.
+
+    Args:
+        max_entries: Most contexts kept (0 = unlimited)
+        max_bytes: Budget for compressed text plus metadata (0 = unlimited)
+        ttl_seconds: Lifetime of a context since it was last written (0 = no expiry)
+        compress_level: zlib level for article text
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 6 * 3600,
+        compress_level: int = 6,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.compress_level = compress_level
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._texts: Dict[str, _Text] = {}
+        self._lock = threading.RLock()
+        self._metadata_bytes = 0
+        self._text_bytes = 0
+        self._dedup_hits = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._rejected = 0
+
+    # -- internal bookkeeping -------------------------------------------------
+
+    def _expiry(self) -> float:
+        return time.time() + self.ttl_seconds if self.ttl_seconds > 0 else float("inf")
+
+    def _acquire_text(self, text_hash: str, compressed: Optional[_Text]) -> str:
+        stored = self._texts.get(text_hash)
+        if stored is None:
+            assert compressed is not None
+            stored = self._texts[text_hash] = compressed
+            self._text_bytes += len(stored.data)
+        else:
+            self._dedup_hits += 1
+        stored.refs += 1
+        return text_hash
+
+    def _release_text(self, text_hash: Optional[str]) -> None:
+        if text_hash is None:
+            return
+        stored = self._texts[text_hash]
+        stored.refs -= 1
+        if stored.refs == 0:
+            self._text_bytes -= len(stored.data)
+            del self._texts[text_hash]
+
+    def _drop(self, context_id: str) -> None:
+        entry = self._entries.pop(context_id)
+        self._metadata_bytes -= entry.size
+        self._release_text(entry.text_hash)
+
+    def _live(self, context_id: str) -> Optional[_Entry]:
+        entry = self._entries.get(context_id)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            self._drop(context_id)
+            self._expirations += 1
+            return None
+        return entry
+
+    def _enforce_budget(self) -> None:
+        while self._entries and (
+            (self.max_entries and len(self._entries) > self.max_entries)
+            or (self.max_bytes and self.live_bytes > self.max_bytes)
+        ):
+            context_id = next(iter(self._entries))
+            self._drop(context_id)
+            self._evictions += 1
+
+    # -- public API ------------------------------------------------------------
+
+    @property
+    def live_bytes(self) -> int:
+        return self._text_bytes + self._metadata_bytes
+
+    def set(self, context_id: str, context: Dict[str, Any]) -> None:
+        """
+        Store ``context`` under ``context_id``, replacing any previous one.
+
+        Raises:
+            ContextTooLarge: If the context alone exceeds ``max_bytes``; the
+                store (including a previous context with this id) is unchanged
+        """
+        metadata = {key: value for key, value in context.items() if key != TEXT_FIELD}
+        text = context.get(TEXT_FIELD)
+        size = len(json.dumps(metadata, default=str)) + len(context_id)
+        text_hash = content_hash(text) if text is not None else None
+        with self._lock:
+            compressed = None
+            if text_hash is not None and text_hash not in self._texts:
+                raw = text.encode("utf-8")
+                compressed = _Text(zlib.compress(raw, self.compress_level), len(raw))
+            needed = size + (len(compressed.data) if compressed else 0)
+            if self.max_bytes and needed > self.max_bytes:
+                self._rejected += 1
+                logger.warning(
+                    "Context %s rejected: %d bytes exceeds the %d byte budget", context_id, needed, self.max_bytes
+                )
+                raise ContextTooLarge(f"Context needs {needed} bytes; the store budget is {self.max_bytes}.")
+            if text_hash is not None:
+                self._acquire_text(text_hash, compressed)
+            if context_id in self._entries:
+                self._drop(context_id)
+            self._entries[context_id] = _Entry(metadata, text_hash, self._expiry(), size)
+            self._metadata_bytes += size
+            self._enforce_budget()
+
+    def get(self, context_id: str, default: Any = None) -> Any:
+        """Copy of the stored context (text inflated), or ``default``."""
+        with self._lock:
+            entry = self._live(context_id)
+            if entry is None:
+                return default
+            self._entries.move_to_end(context_id)
+            context = dict(entry.metadata)
+            if entry.text_hash is not None:
+                context[TEXT_FIELD] = zlib.decompress(self._texts[entry.text_hash].data).decode("utf-8")
+            return context
+
+    def patch(self, context_id: str, **fields: Any) -> bool:
+        """Update metadata fields of a stored context; returns False if it is gone."""
+        if TEXT_FIELD in fields:
+            raise ValueError("Replace the whole context to change its article text.")
+        with self._lock:
+            entry = self._live(context_id)
+            if entry is None:
+                return False
+            entry.metadata.update(fields)
+            size = len(json.dumps(entry.metadata, default=str)) + len(context_id)
+            self._metadata_bytes += size - entry.size
+            entry.size = size
+            self._entries.move_to_end(context_id)
+            self._enforce_budget()
+            return True
+
+    def delete(self, context_id: str) -> None:
+        with self._lock:
+            if context_id in self._entries:
+                self._drop(context_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._texts.clear()
+            self._metadata_bytes = 0
+            self._text_bytes = 0
+
+    def __setitem__(self, context_id: str, context: Dict[str, Any]) -> None:
+        self.set(context_id, context)
+
+    def __getitem__(self, context_id: str) -> Dict[str, Any]:
+        context = self.get(context_id)
+        if context is None:
+            raise KeyError(context_id)
+        return context
+
+    def __delitem__(self, context_id: str) -> None:
+        with self._lock:
+            if context_id not in self._entries:
+                raise KeyError(context_id)
+            self._drop(context_id)
+
+    def __contains__(self, context_id: object) -> bool:
+        with self._lock:
+            return isinstance(context_id, str) and self._live(context_id) is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._entries))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            raw_text_bytes = sum(text.raw_size for text in self._texts.values())
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "unique_texts": len(self._texts),
+                "live_bytes": self.live_bytes,
+                "max_bytes": self.max_bytes,
+                "text_bytes": self._text_bytes,
+                "raw_text_bytes": raw_text_bytes,
+                "compression_ratio": raw_text_bytes / self._text_bytes if self._text_bytes else 0.0,
+                "ttl_seconds": self.ttl_seconds,
+                "dedup_hits": self._dedup_hits,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "rejected": self._rejected,
+            }
+
+
+__all__ = ["ContextStore", "ContextTooLarge"]
@@ -0,0 +1,260 @@
+"""
+Layer-wise early exit for the DistilBERT classifier.
+
+Small classification heads sit after intermediate transformer layers. At
+inference each row of a batch leaves at the first head whose top softmax
+probability reaches the threshold; only the remaining rows run the deeper
+layers. Heads are trained on top of the frozen fine-tuned classifier, so
+rows that reach the last layer get exactly the original prediction.
+"""
+
+from __future__ import annotations
+
+import inspect
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Sequence
+
+import torch
+from torch import nn
+
+from .logger import get_logger
+from .model_loader import ModelLoadError, assign_state_dict, load_classifier, load_state_dict_file
+
+logger = get_logger(__name__)
+
+EXITS_SUFFIX = ".exits.safetensors"
+
+
+def default_heads_path(weights_path: Path) -> Path:
+    """``sanity_model.safetensors`` -> ``sanity_model.exits.safetensors``."""
+    weights_path = Path(weights_path)
+    return weights_path.with_name(weights_path.name.split(".")[0] + EXITS_SUFFIX)
+
+
+def _legacy_block_api() -> bool:
+    """transformers 4.x blocks take ``(x, attn_mask, head_mask, ...)`` and return tuples."""
+    from transformers.models.distilbert.modeling_distilbert import TransformerBlock
+
+    return "attn_mask" in inspect.signature(TransformerBlock.forward).parameters
+
+
+class ExitHead(nn.Module):
+    """Same shape as DistilBERT's own head: [CLS] -> dim -> ReLU -> num_labels."""
+
+    def __init__(self, dim: int, num_labels: int, dropout: float = 0.2) -> None:
+        super().__init__()
+        self.pre_classifier = nn.Linear(dim, dim)
+        self.dropout = nn.Dropout(dropout)
+        self.classifier = nn.Linear(dim, num_labels)
+
+    def forward(self, hidden_states: torch.Tensor) -> torch.Tensor:
+        pooled = torch.relu(self.pre_classifier(hidden_states[:, 0]))
+        return self.classifier(self.dropout(pooled))
+
+
+class EarlyExitClassifier(nn.Module):
+    """
+    Wraps a ``DistilBertForSequenceClassification`` with intermediate exit heads.
+
+    Args:
+        base: Fine-tuned classifier (its own head serves as the final exit)
+        exit_layers: 1-based layer numbers followed by an exit head
+        threshold: Top-class probability needed to exit early
+    """
+
+    def __init__(self, base: nn.Module, exit_layers: Sequence[int], threshold: float = 0.9) -> None:
+        super().__init__()
+        num_layers = base.config.n_layers
+        exit_layers = sorted(set(int(layer) for layer in exit_layers))
+        if not exit_layers or exit_layers[0] < 1 or exit_layers[-1] >= num_layers:
+            raise ValueError(f"Exit layers must lie in 1..{num_layers - 1}, got {exit_layers}.")
+        self.base = base
+        self.config = base.config
+        self.exit_layers = exit_layers
+        self.threshold = threshold
+        self.heads = nn.ModuleDict(
+            {
+                str(layer): ExitHead(base.config.dim, base.config.num_labels, base.config.seq_classif_dropout)
+                for layer in exit_layers
+            }
+        )
+        self._legacy_blocks = _legacy_block_api()
+        self._backbone_frozen = False
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def freeze_backbone(self) -> None:
+        """Train only the exit heads; the fine-tuned classifier stays bit-identical."""
+        for parameter in self.base.parameters():
+            parameter.requires_grad = False
+        self._backbone_frozen = True
+
+    def train(self, mode: bool = True) -> "EarlyExitClassifier":
+        super().train(mode)
+        if self._backbone_frozen:
+            # No dropout in the frozen layers: heads see the same features as at serving time.
+            self.base.eval()
+        return self
+
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            self._rows = 0
+            self._layers_executed = 0
+            self._exit_counts: Dict[int, int] = {}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            rows = self._rows
+            return {
+                "threshold": self.threshold,
+                "exit_layers": self.exit_layers,
+                "num_layers": self.config.n_layers,
+                "rows": rows,
+                "avg_layers_executed": self._layers_executed / rows if rows else 0.0,
+                "exit_histogram": dict(sorted(self._exit_counts.items())),
+            }
+
+    def _prepare_mask(self, embeddings: torch.Tensor, attention_mask: torch.Tensor) -> Optional[torch.Tensor]:
+        try:
+            from transformers.masking_utils import create_bidirectional_mask
+        except ImportError:  # transformers 4.x
+            if getattr(self.config, "_attn_implementation", "eager") == "sdpa":
+                from transformers.modeling_attn_mask_utils import _prepare_4d_attention_mask_for_sdpa
+
+                return _prepare_4d_attention_mask_for_sdpa(attention_mask, embeddings.dtype, embeddings.shape[1])
+            return attention_mask
+        return create_bidirectional_mask(config=self.config, inputs_embeds=embeddings, attention_mask=attention_mask)
+
+    def _run_layer(self, index: int, hidden: torch.Tensor, mask: Optional[torch.Tensor]) -> torch.Tensor:
+        layer = self.base.distilbert.transformer.layer[index]
+        if self._legacy_blocks:
+            return layer(x=hidden, attn_mask=mask, head_mask=None, output_attentions=False)[-1]
+        return layer(hidden, mask)
+
+    def _final_logits(self, hidden: torch.Tensor) -> torch.Tensor:
+        pooled = torch.relu(self.base.pre_classifier(hidden[:, 0]))
+        return self.base.classifier(self.base.dropout(pooled))
+
+    def forward(
+        self,
+        input_ids: torch.Tensor,
+        attention_mask: Optional[torch.Tensor] = None,
+        labels: Optional[torch.Tensor] = None,
+        **_: Any,
+    ) -> Any:
+        if attention_mask is None:
+            attention_mask = torch.ones_like(input_ids)
+        hidden = self.base.distilbert.embeddings(input_ids)
+        mask = self._prepare_mask(hidden, attention_mask)
+        if self.training or labels is not None:
+            return self._forward_all_exits(hidden, mask, labels)
+        return self._forward_early_exit(hidden, mask)
+
+    def _forward_all_exits(
+        self, hidden: torch.Tensor, mask: Optional[torch.Tensor], labels: Optional[torch.Tensor]
+    ) -> Any:
+        """Training/eval path: every row runs every layer; loss averages the exit heads."""
+        from transformers.modeling_outputs import SequenceClassifierOutput
+
+        exit_logits: List[torch.Tensor] = []
+        for index in range(self.config.n_layers):
+            hidden = self._run_layer(index, hidden, mask)
+            head = self.heads[str(index + 1)] if str(index + 1) in self.heads else None
+            if head is not None:
+                exit_logits.append(head(hidden))
+        logits = self._final_logits(hidden)
+        loss = None
+        if labels is not None and exit_logits:
+            loss_fn = nn.CrossEntropyLoss()
+            loss = torch.stack([loss_fn(head_logits, labels) for head_logits in exit_logits]).mean()
+        # (batch, exits + final, num_labels) so metrics can be computed per exit.
+        return SequenceClassifierOutput(loss=loss, logits=torch.stack([*exit_logits, logits], dim=1))
+
+    def _forward_early_exit(self, hidden: torch.Tensor, mask: Optional[torch.Tensor]) -> SimpleNamespace:
+        batch_size = hidden.shape[0]
+        logits = torch.empty((batch_size, self.config.num_labels), dtype=hidden.dtype, device=hidden.device)
+        exited_at = torch.full((batch_size,), self.config.n_layers, dtype=torch.long, device=hidden.device)
+        active = torch.arange(batch_size, device=hidden.device)
+
+        for index in range(self.config.n_layers):
+            hidden = self._run_layer(index, hidden, mask)
+            layer = index + 1
+            if layer == self.config.n_layers:
+                logits[active] = self._final_logits(hidden)
+                break
+            head = self.heads[str(layer)] if str(layer) in self.heads else None
+            if head is None:
+                continue
+            head_logits = head(hidden)
+            confident = torch.softmax(head_logits, dim=-1).max(dim=-1).values >= self.threshold
+            if confident.any():
+                logits[active[confident]] = head_logits[confident]
+                exited_at[active[confident]] = layer
+                keep = ~confident
+                active, hidden = active[keep], hidden[keep]
+                mask = mask[keep] if mask is not None else None
+                if active.numel() == 0:
+                    break
+
+        with self._stats_lock:
+            self._rows += batch_size
+            self._layers_executed += int(exited_at.sum())
+            for layer in exited_at.tolist():
+                self._exit_counts[layer] = self._exit_counts.get(layer, 0) + 1
+        return SimpleNamespace(logits=logits, exit_layers=exited_at)
+
+
+def save_exit_heads(model: EarlyExitClassifier, path: Path) -> None:
+    from safetensors.torch import save_file
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    state_dict = {key: tensor.detach().cpu().contiguous() for key, tensor in model.heads.state_dict().items()}
+    metadata = {"format": "pt", "exit_layers": ",".join(str(layer) for layer in model.exit_layers)}
+    tmp_path = path.with_name(path.name + ".tmp")
+    save_file(state_dict, str(tmp_path), metadata=metadata)
+    tmp_path.replace(path)
+    logger.info("Saved exit heads for layers %s to %s", model.exit_layers, path)
+
+
+def load_early_exit_model(
+    model_dir: Path,
+    weights_path: Optional[Path],
+    heads_path: Path,
+    threshold: float = 0.9,
+    device: Any = "cpu",
+) -> tuple[Any, EarlyExitClassifier]:
+    """
+    Load the fine-tuned classifier plus its trained exit heads.
+
+    Returns:
+        Tuple of (tokenizer, EarlyExitClassifier in eval mode)
+
+    Raises:
+        ModelLoadError: If the heads file is missing or doesn't match
+    """
+    from safetensors import safe_open
+
+    heads_path = Path(heads_path)
+    if not heads_path.exists():
+        raise ModelLoadError(f"Exit heads not found at {heads_path}; run train_model.py --early-exit.")
+    with safe_open(str(heads_path), framework="pt") as handle:
+        exit_layers = [int(layer) for layer in (handle.metadata() or {}).get("exit_layers", "").split(",") if layer]
+    tokenizer, base = load_classifier(model_dir, weights_path)
+    model = EarlyExitClassifier(base, exit_layers, threshold=threshold)
+    assign_state_dict(model.heads, load_state_dict_file(heads_path), heads_path)
+    model.to(device)
+    model.eval()
+    logger.info("Loaded early-exit heads after layers %s (threshold=%.2f)", exit_layers, threshold)
+    return tokenizer, model
+
+
+__all__ = [
+    "EarlyExitClassifier",
+    "ExitHead",
+    "default_heads_path",
+    "load_early_exit_model",
+    "save_exit_heads",
+]
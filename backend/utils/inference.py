@@ -0,0 +1,227 @@
+"""
+Shared tokenization and forward-pass helpers for the DistilBERT classifier.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+import torch
+
+MAX_SEQUENCE_LENGTH = 512
+WINDOW_REDUCERS = ("mean", "max", "weighted")
+
+
+@dataclass
+class DocumentWindow:
+    """One overlapping slice of a long article."""
+
+    index: int
+    start_token: int
+    num_tokens: int
+    input_ids: List[int]
+
+
+def encode_texts(tokenizer: Any, texts: Sequence[str], max_length: int = MAX_SEQUENCE_LENGTH) -> List[List[int]]:
+    """Tokenize texts without padding, returning one id list per text."""
+    encodings = tokenizer(list(texts), truncation=True, max_length=max_length)
+    return encodings["input_ids"]
+
+
+def length_sorted_order(sequences: Sequence[Sequence[int]]) -> List[int]:
+    """Indices of ``sequences`` sorted by length so similar lengths share a batch."""
+    return sorted(range(len(sequences)), key=lambda idx: len(sequences[idx]))
+
+
+def pad_batch(sequences: Sequence[Sequence[int]], pad_token_id: int) -> Dict[str, torch.Tensor]:
+    """Right-pad token ids to the longest sequence in the batch (not to 512)."""
+    width = max(len(seq) for seq in sequences)
+    input_ids = torch.full((len(sequences), width), pad_token_id, dtype=torch.long)
+    attention_mask = torch.zeros((len(sequences), width), dtype=torch.long)
+    for row, seq in enumerate(sequences):
+        input_ids[row, : len(seq)] = torch.tensor(seq, dtype=torch.long)
+        attention_mask[row, : len(seq)] = 1
+    return {"input_ids": input_ids, "attention_mask": attention_mask}
+
+
+def forward_probabilities(model: Any, inputs: Dict[str, torch.Tensor], device: Any) -> np.ndarray:
+    """Run one forward pass and return softmax probabilities as a numpy array."""
+    inputs = {k: v.to(device) for k, v in inputs.items()}
+    with torch.no_grad():
+        logits = model(**inputs).logits
+    return torch.softmax(logits, dim=-1).cpu().numpy()
+
+
+def predict_probabilities(
+    texts: Sequence[str],
+    tokenizer: Any,
+    model: Any,
+    device: Any,
+    batch_size: int = 32,
+    max_length: int = MAX_SEQUENCE_LENGTH,
+) -> np.ndarray:
+    """
+    Classify texts with length-bucketed, dynamically padded batches.
+
+    Texts are sorted by token length, split into batches of ``batch_size`` and
+    each batch is padded only to its longest member. Probabilities are returned
+    in the original input order.
+    """
+    if not texts:
+        return np.empty((0, 2), dtype=np.float32)
+
+    sequences = encode_texts(tokenizer, texts, max_length=max_length)
+    order = length_sorted_order(sequences)
+    results: List[np.ndarray | None] = [None] * len(texts)
+    for start in range(0, len(order), batch_size):
+        indices = order[start : start + batch_size]
+        inputs = pad_batch([sequences[idx] for idx in indices], tokenizer.pad_token_id)
+        probs = forward_probabilities(model, inputs, device)
+        for idx, row in zip(indices, probs):
+            results[idx] = row
+    return np.stack(results)
+
+
+def split_into_windows(
+    tokenizer: Any,
+    text: str,
+    max_length: int = MAX_SEQUENCE_LENGTH,
+    stride: int = 128,
+    max_windows: int = 8,
+) -> Tuple[List[DocumentWindow], bool]:
+    """
+    Split an article into overlapping token windows.
+
+    Args:
+        tokenizer: Fast tokenizer used by the classifier
+        text: Article text
+        max_length: Window size including special tokens
+        stride: Number of tokens shared by consecutive windows
+        max_windows: Upper bound on windows per article (keeps latency bounded)
+
+    Returns:
+        Tuple of (windows, truncated) where ``truncated`` is True when the
+        article needed more than ``max_windows`` windows.
+    """
+    token_ids = tokenizer(text, add_special_tokens=False, truncation=False)["input_ids"]
+    # Each window is wrapped as [CLS] ... [SEP], like a regular encoding.
+    body_length = max_length - 2
+    if body_length <= 0:
+        raise ValueError("max_length is too small to hold any tokens.")
+    if not 0 <= stride < body_length:
+        raise ValueError("stride must be non-negative and smaller than the window body.")
+    if max_windows < 1:
+        raise ValueError("max_windows must be at least 1.")
+
+    step = body_length - stride
+    windows: List[DocumentWindow] = []
+    start = 0
+    while True:
+        chunk = token_ids[start : start + body_length]
+        windows.append(
+            DocumentWindow(
+                index=len(windows),
+                start_token=start,
+                num_tokens=len(chunk),
+                input_ids=[tokenizer.cls_token_id, *chunk, tokenizer.sep_token_id],
+            )
+        )
+        if start + body_length >= len(token_ids):
+            return windows, False
+        if len(windows) == max_windows:
+            return windows, True
+        start += step
+
+
+def reduce_window_probabilities(probs: np.ndarray, lengths: Sequence[int], reducer: str = "mean") -> np.ndarray:
+    """
+    Combine per-window probabilities into one article-level distribution.
+
+    ``mean`` averages windows, ``max`` keeps the single most confident window
+    and ``weighted`` averages windows weighted by their token count.
+    """
+    if reducer == "mean":
+        return probs.mean(axis=0)
+    if reducer == "max":
+        return probs[int(np.argmax(probs.max(axis=1)))]
+    if reducer == "weighted":
+        weights = np.asarray(lengths, dtype=np.float64)
+        weights = weights / weights.sum()
+        return (probs * weights[:, None]).sum(axis=0)
+    raise ValueError(f"Unsupported window reducer '{reducer}'. Choose from {', '.join(WINDOW_REDUCERS)}.")
+
+
+def predict_long_document(
+    text: str,
+    tokenizer: Any,
+    model: Any,
+    device: Any,
+    reducer: str = "mean",
+    stride: int = 128,
+    max_windows: int = 8,
+    max_length: int = MAX_SEQUENCE_LENGTH,
+) -> Tuple[np.ndarray, List[DocumentWindow], np.ndarray, bool]:
+    """
+    Classify an article of any length with sliding windows.
+
+    All windows run as a single batched forward pass.
+
+    Returns:
+        Tuple of (combined probabilities, windows, per-window probabilities, truncated)
+    """
+    if reducer not in WINDOW_REDUCERS:
+        raise ValueError(f"Unsupported window reducer '{reducer}'. Choose from {', '.join(WINDOW_REDUCERS)}.")
+    windows, truncated = split_into_windows(
+        tokenizer, text, max_length=max_length, stride=stride, max_windows=max_windows
+    )
+    inputs = pad_batch([window.input_ids for window in windows], tokenizer.pad_token_id)
+    window_probs = forward_probabilities(model, inputs, device)
+    combined = reduce_window_probabilities(
+        window_probs, [window.num_tokens for window in windows], reducer
+    )
+    return combined, windows, window_probs, truncated
+
+
+def warm_up_model(
+    model: Any,
+    tokenizer: Any,
+    device: Any,
+    lengths: Sequence[int] = (16, 128, MAX_SEQUENCE_LENGTH),
+    batch_size: int = 1,
+) -> Dict[int, float]:
+    """
+    Run throwaway forward passes so the first real request doesn't pay for
+    kernel selection, allocator growth and lazy initialisation.
+
+    Returns:
+        Mapping of sequence length to forward-pass duration in milliseconds
+    """
+    filler = tokenizer.convert_tokens_to_ids("the")
+    timings: Dict[int, float] = {}
+    for length in lengths:
+        length = max(2, min(int(length), MAX_SEQUENCE_LENGTH))
+        sequence = [tokenizer.cls_token_id, *([filler] * (length - 2)), tokenizer.sep_token_id]
+        inputs = pad_batch([sequence] * batch_size, tokenizer.pad_token_id)
+        started = time.perf_counter()
+        forward_probabilities(model, inputs, device)
+        timings[length] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+__all__ = [
+    "MAX_SEQUENCE_LENGTH",
+    "warm_up_model",
+    "WINDOW_REDUCERS",
+    "DocumentWindow",
+    "split_into_windows",
+    "reduce_window_probabilities",
+    "predict_long_document",
+    "encode_texts",
+    "length_sorted_order",
+    "pad_batch",
+    "forward_probabilities",
+    "predict_probabilities",
+]
@@ -4,25 +4,53 @@ Groq API helper utilities.
 
 from __future__ import annotations
 
+import email.utils
+import json
 import os
+import random
+import threading
+import time
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from .cache import TieredCache, content_hash
+from .llm_ledger import LLMCall, current_ledger
 from .logger import get_logger
 from .prompts import format_prompt
+from .rate_limit import RateLimiter, RateLimitTimeout
 
 logger = get_logger(__name__)
 
-GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+GROQ_API_URL = os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions")
 DEFAULT_MODEL = "llama-3.3-70b-versatile"  # Updated: verified working model from check_groq_models.py
+GROQ_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", "30"))
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "3"))
+GROQ_BACKOFF_BASE = float(os.getenv("GROQ_BACKOFF_BASE", "0.5"))
+GROQ_BACKOFF_MAX = float(os.getenv("GROQ_BACKOFF_MAX", "20"))
+GROQ_RPM_LIMIT = float(os.getenv("GROQ_RPM_LIMIT", "30"))
+GROQ_TPM_LIMIT = float(os.getenv("GROQ_TPM_LIMIT", "12000"))
+GROQ_RATE_LIMIT_WAIT = float(os.getenv("GROQ_RATE_LIMIT_WAIT", "60"))
+GROQ_POOL_SIZE = int(os.getenv("GROQ_POOL_SIZE", "16"))
+# Tokens budgeted for the completion before the response reports real usage.
+GROQ_COMPLETION_TOKEN_ESTIMATE = int(os.getenv("GROQ_COMPLETION_TOKEN_ESTIMATE", "512"))
+RETRY_STATUSES = frozenset({408, 409, 425, 429, 500, 502, 503, 504})
+
+_shared_lock = threading.Lock()
+_shared_session: Optional[requests.Session] = None
+_shared_limiter: Optional[RateLimiter] = None
 
 
 class GroqAPIError(RuntimeError):
     """Raised when the Groq API returns an error."""
 
 
+class GroqRateLimited(GroqAPIError):
+    """Raised when the client-side rate limiter refuses a call; nothing was sent to Groq."""
+
+
 @dataclass
 class GroqResponse:
     prediction: str
@@ -30,53 +58,380 @@ class GroqResponse:
     raw: Dict[str, Any]
 
 
+def create_session(pool_size: int = GROQ_POOL_SIZE) -> requests.Session:
+    """Keep-alive session whose connection pool is sized for concurrent LLM calls."""
+    session = requests.Session()
+    # Retries are handled by GroqClient so they can honour Retry-After and the rate limiter.
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _default_session() -> requests.Session:
+    global _shared_session
+    with _shared_lock:
+        if _shared_session is None:
+            _shared_session = create_session()
+        return _shared_session
+
+
+def _default_limiter() -> RateLimiter:
+    """One limiter per process: the provider's limits apply to the API key, not the client."""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter(GROQ_RPM_LIMIT, GROQ_TPM_LIMIT)
+        return _shared_limiter
+
+
+def response_cache_key(model: str, messages: List[Dict[str, str]], temperature: float = 0.0) -> str:
+    """Cache key for a chat completion: model, sampling temperature and the exact formatted messages."""
+    return content_hash(model, repr(temperature), json.dumps(messages, sort_keys=True, ensure_ascii=False))
+
+
+def estimate_tokens(messages: List[Dict[str, str]]) -> int:
+    """Rough prompt size (~4 characters per token) plus a completion allowance."""
+    chars = sum(len(message.get("content", "")) for message in messages)
+    return chars // 4 + 4 * len(messages) + GROQ_COMPLETION_TOKEN_ESTIMATE
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a ``Retry-After`` header given either in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, parsed.timestamp() - time.time())
+
+
 class GroqClient:
-    """Lightweight client for the Groq chat completions endpoint."""
+    """
+    Client for the Groq chat completions endpoint.
+
+    Calls share a pooled keep-alive session and a process-wide rate limiter,
+    and transient failures (429, 5xx, connection errors) are retried with
+    jittered exponential backoff.
 
-    def __init__(self, api_key: Optional[str] = None, model: str = DEFAULT_MODEL) -> None:
+    Args:
+        api_key: Defaults to ``GROQ_API_KEY``
+        model: Chat model name
+        api_url: Chat completions URL (``GROQ_API_URL``; point it at a stub in tests)
+        session: HTTP session (defaults to a shared pooled session)
+        rate_limiter: Defaults to a shared limiter from ``GROQ_RPM_LIMIT``/``GROQ_TPM_LIMIT``
+        timeout: Per-attempt HTTP timeout in seconds
+        rate_limit_wait: Longest wait for rate-limiter capacity before a call fails, in seconds
+        max_retries: Retries after the first attempt
+        backoff_base: First backoff delay in seconds (doubles per retry)
+        backoff_max: Cap on a single backoff delay
+        response_cache: Optional cache for deterministic (``temperature=0``) completions
+        cache_ttls: Per-prompt-type TTL in seconds (``verify``, ``followup``, ``direct``);
+            types not listed use the cache's default TTL
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = DEFAULT_MODEL,
+        api_url: Optional[str] = None,
+        session: Optional[requests.Session] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        timeout: float = GROQ_TIMEOUT,
+        rate_limit_wait: float = GROQ_RATE_LIMIT_WAIT,
+        max_retries: int = GROQ_MAX_RETRIES,
+        backoff_base: float = GROQ_BACKOFF_BASE,
+        backoff_max: float = GROQ_BACKOFF_MAX,
+        response_cache: Optional[TieredCache] = None,
+        cache_ttls: Optional[Dict[str, float]] = None,
+    ) -> None:
         self.api_key = api_key or os.getenv("GROQ_API_KEY")
         if not self.api_key:
             raise ValueError("GROQ_API_KEY is missing. Please set it in the environment.")
         self.model = model
+        self.api_url = api_url or GROQ_API_URL
+        self.session = session or _default_session()
+        self.rate_limiter = rate_limiter or _default_limiter()
+        self.timeout = timeout
+        self.rate_limit_wait = rate_limit_wait
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.response_cache = response_cache
+        self.cache_ttls = dict(cache_ttls or {})
+        self._usage_lock = threading.Lock()
+        self._usage = {
+            "requests": 0,
+            "retries": 0,
+            "failures": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_tokens": 0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "saved_latency_ms": 0.0,
+            "saved_tokens": 0,
+            "streams": 0,
+            "first_token_ms_total": 0.0,
+        }
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+    def _count(self, **deltas: float) -> None:
+        with self._usage_lock:
+            for key, value in deltas.items():
+                self._usage[key] += value
+
+    def _cache_lookup(
+        self, messages: List[Dict[str, str]], temperature: float, bypass_cache: bool
+    ) -> tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Return (cache key or None when uncacheable, cached response or None)."""
+        if self.response_cache is None or temperature != 0.0:
+            return None, None
+        cache_key = response_cache_key(self.model, messages, temperature)
+        cached = None if bypass_cache else self.response_cache.get(cache_key)
+        if cached is not None:
+            usage = cached["response"].get("usage") or {}
+            self._count(
+                cache_hits=1,
+                saved_latency_ms=cached["latency_ms"],
+                saved_tokens=int(usage.get("total_tokens") or 0),
+            )
+            return cache_key, cached["response"]
+        if not bypass_cache:
+            self._count(cache_misses=1)
+        return cache_key, None
+
+    def _cache_store(self, cache_key: Optional[str], result: Dict[str, Any], latency_ms: float, prompt_type: str) -> None:
+        if cache_key is not None:
+            self.response_cache.set(
+                cache_key, {"response": result, "latency_ms": latency_ms}, ttl=self.cache_ttls.get(prompt_type)
+            )
+
+    def _request(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.0,
+        prompt_type: str = "default",
+        bypass_cache: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        POST one chat completion, serving deterministic prompts from the response cache.
+
+        ``bypass_cache`` skips the cache lookup but still stores the fresh response.
+        """
+        cache_key, cached = self._cache_lookup(messages, temperature, bypass_cache)
+        if cached is not None:
+            return cached
+        started = time.perf_counter()
+        estimated = estimate_tokens(messages)
+        payload = {"model": self.model, "messages": messages, "temperature": temperature}
+        response, attempts = self._send(payload, estimated)
+        result = response.json()
+        call = self._finish_call(result.get("usage"), estimated, attempts, started)
+        self._cache_store(cache_key, result, call.latency_ms, prompt_type)
+        return result
+
+    def _stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.0,
+        prompt_type: str = "default",
+        bypass_cache: bool = False,
+    ) -> Iterator[str]:
+        """
+        Stream a chat completion, yielding content deltas as they arrive.
 
-    def _request(self, messages: List[Dict[str, str]], temperature: float = 0.0) -> Dict[str, Any]:
+        Retries only happen before the first byte; a cached response is
+        yielded as a single chunk. The assembled answer is cached once the
+        stream completes.
+        """
+        cache_key, cached = self._cache_lookup(messages, temperature, bypass_cache)
+        if cached is not None:
+            yield cached["choices"][0]["message"]["content"]
+            return
+        started = time.perf_counter()
+        estimated = estimate_tokens(messages)
+        payload = {"model": self.model, "messages": messages, "temperature": temperature, "stream": True}
+        response, attempts = self._send(payload, estimated, stream=True)
+        parts: List[str] = []
+        usage: Optional[Dict[str, Any]] = None
+        first_token_ms: Optional[float] = None
+        try:
+            # SSE is UTF-8 by definition; requests would fall back to ISO-8859-1
+            # for a text/event-stream response without a charset.
+            for raw_line in response.iter_lines():
+                line = raw_line.decode("utf-8")
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:") :].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                # OpenAI-style ``usage`` or Groq's ``x_groq.usage`` on the final chunk.
+                usage = chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage") or usage
+                for choice in chunk.get("choices") or []:
+                    delta = (choice.get("delta") or {}).get("content")
+                    if not delta:
+                        continue
+                    if first_token_ms is None:
+                        first_token_ms = (time.perf_counter() - started) * 1000
+                        logger.info("LLM first token after %.1f ms", first_token_ms)
+                    parts.append(delta)
+                    yield delta
+        except (requests.RequestException, ValueError) as exc:
+            self._count(failures=1)
+            raise GroqAPIError(f"Groq stream interrupted: {exc}") from exc
+        finally:
+            response.close()
+        result = {"choices": [{"message": {"role": "assistant", "content": "".join(parts)}}], "usage": usage or {}}
+        call = self._finish_call(usage, estimated, attempts, started, first_token_ms=first_token_ms)
+        self._cache_store(cache_key, result, call.latency_ms, prompt_type)
+
+    def _send(self, payload: Dict[str, Any], estimated: int, stream: bool = False) -> tuple[requests.Response, int]:
+        """
+        POST with rate limiting and retries; returns the successful response and attempt count.
+
+        Rate-limiter capacity is taken once per logical call: retries are paced
+        by the backoff and ``Retry-After`` rather than charged to the budget again.
+        """
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
-        payload = {"model": self.model, "messages": messages, "temperature": temperature}
-        response = requests.post(GROQ_API_URL, json=payload, headers=headers, timeout=30)
-        if not response.ok:
-            logger.error("Groq API error %s: %s", response.status_code, response.text)
-            raise GroqAPIError(f"Groq API error: {response.text}")
-        return response.json()
+        try:
+            self.rate_limiter.acquire(estimated, timeout=self.rate_limit_wait)
+        except RateLimitTimeout as exc:
+            logger.warning("Groq call not sent: %s", exc)
+            self._count(failures=1)
+            raise GroqRateLimited(f"Client-side rate limit: {exc}") from exc
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            self._count(requests=1)
+            try:
+                response = self.session.post(
+                    self.api_url, json=payload, headers=headers, timeout=self.timeout, stream=stream
+                )
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                error = f"Groq API unreachable: {exc}"
+            else:
+                if response.ok:
+                    return response, attempt + 1
+                error = f"Groq API error: {response.text}"
+                # A streamed error body keeps its pooled connection until closed.
+                response.close()
+                if response.status_code not in RETRY_STATUSES:
+                    logger.error("Groq API error %s: %s", response.status_code, response.text)
+                    self._count(failures=1)
+                    raise GroqAPIError(error)
+                retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+            if attempt == self.max_retries:
+                break
+            delay = self._backoff(attempt, retry_after)
+            logger.warning("%s; retrying in %.2fs (attempt %d/%d)", error, delay, attempt + 1, self.max_retries)
+            self._count(retries=1)
+            time.sleep(delay)
+        logger.error("%s; giving up after %d attempts", error, self.max_retries + 1)
+        self._count(failures=1)
+        raise GroqAPIError(error)
+
+    def _finish_call(
+        self,
+        usage: Optional[Dict[str, Any]],
+        estimated: int,
+        attempts: int,
+        started: float,
+        first_token_ms: Optional[float] = None,
+    ) -> LLMCall:
+        """Account a completed provider call: limiter correction, usage counters and the request ledger."""
+        usage = usage or {}
+        call = LLMCall(
+            model=self.model,
+            latency_ms=(time.perf_counter() - started) * 1000,
+            attempts=attempts,
+            prompt_tokens=int(usage.get("prompt_tokens") or 0),
+            completion_tokens=int(usage.get("completion_tokens") or 0),
+            total_tokens=int(usage.get("total_tokens") or 0),
+            first_token_ms=first_token_ms,
+        )
+        self.rate_limiter.record_usage(estimated, call.total_tokens)
+        self._count(
+            prompt_tokens=call.prompt_tokens,
+            completion_tokens=call.completion_tokens,
+            total_tokens=call.total_tokens,
+        )
+        if first_token_ms is not None:
+            self._count(streams=1, first_token_ms_total=first_token_ms)
+        ledger = current_ledger()
+        if ledger is not None:
+            ledger.record(call)
+        return call
+
+    def usage(self) -> Dict[str, Any]:
+        """Request/retry counters, token usage reported by the API, cache savings and limiter state."""
+        with self._usage_lock:
+            usage = dict(self._usage)
+        lookups = usage["cache_hits"] + usage["cache_misses"]
+        usage["cache_hit_rate"] = usage["cache_hits"] / lookups if lookups else 0.0
+        usage["saved_latency_ms"] = round(usage["saved_latency_ms"], 3)
+        first_token_total = usage.pop("first_token_ms_total")
+        usage["avg_first_token_ms"] = first_token_total / usage["streams"] if usage["streams"] else None
+        usage["response_cache"] = self.response_cache.stats() if self.response_cache is not None else None
+        usage["rate_limiter"] = self.rate_limiter.stats()
+        return usage
 
-    def call_llm(self, prompt_template: List[Dict[str, str]], **kwargs) -> str:
+    def call_llm(
+        self,
+        prompt_template: List[Dict[str, str]],
+        prompt_type: str = "default",
+        bypass_cache: bool = False,
+        **kwargs,
+    ) -> str:
         """
         Call LLM with a formatted prompt template.
         
         Args:
             prompt_template: List of message dicts with {{placeholder}} syntax
+            prompt_type: Selects the response-cache TTL
+            bypass_cache: Ignore any cached response (the fresh one is still cached)
             **kwargs: Values to substitute into placeholders
             
         Returns:
             LLM response text
         """
         messages = format_prompt(prompt_template, **kwargs)
-        result = self._request(messages, temperature=0.0)
+        result = self._request(messages, temperature=0.0, prompt_type=prompt_type, bypass_cache=bypass_cache)
         return result["choices"][0]["message"]["content"]
 
-    def verify_article(self, article_text: str) -> GroqResponse:
+    def call_llm_stream(
+        self,
+        prompt_template: List[Dict[str, str]],
+        prompt_type: str = "default",
+        bypass_cache: bool = False,
+        **kwargs,
+    ) -> Iterator[str]:
+        """Streaming variant of ``call_llm``: yields the response text in chunks."""
+        messages = format_prompt(prompt_template, **kwargs)
+        return self._stream(messages, temperature=0.0, prompt_type=prompt_type, bypass_cache=bypass_cache)
+
+    def verify_article(self, article_text: str, bypass_cache: bool = False) -> GroqResponse:
         """Run the verification prompt (low confidence auto-verification)."""
         from .prompts import PROMPT_LOW_CONFIDENCE_VERIFY
-        
-        content = self.call_llm(PROMPT_LOW_CONFIDENCE_VERIFY, article_text=article_text)
-        prediction, reasoning = self._parse_verification_response(content)
-        
-        # Get raw response for compatibility
+
+        # One provider call: the parsed verdict and ``raw`` come from the same response.
         messages = format_prompt(PROMPT_LOW_CONFIDENCE_VERIFY, article_text=article_text)
-        raw_result = self._request(messages)
-        
+        raw_result = self._request(messages, temperature=0.0, prompt_type="verify", bypass_cache=bypass_cache)
+        prediction, reasoning = self._parse_verification_response(raw_result["choices"][0]["message"]["content"])
         return GroqResponse(prediction=prediction, reasoning=reasoning, raw=raw_result)
 
     def answer_question(
@@ -85,7 +440,9 @@ class GroqClient:
         article_text: Optional[str] = None,
         model_prediction: Optional[str] = None,
         verification_summary: Optional[str] = None,
-    ) -> str:
+        bypass_cache: bool = False,
+        stream: bool = False,
+    ) -> str | Iterator[str]:
         """
         Answer a question - either direct question or follow-up about an article.
         
@@ -94,17 +451,22 @@ class GroqClient:
             article_text: Article content (if follow-up question)
             model_prediction: Model's prediction (if follow-up question)
             verification_summary: Verification output (if follow-up question)
+            bypass_cache: Ask the LLM even if an identical prompt was answered before
+            stream: Return an iterator of text chunks instead of the full answer
             
         Returns:
-            LLM response
+            LLM response (or an iterator over it when ``stream`` is set)
         """
         from .prompts import PROMPT_DIRECT_QUESTION, PROMPT_FOLLOWUP_NEWS
         
+        call = self.call_llm_stream if stream else self.call_llm
         # Determine if this is a follow-up question or direct question
         if article_text:
             # Follow-up question about a news article
-            return self.call_llm(
+            return call(
                 PROMPT_FOLLOWUP_NEWS,
+                prompt_type="followup",
+                bypass_cache=bypass_cache,
                 article_text=article_text,
                 model_prediction=model_prediction or "Unknown",
                 verification_summary=verification_summary or "Not available",
@@ -112,7 +474,7 @@ class GroqClient:
             )
         else:
             # Direct question (general query)
-            return self.call_llm(PROMPT_DIRECT_QUESTION, user_question=question)
+            return call(PROMPT_DIRECT_QUESTION, prompt_type="direct", bypass_cache=bypass_cache, user_question=question)
 
     @staticmethod
     def _parse_verification_response(content: str) -> tuple[str, str]:
@@ -170,7 +532,7 @@ class GroqClient:
         return prediction, reasoning
 
 
-__all__ = ["GroqClient", "GroqResponse", "GroqAPIError", "call_llm"]
+__all__ = ["GroqClient", "GroqResponse", "GroqAPIError", "GroqRateLimited", "call_llm", "create_session"]
 
 
 def call_llm(prompt_template: List[Dict[str, str]], **kwargs) -> str:
@@ -0,0 +1,88 @@
+"""
+Per-request ledger of LLM provider calls.
+
+The Flask app opens a ledger for every request; ``GroqClient`` records each
+completed provider call (latency, attempts, tokens) into whichever ledger is
+active in the current context. Tests use it to catch redundant round-trips.
+"""
+
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+
+@dataclass
+class LLMCall:
+    model: str
+    latency_ms: float
+    attempts: int = 1
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    first_token_ms: Optional[float] = None
+
+
+class LLMCallLedger:
+    """Thread-safe list of the LLM calls made on behalf of one request."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: List[LLMCall] = []
+
+    def record(self, call: LLMCall) -> None:
+        with self._lock:
+            self._calls.append(call)
+
+    @property
+    def calls(self) -> List[LLMCall]:
+        with self._lock:
+            return list(self._calls)
+
+    @property
+    def count(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def summary(self) -> Dict[str, Any]:
+        calls = self.calls
+        return {
+            "count": len(calls),
+            "latency_ms": round(sum(call.latency_ms for call in calls), 3),
+            "attempts": sum(call.attempts for call in calls),
+            "total_tokens": sum(call.total_tokens for call in calls),
+            "calls": [asdict(call) for call in calls],
+        }
+
+
+_current_ledger: ContextVar[Optional[LLMCallLedger]] = ContextVar("llm_call_ledger", default=None)
+
+
+def current_ledger() -> Optional[LLMCallLedger]:
+    return _current_ledger.get()
+
+
+def start_ledger() -> tuple[LLMCallLedger, Token]:
+    """Activate a fresh ledger; pass the token to ``end_ledger`` when the request finishes."""
+    ledger = LLMCallLedger()
+    return ledger, _current_ledger.set(ledger)
+
+
+def end_ledger(token: Token) -> None:
+    _current_ledger.reset(token)
+
+
+@contextmanager
+def track_llm_calls() -> Iterator[LLMCallLedger]:
+    """Record LLM calls made inside the ``with`` block (same thread/context only)."""
+    ledger, token = start_ledger()
+    try:
+        yield ledger
+    finally:
+        end_ledger(token)
+
+
+__all__ = ["LLMCall", "LLMCallLedger", "current_ledger", "end_ledger", "start_ledger", "track_llm_calls"]
@@ -0,0 +1,85 @@
+"""
+Per-process memory accounting (resident vs shared bytes) from /proc.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PROC_ROOT = Path("/proc")
+
+_SMAPS_FIELDS = {
+    "Rss": "rss_bytes",
+    "Pss": "pss_bytes",
+    "Shared_Clean": "shared_clean_bytes",
+    "Shared_Dirty": "shared_dirty_bytes",
+    "Private_Clean": "private_clean_bytes",
+    "Private_Dirty": "private_dirty_bytes",
+    "Swap": "swap_bytes",
+}
+
+
+def _read_smaps_rollup(pid: int) -> Optional[Dict[str, int]]:
+    path = PROC_ROOT / str(pid) / "smaps_rollup"
+    try:
+        lines = path.read_text().splitlines()
+    except OSError:
+        return None
+    values: Dict[str, int] = {}
+    for line in lines:
+        key, _, rest = line.partition(":")
+        field = _SMAPS_FIELDS.get(key.strip())
+        if field:
+            values[field] = int(rest.split()[0]) * 1024  # reported in kB
+    return values
+
+
+def _read_statm(pid: int) -> Optional[Dict[str, int]]:
+    try:
+        fields = (PROC_ROOT / str(pid) / "statm").read_text().split()
+    except OSError:
+        return None
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    return {"rss_bytes": int(fields[1]) * page_size, "shared_bytes": int(fields[2]) * page_size}
+
+
+def process_memory(pid: Optional[int] = None) -> Dict[str, int]:
+    """
+    Return resident, shared and private bytes for a process.
+
+    Uses ``/proc/<pid>/smaps_rollup`` when available (shared/private split and
+    PSS); falls back to ``/proc/<pid>/statm``. Returns an empty dict on
+    platforms without procfs.
+    """
+    pid = pid or os.getpid()
+    rollup = _read_smaps_rollup(pid)
+    if rollup is not None:
+        rollup["shared_bytes"] = rollup.get("shared_clean_bytes", 0) + rollup.get("shared_dirty_bytes", 0)
+        rollup["private_bytes"] = rollup.get("private_clean_bytes", 0) + rollup.get("private_dirty_bytes", 0)
+        return {"pid": pid, **rollup}
+    statm = _read_statm(pid)
+    if statm is not None:
+        return {"pid": pid, **statm, "private_bytes": statm["rss_bytes"] - statm["shared_bytes"]}
+    return {}
+
+
+def child_pids(pid: int) -> List[int]:
+    """Direct children of ``pid`` (e.g. Gunicorn workers of the master)."""
+    children: List[int] = []
+    for entry in PROC_ROOT.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        # The command name may contain spaces; fields after the closing paren are fixed.
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        if ppid == pid:
+            children.append(int(entry.name))
+    return sorted(children)
+
+
+__all__ = ["process_memory", "child_pids"]
@@ -0,0 +1,191 @@
+"""
+Single load/save path for the fine-tuned DistilBERT classifier.
+
+The canonical artifact is one safetensors file holding the full state dict
+(``sanity_model.safetensors``); ``MODEL_DIR`` only holds the config and
+tokenizer. Weights are memory-mapped and assigned straight into a model
+built on the meta device, so every tensor is materialized exactly once.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import torch
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+SAFETENSORS_SUFFIX = ".safetensors"
+LEGACY_SUFFIX = ".bin"
+BASE_WEIGHT_FILES = ("model.safetensors", "pytorch_model.bin")
+# Older transformers versions persisted this buffer; it is rebuilt on load.
+IGNORED_STATE_KEYS = ("distilbert.embeddings.position_ids",)
+
+
+class ModelLoadError(RuntimeError):
+    """Raised when weights are missing or don't match the model architecture."""
+
+
+def resolve_weights_path(model_dir: Path, weights_path: Optional[Path] = None) -> Path:
+    """
+    Pick the weights file to load.
+
+    Prefers ``weights_path``; if it doesn't exist, its ``.safetensors`` (or
+    legacy ``.bin``) sibling; otherwise the base weights saved in ``model_dir``.
+    """
+    candidates = []
+    if weights_path:
+        weights_path = Path(weights_path)
+        for candidate in (
+            weights_path,
+            weights_path.with_suffix(SAFETENSORS_SUFFIX),
+            weights_path.with_suffix(LEGACY_SUFFIX),
+        ):
+            if candidate not in candidates:
+                candidates.append(candidate)
+    base_candidates = [Path(model_dir) / name for name in BASE_WEIGHT_FILES]
+    for candidate in candidates + base_candidates:
+        if candidate.exists():
+            if weights_path and candidate in base_candidates:
+                logger.warning("Fine-tuned weights %s not found; using base weights %s.", weights_path, candidate)
+            return candidate
+    candidates += base_candidates
+    raise ModelLoadError(
+        f"No weights found (looked for {', '.join(str(c) for c in candidates)})."
+    )
+
+
+def load_state_dict_file(path: Path) -> Dict[str, torch.Tensor]:
+    """Memory-map a state dict from safetensors (or a legacy torch .bin)."""
+    path = Path(path)
+    if path.suffix == SAFETENSORS_SUFFIX:
+        from safetensors.torch import load_file
+
+        state_dict = load_file(str(path), device="cpu")
+    else:
+        logger.warning(
+            "Loading legacy weights %s; convert them with scripts/convert_weights.py for zero-copy loads.",
+            path,
+        )
+        state_dict = torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+    for key in IGNORED_STATE_KEYS:
+        state_dict.pop(key, None)
+    return state_dict
+
+
+def _restore_buffers(model: torch.nn.Module, config: Any) -> None:
+    """Rebuild non-persistent buffers, which are not part of the state dict."""
+    for name, buffer in list(model.named_buffers()):
+        if not buffer.is_meta:
+            continue
+        module_name, _, buffer_name = name.rpartition(".")
+        if buffer_name != "position_ids":
+            raise ModelLoadError(f"Don't know how to initialise buffer '{name}'.")
+        module = model.get_submodule(module_name)
+        module.register_buffer(
+            buffer_name,
+            torch.arange(config.max_position_embeddings).expand((1, -1)),
+            persistent=False,
+        )
+
+
+def assign_state_dict(model: torch.nn.Module, state_dict: Dict[str, torch.Tensor], source: Any) -> None:
+    """Strictly load ``state_dict`` into ``model`` without copying tensors."""
+    try:
+        model.load_state_dict(state_dict, strict=True, assign=True)
+    except RuntimeError as exc:
+        raise ModelLoadError(f"State dict in {source} doesn't match the model: {exc}") from exc
+
+
+def build_classifier(config: Any, weights_path: Path) -> torch.nn.Module:
+    """Instantiate the classifier on the meta device and attach mmapped weights."""
+    from transformers import DistilBertForSequenceClassification
+
+    with torch.device("meta"):
+        model = DistilBertForSequenceClassification(config)
+    assign_state_dict(model, load_state_dict_file(weights_path), weights_path)
+    _restore_buffers(model, config)
+    return model
+
+
+def load_classifier(
+    model_dir: Path,
+    weights_path: Optional[Path] = None,
+    device: Any = "cpu",
+) -> Tuple[Any, torch.nn.Module]:
+    """
+    Load tokenizer and classifier through the single supported path.
+
+    Args:
+        model_dir: Directory with config.json and tokenizer files
+        weights_path: Fine-tuned weights (safetensors preferred); falls back to base weights in model_dir
+        device: Target device
+
+    Returns:
+        Tuple of (tokenizer, model in eval mode)
+
+    Raises:
+        ModelLoadError: If weights are missing or don't match the architecture
+    """
+    from transformers import DistilBertConfig, DistilBertTokenizerFast
+
+    model_dir = Path(model_dir)
+    tokenizer = DistilBertTokenizerFast.from_pretrained(model_dir, local_files_only=True)
+    config = DistilBertConfig.from_pretrained(model_dir, local_files_only=True)
+    resolved = resolve_weights_path(model_dir, weights_path)
+    model = build_classifier(config, resolved)
+    logger.info("Loaded classifier weights from %s", resolved)
+    model.to(device)
+    model.eval()
+    return tokenizer, model
+
+
+def save_classifier(model: torch.nn.Module, tokenizer: Any, model_dir: Path, weights_path: Path) -> None:
+    """
+    Write the canonical artifact: config/tokenizer to ``model_dir`` and the
+    weights once, as safetensors, to ``weights_path``.
+    """
+    from safetensors.torch import save_file
+
+    model_dir = Path(model_dir)
+    weights_path = Path(weights_path)
+    if weights_path.suffix != SAFETENSORS_SUFFIX:
+        raise ValueError(f"Weights must be saved as {SAFETENSORS_SUFFIX}, got {weights_path}.")
+    model_dir.mkdir(parents=True, exist_ok=True)
+    weights_path.parent.mkdir(parents=True, exist_ok=True)
+    model.config.save_pretrained(model_dir)
+    tokenizer.save_pretrained(model_dir)
+    state_dict = {key: tensor.detach().cpu().contiguous() for key, tensor in model.state_dict().items()}
+    tmp_path = weights_path.with_name(weights_path.name + ".tmp")
+    save_file(state_dict, str(tmp_path), metadata={"format": "pt"})
+    tmp_path.replace(weights_path)
+    logger.info("Saved classifier weights to %s", weights_path)
+
+
+def convert_to_safetensors(source: Path, destination: Optional[Path] = None) -> Path:
+    """Convert a legacy torch state dict (.bin) to the canonical safetensors file."""
+    from safetensors.torch import save_file
+
+    source = Path(source)
+    destination = Path(destination) if destination else source.with_suffix(SAFETENSORS_SUFFIX)
+    state_dict = torch.load(source, map_location="cpu", weights_only=True)
+    for key in IGNORED_STATE_KEYS:
+        state_dict.pop(key, None)
+    save_file({key: tensor.contiguous() for key, tensor in state_dict.items()}, str(destination), metadata={"format": "pt"})
+    logger.info("Converted %s to %s", source, destination)
+    return destination
+
+
+__all__ = [
+    "ModelLoadError",
+    "convert_to_safetensors",
+    "resolve_weights_path",
+    "load_state_dict_file",
+    "assign_state_dict",
+    "build_classifier",
+    "load_classifier",
+    "save_classifier",
+]
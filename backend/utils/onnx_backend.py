@@ -0,0 +1,160 @@
+"""
+ONNX Runtime serving backend for the exported DistilBERT classifier.
+"""
+
+from __future__ import annotations
+
+import types
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import torch
+
+try:
+    import onnxruntime as ort
+except ImportError:  # pragma: no cover - optional dependency
+    ort = None  # type: ignore
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+ONNX_INPUT_NAMES = ("input_ids", "attention_mask")
+ONNX_OUTPUT_NAMES = ("logits",)
+GRAPH_OPTIMIZATION_LEVELS = ("disabled", "basic", "extended", "all")
+
+
+class OnnxBackendError(RuntimeError):
+    """Raised when the ONNX backend cannot be created or fails a parity check."""
+
+
+def create_session(
+    model_path: Path,
+    graph_optimization: str = "all",
+    intra_op_threads: int = 0,
+    inter_op_threads: int = 0,
+    optimized_model_path: Optional[Path] = None,
+) -> Any:
+    """
+    Create a CPU ONNX Runtime session.
+
+    Args:
+        model_path: Exported ``.onnx`` graph
+        graph_optimization: One of disabled, basic, extended, all
+        intra_op_threads: Threads used inside an operator (0 = runtime default)
+        inter_op_threads: Threads used across independent operators (0 = runtime default)
+        optimized_model_path: Optional path to save the optimized graph for inspection
+    """
+    if ort is None:
+        raise OnnxBackendError("onnxruntime is not installed. Install it with `pip install onnxruntime`.")
+    model_path = Path(model_path)
+    if not model_path.exists():
+        raise OnnxBackendError(
+            f"ONNX model not found at {model_path}. Run backend/scripts/export_onnx.py first."
+        )
+    levels = {
+        "disabled": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+        "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+        "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+        "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+    }
+    if graph_optimization not in levels:
+        raise OnnxBackendError(
+            f"Unsupported graph optimization '{graph_optimization}'. "
+            f"Choose from {', '.join(GRAPH_OPTIMIZATION_LEVELS)}."
+        )
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = levels[graph_optimization]
+    options.intra_op_num_threads = intra_op_threads
+    options.inter_op_num_threads = inter_op_threads
+    if inter_op_threads > 1:
+        options.execution_mode = ort.ExecutionMode.ORT_PARALLEL
+    if optimized_model_path:
+        options.optimized_model_filepath = str(optimized_model_path)
+
+    session = ort.InferenceSession(str(model_path), sess_options=options, providers=["CPUExecutionProvider"])
+    logger.info(
+        "Created ONNX Runtime session for %s | optimization=%s intra_op=%d inter_op=%d",
+        model_path,
+        graph_optimization,
+        intra_op_threads,
+        inter_op_threads,
+    )
+    return session
+
+
+class OnnxSequenceClassifier:
+    """
+    Callable wrapper that mimics ``DistilBertForSequenceClassification``.
+
+    ``model(input_ids=..., attention_mask=...)`` returns an object with a
+    ``logits`` tensor so the shared inference helpers work unchanged.
+    """
+
+    def __init__(self, session: Any) -> None:
+        self.session = session
+        self._input_names = {inp.name for inp in session.get_inputs()}
+
+    def __call__(self, **inputs: torch.Tensor) -> Any:
+        feed: Dict[str, np.ndarray] = {
+            name: tensor.detach().cpu().numpy().astype(np.int64)
+            for name, tensor in inputs.items()
+            if name in self._input_names
+        }
+        (logits,) = self.session.run(list(ONNX_OUTPUT_NAMES), feed)
+        return types.SimpleNamespace(logits=torch.from_numpy(logits))
+
+    def eval(self) -> "OnnxSequenceClassifier":
+        return self
+
+    def to(self, _device: Any) -> "OnnxSequenceClassifier":
+        return self
+
+
+def check_onnx_equivalence(
+    torch_model: Any,
+    onnx_model: Any,
+    tokenizer: Any,
+    texts: Sequence[str],
+    atol: float = 1e-4,
+) -> float:
+    """
+    Compare ONNX and PyTorch logits on sample texts.
+
+    Texts are run both one by one and as a padded batch so that the dynamic
+    batch and sequence axes are exercised.
+
+    Returns:
+        Largest absolute logit difference observed
+
+    Raises:
+        OnnxBackendError: If any difference exceeds ``atol``
+    """
+    if not texts:
+        raise ValueError("At least one sample text is required for the equivalence check.")
+    torch_model.eval()
+    batches = [[text] for text in texts] + [list(texts)]
+    max_diff = 0.0
+    for batch in batches:
+        inputs = tokenizer(batch, padding=True, truncation=True, max_length=512, return_tensors="pt")
+        inputs = {k: v for k, v in inputs.items() if k in ONNX_INPUT_NAMES}
+        with torch.no_grad():
+            expected = torch_model(**inputs).logits.cpu().numpy()
+        actual = onnx_model(**inputs).logits.numpy()
+        max_diff = max(max_diff, float(np.max(np.abs(expected - actual))))
+    if max_diff > atol:
+        raise OnnxBackendError(f"ONNX output differs from PyTorch by {max_diff:.2e} (atol={atol:.0e}).")
+    return max_diff
+
+
+__all__ = [
+    "ONNX_INPUT_NAMES",
+    "ONNX_OUTPUT_NAMES",
+    "GRAPH_OPTIMIZATION_LEVELS",
+    "OnnxBackendError",
+    "OnnxSequenceClassifier",
+    "create_session",
+    "check_onnx_equivalence",
+]
@@ -0,0 +1,256 @@
+"""
+Pipelined inference: tokenization, forward pass and post-processing on
+separate executors so consecutive batches overlap.
+
+Batch N+1 is tokenized (fast-tokenizer batch encoding, which releases the
+GIL) on a thread pool while batch N runs through the model on the single
+forward thread; softmax and result building run on a post-processing pool
+so the forward thread can move straight on to the next batch.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+
+from .inference import MAX_SEQUENCE_LENGTH, encode_texts, length_sorted_order, pad_batch
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+PIPELINE_STAGES = ("tokenize", "forward_wait", "forward", "postprocess")
+
+
+@dataclass
+class _PipelineJob:
+    texts: List[str]
+    future: Future
+    postprocess: Optional[Callable[[np.ndarray], Any]]
+    submitted_at: float
+    tokenized_at: float = 0.0
+    chunks: List[Tuple[List[int], Dict[str, torch.Tensor]]] = field(default_factory=list)
+
+
+def softmax(logits: np.ndarray) -> np.ndarray:
+    """Numerically stable softmax over the last axis."""
+    shifted = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+class InferencePipeline:
+    """
+    Three-stage classifier pipeline returning futures.
+
+    Args:
+        tokenizer: Fast tokenizer used by the classifier
+        model: Classifier returning ``.logits`` (torch, quantized or ONNX wrapper)
+        device: Device the forward pass runs on
+        batch_size: Largest forward pass; bigger submissions are length-bucketed
+        max_length: Truncation length in tokens
+        tokenizer_workers: Threads encoding and padding batches
+        postprocess_workers: Threads running softmax/result building
+        name: Prefix for thread names (used in logs)
+    """
+
+    def __init__(
+        self,
+        tokenizer: Any,
+        model: Any,
+        device: Any,
+        batch_size: int = 32,
+        max_length: int = MAX_SEQUENCE_LENGTH,
+        tokenizer_workers: int = 2,
+        postprocess_workers: int = 1,
+        name: str = "inference-pipeline",
+    ) -> None:
+        if tokenizer_workers < 1 or postprocess_workers < 1:
+            raise ValueError("Pipeline stages need at least one worker each.")
+        self.tokenizer = tokenizer
+        self.model = model
+        self.device = device
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.tokenizer_workers = tokenizer_workers
+        self.postprocess_workers = postprocess_workers
+        self.name = name
+        self._tokenize_pool = ThreadPoolExecutor(tokenizer_workers, thread_name_prefix=f"{name}-tokenize")
+        self._postprocess_pool = ThreadPoolExecutor(postprocess_workers, thread_name_prefix=f"{name}-post")
+        self._forward_queue: "queue.Queue[_PipelineJob]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._in_flight = 0
+        self._reset_stats()
+
+    def _reset_stats(self) -> None:
+        self._jobs = 0
+        self._errors = 0
+        self._stage_totals = {stage: 0.0 for stage in PIPELINE_STAGES}
+        self._stage_max = {stage: 0.0 for stage in PIPELINE_STAGES}
+        self._end_to_end_total = 0.0
+
+    def start(self) -> None:
+        """Start the forward thread (idempotent)."""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._forward_loop, name=f"{self.name}-forward", daemon=True)
+            self._thread.start()
+            logger.info(
+                "Started %s | tokenizer_workers=%d postprocess_workers=%d",
+                self.name,
+                self.tokenizer_workers,
+                self.postprocess_workers,
+            )
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the forward thread and shut the stage executors down."""
+        self._stopped.set()
+        thread = self._thread
+        if thread:
+            thread.join(timeout)
+        self._tokenize_pool.shutdown(wait=False)
+        self._postprocess_pool.shutdown(wait=False)
+
+    def submit(self, texts: Sequence[str], postprocess: Optional[Callable[[np.ndarray], Any]] = None) -> Future:
+        """
+        Queue texts for classification.
+
+        Returns a Future resolving to the (n, num_labels) probability array in
+        input order, or to ``postprocess(probabilities)`` when given (run on
+        the post-processing pool, off the forward thread).
+        """
+        if not self._thread or not self._thread.is_alive():
+            self.start()
+        future: Future = Future()
+        future.set_running_or_notify_cancel()
+        job = _PipelineJob(list(texts), future, postprocess, time.perf_counter())
+        with self._lock:
+            self._in_flight += 1
+        self._tokenize_pool.submit(self._tokenize, job).add_done_callback(
+            lambda done: self._on_tokenized(job, done)
+        )
+        return future
+
+    def __call__(self, texts: Sequence[str], timeout: Optional[float] = None) -> Any:
+        return self.submit(texts).result(timeout=timeout)
+
+    def _record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self._stage_totals[stage] += seconds
+            self._stage_max[stage] = max(self._stage_max[stage], seconds)
+
+    def _fail(self, job: _PipelineJob, exc: BaseException) -> None:
+        logger.error("%s job of %d texts failed: %s", self.name, len(job.texts), exc, exc_info=exc)
+        with self._lock:
+            self._errors += 1
+            self._in_flight -= 1
+        job.future.set_exception(exc)
+
+    def _tokenize(self, job: _PipelineJob) -> None:
+        started = time.perf_counter()
+        if job.texts:
+            sequences = encode_texts(self.tokenizer, job.texts, max_length=self.max_length)
+            order = length_sorted_order(sequences)
+            for offset in range(0, len(order), self.batch_size):
+                indices = order[offset : offset + self.batch_size]
+                inputs = pad_batch([sequences[idx] for idx in indices], self.tokenizer.pad_token_id)
+                # Host-to-device copies happen here too, off the forward thread.
+                inputs = {key: value.to(self.device, non_blocking=True) for key, value in inputs.items()}
+                job.chunks.append((indices, inputs))
+        job.tokenized_at = time.perf_counter()
+        self._record("tokenize", job.tokenized_at - started)
+
+    def _on_tokenized(self, job: _PipelineJob, done: Future) -> None:
+        exc = done.exception()
+        if exc is not None:
+            self._fail(job, exc)
+            return
+        self._forward_queue.put(job)
+
+    def _forward_loop(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                job = self._forward_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            started = time.perf_counter()
+            self._record("forward_wait", started - job.tokenized_at)
+            try:
+                with torch.no_grad():
+                    outputs = [(indices, self.model(**inputs).logits.float().cpu()) for indices, inputs in job.chunks]
+            except Exception as exc:
+                self._fail(job, exc)
+                continue
+            self._record("forward", time.perf_counter() - started)
+            try:
+                self._postprocess_pool.submit(self._postprocess, job, outputs)
+            except RuntimeError as exc:  # executor shut down
+                self._fail(job, exc)
+
+    def _postprocess(self, job: _PipelineJob, outputs: List[Tuple[List[int], torch.Tensor]]) -> None:
+        started = time.perf_counter()
+        try:
+            num_labels = outputs[0][1].shape[-1] if outputs else 2
+            probs = np.empty((len(job.texts), num_labels), dtype=np.float32)
+            for indices, logits in outputs:
+                probs[indices] = softmax(logits.numpy())
+            result = job.postprocess(probs) if job.postprocess else probs
+        except Exception as exc:
+            self._fail(job, exc)
+            return
+        finished = time.perf_counter()
+        self._record("postprocess", finished - started)
+        with self._lock:
+            self._jobs += 1
+            self._in_flight -= 1
+            self._end_to_end_total += finished - job.submitted_at
+        job.future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Per-stage average/max milliseconds and the current bottleneck.
+
+        ``forward_wait`` is time a tokenized batch queued for the model; the
+        bottleneck is the stage with the highest average time per worker.
+        """
+        with self._lock:
+            jobs = self._jobs
+            stages = {
+                stage: {
+                    "avg_ms": self._stage_totals[stage] / jobs * 1000 if jobs else 0.0,
+                    "max_ms": self._stage_max[stage] * 1000,
+                }
+                for stage in PIPELINE_STAGES
+            }
+            workers = {"tokenize": self.tokenizer_workers, "forward": 1, "postprocess": self.postprocess_workers}
+            bottleneck = (
+                max(workers, key=lambda stage: stages[stage]["avg_ms"] / workers[stage]) if jobs else None
+            )
+            return {
+                "jobs": jobs,
+                "errors": self._errors,
+                "in_flight": self._in_flight,
+                "forward_queue_depth": self._forward_queue.qsize(),
+                "tokenizer_workers": self.tokenizer_workers,
+                "postprocess_workers": self.postprocess_workers,
+                "stages": stages,
+                "avg_end_to_end_ms": self._end_to_end_total / jobs * 1000 if jobs else 0.0,
+                "bottleneck": bottleneck,
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._reset_stats()
+
+
+__all__ = ["InferencePipeline", "softmax"]
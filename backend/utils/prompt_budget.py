@@ -0,0 +1,241 @@
+"""
+Token budgets for article text sent to the LLM.
+
+Articles are measured in tokens rather than characters. When an article is
+over its flow's budget, it is shortened by extractive selection: the lead
+sentences are kept, then the most salient remaining sentences are added
+(term-frequency scoring, boosted by overlap with the user's question for
+follow-ups) until the budget is full. The chosen sentences keep their
+original order.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .llm_handler import DEFAULT_MODEL
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional
+    tiktoken = None  # type: ignore
+
+DEFAULT_BUDGETS = {"verify": 2000, "followup": 1500}
+GAP_MARKER = "[...]"
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])[\"')\]]*\s+(?=[\"'(\[]?[A-Z0-9])")
+_WORD = re.compile(r"[A-Za-z][A-Za-z'-]+")
+_STOPWORDS = frozenset(
+    """a about after all also an and any are as at be been but by can could did do does for from had has have he
+    her his how i if in into is it its just more most not of on or our out said says she so than that the their them
+    then there these they this those to up was we were what when where which who will with would you your""".split()
+)
+
+
+class TokenCounter:
+    """
+    Counts tokens for the configured chat model.
+
+    Uses ``tiktoken`` when installed (``cl100k_base`` for models it does not
+    know, a close stand-in for Llama-family tokenizers); otherwise a
+    character/word heuristic that slightly overestimates English prose.
+    The encoding is loaded on first use, since tiktoken may download its BPE
+    file; if that fails (e.g. an offline node) the heuristic is used.
+    """
+
+    def __init__(self, model: str = DEFAULT_MODEL) -> None:
+        self.model = model
+        self._encode: Optional[Callable[[str], List[int]]] = None
+        self._loaded = tiktoken is None
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                try:
+                    encoding = tiktoken.encoding_for_model(self.model)
+                except KeyError:
+                    encoding = tiktoken.get_encoding("cl100k_base")
+                self._encode = encoding.encode
+            except Exception as exc:
+                logger.warning("tiktoken encoding unavailable, estimating prompt tokens instead: %s", exc)
+            self._loaded = True
+
+    @property
+    def method(self) -> str:
+        if not self._loaded:
+            return "tiktoken (not loaded)"
+        return "tiktoken" if self._encode else "heuristic"
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if not self._loaded:
+            self._load()
+        if self._encode is not None:
+            return len(self._encode(text))
+        return max(math.ceil(len(text) / 4), math.ceil(len(text.split()) * 1.3))
+
+
+@dataclass
+class FittedText:
+    text: str
+    original_tokens: int
+    tokens: int
+    sentences_total: int
+    sentences_kept: int
+
+    @property
+    def compressed(self) -> bool:
+        return self.tokens < self.original_tokens
+
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in _SENTENCE_SPLIT.split(text) if sentence.strip()]
+
+
+def _terms(text: str) -> List[str]:
+    return [word for word in (match.lower() for match in _WORD.findall(text)) if word not in _STOPWORDS]
+
+
+def sentence_scores(sentences: Sequence[str], query: Optional[str] = None) -> List[float]:
+    """
+    Salience of each sentence: mean document frequency of its content words,
+    plus a bonus per distinct word shared with ``query``.
+    """
+    sentence_terms = [_terms(sentence) for sentence in sentences]
+    frequencies = Counter(term for terms in sentence_terms for term in terms)
+    top = max(frequencies.values(), default=1)
+    query_terms = set(_terms(query)) if query else set()
+    scores = []
+    for terms in sentence_terms:
+        if not terms:
+            scores.append(0.0)
+            continue
+        score = sum(frequencies[term] / top for term in terms) / math.sqrt(len(terms))
+        score += 2.0 * len(query_terms.intersection(terms))
+        scores.append(score)
+    return scores
+
+
+class PromptBudget:
+    """
+    Fit article text into per-flow token budgets.
+
+    Args:
+        counter: Token counter for the target model
+        budgets: Article-token budget per flow (``verify``, ``followup``, ...)
+        lead_sentences: Leading sentences kept before salience ranking
+    """
+
+    def __init__(
+        self,
+        counter: TokenCounter,
+        budgets: Optional[Dict[str, int]] = None,
+        lead_sentences: int = 3,
+    ) -> None:
+        self.counter = counter
+        self.budgets = {**DEFAULT_BUDGETS, **(budgets or {})}
+        self.lead_sentences = lead_sentences
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _truncate(self, text: str, budget: int) -> str:
+        """Cut a single over-long passage at a word boundary."""
+        words = text.split()
+        low, high = 0, len(words)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if self.counter.count(" ".join(words[:mid]) + " " + GAP_MARKER) <= budget:
+                low = mid
+            else:
+                high = mid - 1
+        return " ".join(words[:low]) + " " + GAP_MARKER
+
+    def _select(self, sentences: List[str], budget: int, query: Optional[str]) -> List[int]:
+        costs = [self.counter.count(sentence) + 1 for sentence in sentences]
+        marker_cost = self.counter.count(GAP_MARKER) + 1
+        scores = sentence_scores(sentences, query)
+        lead = list(range(min(self.lead_sentences, len(sentences))))
+        ranked = sorted(range(len(sentences)), key=lambda index: (-scores[index], index))
+        chosen: List[int] = []
+        used = 0
+        for index in lead + [index for index in ranked if index not in lead]:
+            # Reserve room for a gap marker in case the selection is not contiguous.
+            if used + costs[index] + marker_cost <= budget:
+                chosen.append(index)
+                used += costs[index] + marker_cost
+        return sorted(chosen)
+
+    def fit(self, text: str, flow: str, query: Optional[str] = None) -> FittedText:
+        """
+        Return ``text`` unchanged if it fits the flow's budget, otherwise an
+        extractive summary that does.
+        """
+        budget = self.budgets.get(flow)
+        original_tokens = self.counter.count(text)
+        sentences = split_sentences(text)
+        if budget is None or original_tokens <= budget:
+            fitted = FittedText(text, original_tokens, original_tokens, len(sentences), len(sentences))
+        else:
+            chosen = self._select(sentences, budget, query)
+            if not chosen:
+                fitted_text = self._truncate(sentences[0] if sentences else text, budget)
+                chosen = [0]
+            else:
+                parts: List[str] = []
+                for position, index in enumerate(chosen):
+                    if index > (chosen[position - 1] + 1 if position else 0):
+                        parts.append(GAP_MARKER)
+                    parts.append(sentences[index])
+                if chosen[-1] < len(sentences) - 1:
+                    parts.append(GAP_MARKER)
+                fitted_text = " ".join(parts)
+            fitted = FittedText(
+                fitted_text, original_tokens, self.counter.count(fitted_text), len(sentences), len(chosen)
+            )
+            logger.info(
+                "Prompt budget | flow=%s tokens %d -> %d (budget %d, kept %d/%d sentences)",
+                flow,
+                fitted.original_tokens,
+                fitted.tokens,
+                budget,
+                fitted.sentences_kept,
+                fitted.sentences_total,
+            )
+        self._record(flow, fitted)
+        return fitted
+
+    def _record(self, flow: str, fitted: FittedText) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(flow, {"calls": 0, "compressed": 0, "tokens_in": 0, "tokens_out": 0})
+            stats["calls"] += 1
+            stats["compressed"] += int(fitted.compressed)
+            stats["tokens_in"] += fitted.original_tokens
+            stats["tokens_out"] += fitted.tokens
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            flows = {
+                flow: {
+                    **stats,
+                    "budget": self.budgets.get(flow),
+                    "tokens_saved": stats["tokens_in"] - stats["tokens_out"],
+                    "saved_ratio": 1 - stats["tokens_out"] / stats["tokens_in"] if stats["tokens_in"] else 0.0,
+                }
+                for flow, stats in self._stats.items()
+            }
+        return {"model": self.counter.model, "counter": self.counter.method, "flows": flows}
+
+
+__all__ = ["FittedText", "PromptBudget", "TokenCounter", "sentence_scores", "split_sentences"]
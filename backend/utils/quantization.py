@@ -0,0 +1,96 @@
+"""
+Dynamic INT8 quantization helpers for CPU inference.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Optional
+
+import torch
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def quantized_cache_path(weights_path: Path) -> Path:
+    """Location of the cached INT8 state dict, stored next to the fp32 weights."""
+    weights_path = Path(weights_path)
+    return weights_path.with_name(f"{weights_path.stem}.int8.pt")
+
+
+def quantize_model(model: torch.nn.Module) -> torch.nn.Module:
+    """Quantize the Linear layers of ``model`` to INT8 (dynamic activations)."""
+    model = model.to("cpu").eval()
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _cache_is_fresh(cache_path: Path, weights_path: Optional[Path]) -> bool:
+    if not cache_path.exists():
+        return False
+    if weights_path and weights_path.exists():
+        return cache_path.stat().st_mtime >= weights_path.stat().st_mtime
+    return True
+
+
+def load_cached_quantized_model(model_factory: Any, cache_path: Path) -> torch.nn.Module:
+    """
+    Rebuild a quantized model from a cached INT8 state dict.
+
+    Args:
+        model_factory: Callable returning an (untrained) fp32 model with the right architecture
+        cache_path: Path produced by ``save_quantized_model``
+    """
+    skeleton = quantize_model(model_factory())
+    state_dict = torch.load(cache_path, map_location="cpu", weights_only=True)
+    skeleton.load_state_dict(state_dict)
+    return skeleton.eval()
+
+
+def save_quantized_model(model: torch.nn.Module, cache_path: Path) -> None:
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(cache_path.suffix + ".tmp")
+    torch.save(model.state_dict(), tmp_path)
+    tmp_path.replace(cache_path)
+
+
+def get_quantized_model(
+    model_factory: Any,
+    fp32_loader: Any,
+    weights_path: Path,
+) -> torch.nn.Module:
+    """
+    Return the INT8 model, building and caching it on first use.
+
+    Args:
+        model_factory: Callable returning an empty fp32 model (architecture only)
+        fp32_loader: Callable returning the fine-tuned fp32 model; only used on a cache miss
+        weights_path: Fine-tuned fp32 weights; the INT8 cache is invalidated when they change
+    """
+    weights_path = Path(weights_path)
+    cache_path = quantized_cache_path(weights_path)
+    if _cache_is_fresh(cache_path, weights_path):
+        try:
+            model = load_cached_quantized_model(model_factory, cache_path)
+            logger.info("Loaded INT8 model from cache %s", cache_path)
+            return model
+        except Exception as exc:
+            logger.warning("INT8 cache %s unusable (%s). Rebuilding.", cache_path, exc)
+
+    model = quantize_model(fp32_loader())
+    try:
+        save_quantized_model(model, cache_path)
+        logger.info("Built INT8 model and cached it at %s", cache_path)
+    except OSError as exc:
+        logger.warning("Could not cache INT8 model at %s: %s", cache_path, exc)
+    return model
+
+
+__all__ = [
+    "quantized_cache_path",
+    "quantize_model",
+    "load_cached_quantized_model",
+    "save_quantized_model",
+    "get_quantized_model",
+]
@@ -0,0 +1,153 @@
+"""
+Client-side token-bucket rate limiting.
+
+Used by the Groq client to stay under the provider's requests-per-minute
+and tokens-per-minute limits instead of discovering them through 429s.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class RateLimitTimeout(RuntimeError):
+    """Raised when capacity does not free up within the caller's timeout."""
+
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously.
+
+    Args:
+        capacity: Burst size (and the most a single acquire can take)
+        refill_per_second: Steady-state rate
+        clock: Monotonic time source (injectable for tests)
+    """
+
+    def __init__(
+        self,
+        capacity: float,
+        refill_per_second: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if capacity <= 0 or refill_per_second <= 0:
+            raise ValueError("capacity and refill_per_second must be positive.")
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, limit: float, **kwargs: Any) -> "TokenBucket":
+        return cls(capacity=limit, refill_per_second=limit / 60.0, **kwargs)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_per_second)
+        self._updated = now
+
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def reserve(self, amount: float) -> float:
+        """
+        Take ``amount`` tokens now and return how long to wait before using them.
+
+        The balance may go negative; later callers then queue behind this one,
+        which keeps the bucket fair under contention. Requests larger than the
+        capacity are clamped so they can ever be served.
+        """
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+            return max(0.0, -self._tokens / self.refill_per_second)
+
+    def adjust(self, delta: float) -> None:
+        """Return (positive) or charge (negative) tokens after the fact."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + delta)
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limits applied together.
+
+    Args:
+        requests_per_minute: 0 disables the request limit
+        tokens_per_minute: 0 disables the token limit
+        sleep: Sleep function (injectable for tests)
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.requests = TokenBucket.per_minute(requests_per_minute, clock=clock) if requests_per_minute else None
+        self.tokens = TokenBucket.per_minute(tokens_per_minute, clock=clock) if tokens_per_minute else None
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._acquired = 0
+        self._throttled = 0
+        self._waited = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.requests is not None or self.tokens is not None
+
+    def acquire(self, tokens: int = 0, timeout: Optional[float] = None) -> float:
+        """
+        Block until one request of roughly ``tokens`` tokens may be sent.
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            RateLimitTimeout: If the wait would exceed ``timeout`` (nothing is consumed)
+        """
+        wait = 0.0
+        reserved = []
+        for bucket, amount in ((self.requests, 1), (self.tokens, tokens)):
+            if bucket is not None and amount:
+                wait = max(wait, bucket.reserve(amount))
+                reserved.append((bucket, amount))
+        if timeout is not None and wait > timeout:
+            for bucket, amount in reserved:
+                bucket.adjust(min(amount, bucket.capacity))
+            raise RateLimitTimeout(f"Rate limit would delay the request by {wait:.1f}s.")
+        if wait > 0:
+            self._sleep(wait)
+        with self._lock:
+            self._acquired += 1
+            if wait > 0:
+                self._throttled += 1
+                self._waited += wait
+        return wait
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Correct the token bucket once the response reports real usage."""
+        if self.tokens is not None and actual_tokens:
+            self.tokens.adjust(estimated_tokens - actual_tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests_per_minute": self.requests.capacity if self.requests else None,
+                "tokens_per_minute": self.tokens.capacity if self.tokens else None,
+                "acquired": self._acquired,
+                "throttled": self._throttled,
+                "total_wait_s": round(self._waited, 3),
+            }
+
+
+__all__ = ["RateLimitTimeout", "RateLimiter", "TokenBucket"]
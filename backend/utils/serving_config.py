@@ -0,0 +1,254 @@
+"""
+CPU topology detection and the serving config (workers x torch threads).
+
+The config is either recommended from the detected topology or produced by
+``scripts/tune_serving.py``, which benchmarks worker/thread combinations on
+replayed articles and writes the winner to ``serving_config.json``.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+SYS_CPU_ROOT = Path("/sys/devices/system/cpu")
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+SERVING_CONFIG_MODES = ("auto", "file", "off")
+# Beyond this, extra workers mostly add memory and scheduling overhead.
+MAX_AUTO_WORKERS = 8
+
+
+@dataclass(frozen=True)
+class CpuTopology:
+    """CPUs this process may use, as seen through affinity and cgroup limits."""
+
+    logical_cpus: int
+    physical_cores: int
+    sockets: int = 1
+    cgroup_cpus: Optional[float] = None
+
+    @property
+    def usable_cores(self) -> int:
+        """Physical cores actually available, capped by the cgroup CPU quota."""
+        cores = self.physical_cores
+        if self.cgroup_cpus:
+            cores = min(cores, max(1, math.floor(self.cgroup_cpus)))
+        return max(1, cores)
+
+    def fingerprint(self) -> str:
+        return f"{self.logical_cpus}l-{self.physical_cores}c-{self.sockets}s-{self.usable_cores}u"
+
+
+@dataclass
+class ServingConfig:
+    """Per-box serving parameters; ``torch_threads`` is per worker."""
+
+    workers: int
+    torch_threads: int
+    interop_threads: int = 1
+    source: str = "auto"
+    topology: Optional[str] = None
+    benchmark: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _parse_cpu_list(value: str) -> List[int]:
+    cpus: List[int] = []
+    for part in value.strip().split(","):
+        if not part:
+            continue
+        start, _, end = part.partition("-")
+        cpus.extend(range(int(start), int(end or start) + 1))
+    return cpus
+
+
+def _cgroup_cpu_limit(cgroup_root: Path) -> Optional[float]:
+    """CPU quota in cores from cgroup v2 ``cpu.max`` (or v1 cfs files), if limited."""
+    try:
+        quota, period = (cgroup_root / "cpu.max").read_text().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        quota = int((cgroup_root / "cpu" / "cpu.cfs_quota_us").read_text())
+        period = int((cgroup_root / "cpu" / "cpu.cfs_period_us").read_text())
+    except (OSError, ValueError):
+        return None
+    return quota / period if quota > 0 and period > 0 else None
+
+
+def detect_topology(sys_root: Path = SYS_CPU_ROOT, cgroup_root: Path = CGROUP_ROOT) -> CpuTopology:
+    """
+    Count the logical CPUs, physical cores and sockets this process can run on.
+
+    Hyper-threads sharing a core are counted once; falls back to treating each
+    logical CPU as a core when sysfs topology is unavailable.
+    """
+    try:
+        cpus = sorted(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - non-Linux
+        cpus = list(range(os.cpu_count() or 1))
+
+    cores = set()
+    sockets = set()
+    for cpu in cpus:
+        topology_dir = sys_root / f"cpu{cpu}" / "topology"
+        try:
+            package = int((topology_dir / "physical_package_id").read_text())
+            core = int((topology_dir / "core_id").read_text())
+        except (OSError, ValueError):
+            cores.add(("cpu", cpu))
+            continue
+        sockets.add(package)
+        cores.add((package, core))
+
+    return CpuTopology(
+        logical_cpus=len(cpus),
+        physical_cores=max(1, len(cores)),
+        sockets=max(1, len(sockets)),
+        cgroup_cpus=_cgroup_cpu_limit(cgroup_root),
+    )
+
+
+def recommend_config(topology: CpuTopology) -> ServingConfig:
+    """
+    Heuristic split when no benchmark result is available.
+
+    Two intra-op threads per worker keeps per-request latency reasonable while
+    using the remaining cores for parallel requests; one inter-op thread since
+    each worker runs a single forward at a time.
+    """
+    cores = topology.usable_cores
+    threads = 2 if cores >= 4 else cores
+    workers = max(1, min(MAX_AUTO_WORKERS, cores // threads))
+    threads = max(1, cores // workers)
+    return ServingConfig(
+        workers=workers,
+        torch_threads=threads,
+        interop_threads=1,
+        source="auto",
+        topology=topology.fingerprint(),
+    )
+
+
+def load_serving_config(path: Path) -> Optional[ServingConfig]:
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        data = json.loads(path.read_text())
+        return ServingConfig(
+            workers=int(data["workers"]),
+            torch_threads=int(data["torch_threads"]),
+            interop_threads=int(data.get("interop_threads", 1)),
+            source=data.get("source", "tuned"),
+            topology=data.get("topology"),
+            benchmark=data.get("benchmark", {}),
+        )
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        logger.warning("Ignoring unreadable serving config %s: %s", path, exc)
+        return None
+
+
+def save_serving_config(config: ServingConfig, path: Path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(config.to_dict(), indent=2) + "\n")
+    logger.info("Wrote serving config to %s", path)
+
+
+def resolve_serving_config(
+    path: Optional[Path],
+    mode: str = "auto",
+    topology: Optional[CpuTopology] = None,
+) -> Optional[ServingConfig]:
+    """
+    Pick the serving config to apply at startup.
+
+    Args:
+        path: Tuned ``serving_config.json`` (may not exist)
+        mode: ``file`` uses the tuned file as-is, ``auto`` uses it only when it
+            was tuned on the same topology and otherwise derives one from the
+            detected CPUs, ``off`` disables auto-configuration
+        topology: Detected topology (detected when omitted)
+
+    Returns:
+        The config to apply, or None when disabled
+    """
+    if mode == "off":
+        return None
+    if mode not in SERVING_CONFIG_MODES:
+        logger.warning("Unknown SERVING_CONFIG_MODE '%s', using auto.", mode)
+        mode = "auto"
+    topology = topology or detect_topology()
+    tuned = load_serving_config(path) if path else None
+    if tuned is not None:
+        if mode == "file" or tuned.topology in (None, topology.fingerprint()):
+            return tuned
+        logger.warning(
+            "Serving config %s was tuned on %s but this box is %s; using topology defaults.",
+            path,
+            tuned.topology,
+            topology.fingerprint(),
+        )
+    return recommend_config(topology)
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile (0 for an empty sample)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize_run(latencies_ms: Sequence[float], wall_seconds: float) -> Dict[str, float]:
+    return {
+        "requests": len(latencies_ms),
+        "p50_ms": round(percentile(latencies_ms, 50), 2),
+        "p99_ms": round(percentile(latencies_ms, 99), 2),
+        "throughput_rps": round(len(latencies_ms) / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+    }
+
+
+def choose_best(
+    results: Sequence[Dict[str, Any]],
+    objective: str = "throughput",
+    max_p99_ms: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Pick the winning sweep result.
+
+    ``throughput`` maximises requests/sec among runs meeting the p99 budget
+    (all runs if none do); ``latency`` minimises p99.
+    """
+    if not results:
+        raise ValueError("No benchmark results to choose from.")
+    if objective == "latency":
+        return min(results, key=lambda r: (r["p99_ms"], -r["throughput_rps"]))
+    eligible = [r for r in results if max_p99_ms is None or r["p99_ms"] <= max_p99_ms] or list(results)
+    return max(eligible, key=lambda r: (r["throughput_rps"], -r["p99_ms"]))
+
+
+__all__ = [
+    "CpuTopology",
+    "ServingConfig",
+    "detect_topology",
+    "recommend_config",
+    "load_serving_config",
+    "save_serving_config",
+    "resolve_serving_config",
+    "summarize_run",
+    "choose_best",
+]
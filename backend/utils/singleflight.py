@@ -0,0 +1,73 @@
+"""
+Singleflight: collapse concurrent identical calls into one execution.
+
+While a call for a key is running, further callers with the same key wait
+for its outcome (result or exception) instead of repeating the work. Once
+it finishes the key is free again; caching results is left to the caller.
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """
+    Per-key in-flight call registry.
+
+    Results are shared between the leader and every waiter, so callers must
+    treat them as read-only.
+
+    Args:
+        name: Label used in stats
+    """
+
+    def __init__(self, name: str = "singleflight") -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._calls = 0
+        self._executions = 0
+        self._collapsed = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Run ``fn`` unless a call for ``key`` is already in flight, in which case wait for it."""
+        with self._lock:
+            self._calls += 1
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = Future()
+                self._executions += 1
+            else:
+                self._collapsed += 1
+        if not leader:
+            return call.result()
+        try:
+            result = fn()
+        except BaseException as exc:
+            call.set_exception(exc)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self._calls,
+                "executions": self._executions,
+                "collapsed": self._collapsed,
+                "collapse_rate": self._collapsed / self._calls if self._calls else 0.0,
+                "in_flight": len(self._inflight),
+            }
+
+
+__all__ = ["SingleFlight"]
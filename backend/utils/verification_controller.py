@@ -0,0 +1,275 @@
+"""
+Admission control and circuit breaking for LLM auto-verification.
+
+Auto-verification is optional: when the provider is slow or failing, a
+/predict request is better served by the classifier verdict alone than by
+waiting for a timeout. The controller caps the verification call rate and
+concurrency, and opens a circuit after repeated failures or slow calls.
+While open, calls are skipped immediately; after a cool-down a single probe
+call is let through (half-open) and its outcome closes or re-opens the
+circuit.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from .logger import get_logger
+from .rate_limit import TokenBucket
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+SKIP_CIRCUIT_OPEN = "circuit_open"
+SKIP_RATE_LIMITED = "rate_limited"
+SKIP_CONCURRENCY = "concurrency_limit"
+
+
+class VerificationSkipped(RuntimeError):
+    """Raised instead of calling the LLM when the controller refuses a verification."""
+
+    def __init__(self, reason: str, retry_after: Optional[float] = None) -> None:
+        super().__init__(f"Verification skipped ({reason}).")
+        self.reason = reason
+        self.retry_after = retry_after
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "reason": self.reason,
+            "retry_after_seconds": round(self.retry_after, 3) if self.retry_after is not None else None,
+        }
+
+
+class VerificationController:
+    """
+    Rate limit, concurrency limit and circuit breaker for verification calls.
+
+    Args:
+        max_calls_per_second: Sustained call rate (0 = unlimited); bursts up to one second's worth
+        max_concurrent: Most calls in flight at once (0 = unlimited)
+        failure_threshold: Consecutive failed or slow calls that open the circuit
+        slow_call_ms: Calls slower than this count as failures (0 = latency ignored)
+        open_seconds: Cool-down before a probe call is allowed through
+        clock: Monotonic time source (injectable for tests)
+        sleep: Sleep function (injectable for tests)
+        is_failure: Decides whether an exception from the call is a provider failure
+            that counts toward the circuit (default: every exception); others are
+            re-raised without touching the failure streak
+    """
+
+    def __init__(
+        self,
+        max_calls_per_second: float = 2.0,
+        max_concurrent: int = 4,
+        failure_threshold: int = 5,
+        slow_call_ms: float = 10_000,
+        open_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        is_failure: Optional[Callable[[BaseException], bool]] = None,
+    ) -> None:
+        self.max_calls_per_second = max_calls_per_second
+        self.max_concurrent = max_concurrent
+        self.failure_threshold = max(1, failure_threshold)
+        self.slow_call_ms = slow_call_ms
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._sleep = sleep
+        self._is_failure = is_failure
+        self._bucket = (
+            TokenBucket(max(1.0, max_calls_per_second), max_calls_per_second, clock=clock)
+            if max_calls_per_second > 0
+            else None
+        )
+        self._lock = threading.Lock()
+        self._state = STATE_CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._consecutive_failures = 0
+        self._in_flight = 0
+        self._calls = 0
+        self._failures = 0
+        self._slow_calls = 0
+        self._ignored_errors = 0
+        self._times_opened = 0
+        self._latency_ms = 0.0
+        self._skipped = {SKIP_CIRCUIT_OPEN: 0, SKIP_RATE_LIMITED: 0, SKIP_CONCURRENCY: 0}
+
+    # -- circuit state ----------------------------------------------------------
+
+    def _retry_after(self) -> float:
+        return max(0.0, self._opened_at + self.open_seconds - self._clock())
+
+    def _skip(self, reason: str, retry_after: Optional[float] = None) -> VerificationSkipped:
+        self._skipped[reason] += 1
+        return VerificationSkipped(reason, retry_after)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == STATE_OPEN and self._retry_after() == 0:
+                return STATE_HALF_OPEN
+            return self._state
+
+    def check(self) -> None:
+        """
+        Raise ``VerificationSkipped`` if the circuit would refuse a call now.
+
+        Consumes nothing; used to avoid queueing work that cannot run.
+        """
+        with self._lock:
+            if self._state == STATE_OPEN and self._retry_after() > 0:
+                raise self._skip(SKIP_CIRCUIT_OPEN, self._retry_after())
+            if self._state == STATE_HALF_OPEN and self._probe_in_flight:
+                raise self._skip(SKIP_CIRCUIT_OPEN, None)
+
+    def _admit_circuit(self) -> bool:
+        """Return True if this call is the half-open probe."""
+        with self._lock:
+            if self._state == STATE_OPEN:
+                if self._retry_after() > 0:
+                    raise self._skip(SKIP_CIRCUIT_OPEN, self._retry_after())
+                self._state = STATE_HALF_OPEN
+                logger.info("Verification circuit half-open; probing the provider.")
+            if self._state == STATE_HALF_OPEN:
+                if self._probe_in_flight:
+                    raise self._skip(SKIP_CIRCUIT_OPEN, None)
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def _open(self) -> None:
+        self._state = STATE_OPEN
+        self._opened_at = self._clock()
+        self._times_opened += 1
+        logger.warning(
+            "Verification circuit open for %.0fs after %d consecutive failed/slow calls.",
+            self.open_seconds,
+            self._consecutive_failures,
+        )
+
+    def _record(self, probe: bool, latency_ms: float, failed: bool, slow: bool) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._calls += 1
+            self._latency_ms += latency_ms
+            self._failures += int(failed)
+            self._slow_calls += int(slow)
+            if probe:
+                self._probe_in_flight = False
+            if failed or slow:
+                self._consecutive_failures += 1
+                if probe or (self._state == STATE_CLOSED and self._consecutive_failures >= self.failure_threshold):
+                    self._open()
+            else:
+                self._consecutive_failures = 0
+                if probe:
+                    self._state = STATE_CLOSED
+                    logger.info("Verification circuit closed; provider recovered.")
+
+    def _release(self, probe: bool) -> None:
+        """End a call whose error was not the provider's: no outcome is recorded."""
+        with self._lock:
+            self._in_flight -= 1
+            self._ignored_errors += 1
+            if probe:
+                self._probe_in_flight = False
+
+    # -- admission ---------------------------------------------------------------
+
+    def _acquire_slot(self, deadline: float) -> None:
+        while True:
+            with self._lock:
+                if not self.max_concurrent or self._in_flight < self.max_concurrent:
+                    self._in_flight += 1
+                    return
+            if self._clock() >= deadline:
+                with self._lock:
+                    raise self._skip(SKIP_CONCURRENCY)
+            self._sleep(min(0.05, max(0.0, deadline - self._clock())))
+
+    def _acquire_rate(self, deadline: float) -> None:
+        if self._bucket is None:
+            return
+        wait = self._bucket.reserve(1)
+        if wait > max(0.0, deadline - self._clock()):
+            self._bucket.adjust(1)
+            with self._lock:
+                raise self._skip(SKIP_RATE_LIMITED, wait)
+        if wait > 0:
+            self._sleep(wait)
+
+    def call(self, fn: Callable[[], T], timeout: float = 0.0) -> T:
+        """
+        Run ``fn`` if the controller admits it.
+
+        Args:
+            fn: The verification call
+            timeout: Seconds a call may wait for a rate and concurrency slot, in total
+
+        Raises:
+            VerificationSkipped: If the circuit is open or no slot frees up in time
+        """
+        probe = self._admit_circuit()
+        deadline = self._clock() + timeout
+        try:
+            self._acquire_rate(deadline)
+            try:
+                self._acquire_slot(deadline)
+            except VerificationSkipped:
+                # The call never reaches the LLM, so it must not spend rate budget.
+                if self._bucket is not None:
+                    self._bucket.adjust(1)
+                raise
+        except VerificationSkipped:
+            if probe:
+                with self._lock:
+                    self._probe_in_flight = False
+            raise
+        started = self._clock()
+        try:
+            result = fn()
+        except BaseException as exc:
+            if self._is_failure is not None and not self._is_failure(exc):
+                self._release(probe)
+            else:
+                self._record(probe, (self._clock() - started) * 1000, failed=True, slow=False)
+            raise
+        latency_ms = (self._clock() - started) * 1000
+        self._record(probe, latency_ms, failed=False, slow=bool(self.slow_call_ms) and latency_ms > self.slow_call_ms)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            return {
+                "state": state,
+                "retry_after_seconds": round(self._retry_after(), 3) if state == STATE_OPEN else 0.0,
+                "max_calls_per_second": self.max_calls_per_second,
+                "max_concurrent": self.max_concurrent,
+                "in_flight": self._in_flight,
+                "calls": self._calls,
+                "failures": self._failures,
+                "slow_calls": self._slow_calls,
+                "ignored_errors": self._ignored_errors,
+                "consecutive_failures": self._consecutive_failures,
+                "times_opened": self._times_opened,
+                "avg_latency_ms": round(self._latency_ms / self._calls, 3) if self._calls else 0.0,
+                "skipped": dict(self._skipped),
+            }
+
+
+__all__ = [
+    "STATE_CLOSED",
+    "STATE_HALF_OPEN",
+    "STATE_OPEN",
+    "VerificationController",
+    "VerificationSkipped",
+]
@@ -0,0 +1,308 @@
+"""
+Background LLM verification jobs.
+
+``/predict`` returns the classifier result immediately and hands the slow
+LLM verification to a bounded worker pool. Clients poll the job or follow
+it over server-sent events. With a shared store, job snapshots are
+published there so any worker can answer for a job another worker runs.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+TERMINAL_STATES = (JOB_DONE, JOB_FAILED)
+SHARED_KEY_PREFIX = "verification_job:"
+
+
+class VerificationQueueFull(RuntimeError):
+    """Raised when too many verification jobs are already waiting."""
+
+
+@dataclass
+class VerificationJob:
+    job_id: str
+    key: Optional[str] = None
+    context_id: Optional[str] = None
+    # Every requester's context, including requests deduplicated onto this job.
+    context_ids: List[str] = field(default_factory=list)
+    status: str = JOB_PENDING
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "context_id": self.context_id,
+            "context_ids": list(self.context_ids),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class VerificationJobManager:
+    """
+    Run verification callables on a bounded thread pool and track their state.
+
+    Args:
+        max_workers: Concurrent verification calls
+        max_pending: Jobs allowed to wait or run at once; more are rejected
+        retention_seconds: How long finished jobs stay queryable
+        name: Thread name prefix (used in logs)
+        store: Optional shared mapping (a context store/backend with ``get``/``set``)
+            that job snapshots are published to, so every worker can read them
+        poll_seconds: How often ``wait``/``events`` re-read a job run by another worker
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_pending: int = 64,
+        retention_seconds: float = 600.0,
+        name: str = "verification",
+        store: Any = None,
+        poll_seconds: float = 0.5,
+    ) -> None:
+        if max_workers < 1 or max_pending < 1:
+            raise ValueError("max_workers and max_pending must be at least 1.")
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.retention_seconds = retention_seconds
+        self.store = store
+        self.poll_seconds = poll_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._jobs: Dict[str, VerificationJob] = {}
+        self._active_by_key: Dict[str, str] = {}
+        self._changed = threading.Condition()
+        self._submitted = 0
+        self._deduplicated = 0
+        self._rejected = 0
+        self._failed = 0
+        self._completed = 0
+
+    def _active_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.status not in TERMINAL_STATES)
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention_seconds
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.status in TERMINAL_STATES and (job.finished_at or 0) < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def submit(
+        self,
+        fn: Callable[[], Dict[str, Any]],
+        key: Optional[str] = None,
+        context_id: Optional[str] = None,
+        on_complete: Optional[Callable[[VerificationJob], None]] = None,
+    ) -> VerificationJob:
+        """
+        Queue ``fn`` and return its job.
+
+        A job with the same ``key`` that is still pending or running is
+        returned instead of starting a duplicate LLM call; ``context_id`` is
+        then added to that job's ``context_ids``.
+
+        Raises:
+            VerificationQueueFull: If ``max_pending`` jobs are already active
+        """
+        with self._changed:
+            self._prune()
+            if key and key in self._active_by_key:
+                self._deduplicated += 1
+                job = self._jobs[self._active_by_key[key]]
+                if context_id and context_id not in job.context_ids:
+                    job.context_ids.append(context_id)
+                return job
+            if self._active_count() >= self.max_pending:
+                self._rejected += 1
+                raise VerificationQueueFull(f"{self.max_pending} verification jobs already pending.")
+            job = VerificationJob(
+                job_id=uuid.uuid4().hex,
+                key=key,
+                context_id=context_id,
+                context_ids=[context_id] if context_id else [],
+            )
+            self._jobs[job.job_id] = job
+            if key:
+                self._active_by_key[key] = job.job_id
+            self._submitted += 1
+            snapshot = job.to_dict()
+        self._publish(snapshot)
+        self._executor.submit(self._run, job, fn, on_complete)
+        return job
+
+    def _publish(self, snapshot: Dict[str, Any]) -> None:
+        if self.store is None:
+            return
+        try:
+            self.store.set(SHARED_KEY_PREFIX + snapshot["job_id"], snapshot)
+        except Exception as exc:
+            logger.warning("Could not publish verification job %s: %s", snapshot["job_id"], exc)
+
+    def _shared_get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Snapshot published by any worker, or None if absent or past retention."""
+        if self.store is None:
+            return None
+        try:
+            snapshot = self.store.get(SHARED_KEY_PREFIX + job_id)
+        except Exception as exc:
+            logger.warning("Could not read verification job %s: %s", job_id, exc)
+            return None
+        if not snapshot:
+            return None
+        if snapshot["status"] in TERMINAL_STATES and (snapshot.get("finished_at") or 0) < (
+            time.time() - self.retention_seconds
+        ):
+            return None
+        return snapshot
+
+    def _set_status(self, job: VerificationJob, **changes: Any) -> None:
+        with self._changed:
+            for name, value in changes.items():
+                setattr(job, name, value)
+            if job.status in TERMINAL_STATES and job.key and self._active_by_key.get(job.key) == job.job_id:
+                del self._active_by_key[job.key]
+            snapshot = job.to_dict()
+        # Published before waiters wake, so a poll on another worker never lags this one.
+        self._publish(snapshot)
+        with self._changed:
+            self._changed.notify_all()
+
+    def _run(
+        self,
+        job: VerificationJob,
+        fn: Callable[[], Dict[str, Any]],
+        on_complete: Optional[Callable[[VerificationJob], None]],
+    ) -> None:
+        self._set_status(job, status=JOB_RUNNING, started_at=time.time())
+        try:
+            result = fn()
+        except Exception as exc:
+            logger.warning("Verification job %s failed: %s", job.job_id, exc)
+            with self._changed:
+                self._failed += 1
+            self._set_status(job, status=JOB_FAILED, error=str(exc), finished_at=time.time())
+        else:
+            with self._changed:
+                self._completed += 1
+            # Let callers persist the result before pollers see "done".
+            job.result = result
+            if on_complete:
+                try:
+                    on_complete(job)
+                except Exception:  # pragma: no cover - never lose the verdict over a side effect
+                    logger.exception("Verification job %s completion hook failed.", job.job_id)
+            self._set_status(job, status=JOB_DONE, finished_at=time.time())
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Snapshot of a job run here or, with a shared store, on another worker."""
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return job.to_dict()
+        return self._shared_get(job_id)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Block until the job finishes (or ``timeout`` passes) and return its snapshot."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._changed:
+            while job_id in self._jobs:
+                job = self._jobs[job_id]
+                if job.status in TERMINAL_STATES:
+                    return job.to_dict()
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return job.to_dict()
+                self._changed.wait(remaining)
+        # Another worker's job: no condition to wait on, so poll the shared store.
+        while True:
+            snapshot = self._shared_get(job_id)
+            if snapshot is None or snapshot["status"] in TERMINAL_STATES:
+                return snapshot
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return snapshot
+            time.sleep(self.poll_seconds if remaining is None else min(self.poll_seconds, remaining))
+
+    def events(self, job_id: str, heartbeat_seconds: float = 15.0) -> Iterator[str]:
+        """
+        Server-sent event stream for one job.
+
+        Emits a ``status`` event on every state change and a final ``result``
+        event when the job finishes; ``: keep-alive`` comments in between.
+        """
+        last_status = None
+        while True:
+            snapshot = self.wait(job_id, timeout=heartbeat_seconds) if last_status else self.get(job_id)
+            if snapshot is None:
+                yield format_sse("error", {"job_id": job_id, "error": "unknown job"})
+                return
+            if snapshot["status"] in TERMINAL_STATES:
+                yield format_sse("result", snapshot)
+                return
+            if snapshot["status"] != last_status:
+                last_status = snapshot["status"]
+                yield format_sse("status", snapshot)
+            else:
+                yield ": keep-alive\n\n"
+
+    def stats(self) -> Dict[str, Any]:
+        with self._changed:
+            return {
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "shared": self.store is not None,
+                "active": self._active_count(),
+                "tracked": len(self._jobs),
+                "submitted": self._submitted,
+                "deduplicated": self._deduplicated,
+                "rejected": self._rejected,
+                "completed": self._completed,
+                "failed": self._failed,
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """One server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+__all__ = [
+    "VerificationJob",
+    "VerificationJobManager",
+    "VerificationQueueFull",
+    "format_sse",
+    "JOB_PENDING",
+    "JOB_RUNNING",
+    "JOB_DONE",
+    "JOB_FAILED",
+]
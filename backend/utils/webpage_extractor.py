@@ -5,6 +5,7 @@ Helpers to extract article text from URLs.
 from __future__ import annotations
 
 from typing import Optional
+from urllib.parse import urlsplit, urlunsplit
 
 import requests
 from bs4 import BeautifulSoup
@@ -41,6 +42,13 @@ def _extract_with_bs4(url: str) -> Optional[str]:
     return joined or None
 
 
+def normalize_url(url: str) -> str:
+    """Canonical form for deduplication: trimmed, lower-case scheme/host, no fragment."""
+    parts = urlsplit(url.strip())
+    path = parts.path or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
+
+
 def extract_text_from_url(url: str) -> str:
     """Fetch and return cleaned article text."""
     if not url:
@@ -63,5 +71,5 @@ def extract_text_from_url(url: str) -> str:
     raise WebExtractionError("Unable to extract content from URL.")
 
 
-__all__ = ["extract_text_from_url", "WebExtractionError"]
+__all__ = ["extract_text_from_url", "normalize_url", "WebExtractionError"]
 
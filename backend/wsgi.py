@@ -0,0 +1,12 @@
+"""
+WSGI entry point for production servers, e.g. ``gunicorn backend.wsgi:app``.
+
+Model loading and warm-up start in the background at import time so the
+worker can answer /livez immediately and report /readyz once warm.
+"""
+
+from .app import app, start_background_startup
+
+start_background_startup()
+
+__all__ = ["app"]